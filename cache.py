@@ -0,0 +1,69 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Optional
+import pandas as pd
+
+class FileCache:
+    """Small on-disk cache for market data API responses that survives app restarts"""
+    
+    def __init__(self, directory: str = '.cache'):
+        self.directory = directory
+    
+    def _path(self, key: str, extension: str) -> str:
+        """File path for a key; keys are hashed so any symbol/period text is a safe filename"""
+        return os.path.join(self.directory, hashlib.md5(key.encode()).hexdigest() + extension)
+    
+    def get(self, key: str, ttl: float) -> Optional[Any]:
+        """Return the value stored under key if it was written less than ttl seconds ago, else None"""
+        for extension in ('.parquet', '.json'):
+            path = self._path(key, extension)
+            try:
+                if time.time() - os.path.getmtime(path) >= ttl:
+                    return None
+                if extension == '.parquet':
+                    return pd.read_parquet(path)
+                with open(path, encoding='utf-8') as f:
+                    return json.load(f, object_hook=_decode_datetime)
+            except FileNotFoundError:
+                continue
+            except Exception:
+                return None  # Unreadable or half-written entry: treat as a miss
+        return None
+    
+    def set(self, key: str, value: Any):
+        """Store a DataFrame (as parquet) or a JSON-serialisable value; failures are ignored"""
+        is_frame = isinstance(value, pd.DataFrame)
+        path = self._path(key, '.parquet' if is_frame else '.json')
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Write to a temp file and rename so readers never see a partial entry
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            try:
+                if is_frame:
+                    os.close(fd)
+                    value.to_parquet(tmp_path)
+                else:
+                    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                        json.dump(value, f, default=_encode_datetime)
+                os.replace(tmp_path, path)
+            except Exception:
+                os.remove(tmp_path)
+                raise
+        except Exception:
+            pass  # The cache is best-effort; callers already have the value
+
+def _encode_datetime(value):
+    """json.dump hook: datetimes become tagged ISO strings"""
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+def _decode_datetime(obj: dict):
+    """json.load hook: turn tagged ISO strings back into datetimes"""
+    if '__datetime__' in obj:
+        return datetime.fromisoformat(obj['__datetime__'])
+    return obj
@@ -1,5 +1,6 @@
 import streamlit as st
 import pandas as pd
+import pyarrow as pa
 import yfinance as yf
 import plotly.graph_objects as go
 import plotly.express as px
@@ -10,161 +11,373 @@ import time
 from typing import Dict, List, Optional
 import uuid
 import warnings
-import sqlite3
+try:
+    # Optional drop-in SQLite build (e.g. pip install pysqlite3-binary, or a locally
+    # PGO/LTO-compiled pysqlite3); falls back to the interpreter's bundled module
+    import pysqlite3 as sqlite3
+except ImportError:
+    import sqlite3
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from dataclasses import dataclass
+from enum import IntEnum
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import hashlib
+import hmac
 import os
-import random
 import math
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHashError
+from cache import FileCache
 warnings.filterwarnings('ignore')
 
+# Parse DATETIME columns (SQLite CURRENT_TIMESTAMP text) into datetime objects as rows are read
+sqlite3.register_converter('DATETIME', lambda value: datetime.fromisoformat(value.decode()))
+
+# SQL used on every trade; kept as constants so the connection's statement cache
+# sees identical text each time and reuses the prepared statements
+SQL_SELECT_CASH = 'SELECT cash FROM users WHERE id = ?'
+
+SQL_SELECT_POSITION = 'SELECT shares, avg_price FROM portfolio WHERE user_id = ? AND symbol = ?'
+
+SQL_UPSERT_PORTFOLIO = '''
+    INSERT INTO portfolio (user_id, symbol, shares, avg_price, stock_name)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(user_id, symbol) DO UPDATE SET
+        avg_price = (portfolio.shares * portfolio.avg_price + excluded.shares * excluded.avg_price)
+                    / (portfolio.shares + excluded.shares),
+        shares = portfolio.shares + excluded.shares,
+        stock_name = excluded.stock_name
+'''
+
+SQL_UPDATE_POSITION_SHARES = 'UPDATE portfolio SET shares = ? WHERE user_id = ? AND symbol = ?'
+
+SQL_DELETE_POSITION = 'DELETE FROM portfolio WHERE user_id = ? AND symbol = ?'
+
+SQL_INSERT_TRADE = '''
+    INSERT INTO trades (id, user_id, trade_type, symbol, shares, price, total_cost, commission, profit_loss, stock_name, original_currency, original_price)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+# best_trade only ever grows from 0 and worst_trade only shrinks from 0, so MAX/MIN
+# with a BUY's zero profit leaves them unchanged. Running USD totals are rounded to whole
+# cents on every update so float error can't accumulate over many trades.
+SQL_UPDATE_USER_AFTER_TRADE = '''
+    UPDATE users SET cash = ROUND(cash + ?, 2),
+                     portfolio_value_usd = ROUND(portfolio_value_usd + ?, 2),
+                     total_trades = total_trades + 1,
+                     total_profit_loss = ROUND(total_profit_loss + ?, 2),
+                     best_trade = MAX(best_trade, ?),
+                     worst_trade = MIN(worst_trade, ?)
+    WHERE id = ?
+'''
+
+# Reads and account writes, likewise shared as constants
+SQL_USER_EXISTS = 'SELECT 1 FROM users WHERE username = ? OR email = ? LIMIT 1'
+
+SQL_INSERT_USER = '''
+    INSERT INTO users (id, username, password_hash, email, cash)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT DO NOTHING
+    RETURNING id
+'''
+
+SQL_SELECT_USER_FOR_LOGIN = '''
+    SELECT id, username, email, cash, created_at, last_login, total_trades,
+           total_profit_loss, best_trade, worst_trade, password_hash
+    FROM users
+    WHERE username = ?
+'''
+
+SQL_UPDATE_LAST_LOGIN = 'UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE id = ?'
+
+SQL_UPDATE_PASSWORD_HASH = 'UPDATE users SET password_hash = ? WHERE id = ?'
+
+SQL_SELECT_USER = '''
+    SELECT id, username, email, cash, created_at, last_login, total_trades,
+           total_profit_loss, best_trade, worst_trade
+    FROM users WHERE id = ?
+'''
+
+SQL_SELECT_PORTFOLIO = '''
+    SELECT symbol, shares, avg_price, stock_name
+    FROM portfolio
+    WHERE user_id = ? AND shares > 0
+'''
+
+SQL_SELECT_TRADES = '''
+    SELECT id, trade_type, symbol, shares, price, total_cost, commission,
+           profit_loss, stock_name, timestamp, original_currency, original_price
+    FROM trades
+    WHERE user_id = ?
+    ORDER BY timestamp DESC
+    LIMIT ? OFFSET ?
+'''
+
+SQL_SELECT_TRADE_STATS = '''
+    SELECT COUNT(*),
+           COALESCE(SUM(trade_type = 'BUY'), 0),
+           COALESCE(SUM(trade_type = 'SELL'), 0),
+           ROUND(COALESCE(SUM(profit_loss), 0), 2)
+    FROM trades
+    WHERE user_id = ?
+'''
+
+SQL_SELECT_LEADERBOARD = '''
+    SELECT id, username, cash, total_trades, total_profit_loss,
+           ROUND(cash + portfolio_value_usd, 2) AS net_worth,
+           ROW_NUMBER() OVER (ORDER BY (cash + portfolio_value_usd) DESC) AS rank
+    FROM users
+    ORDER BY (cash + portfolio_value_usd) DESC
+    LIMIT ?
+'''
+
+SQL_SELECT_USER_RANK = '''
+    SELECT rank, total FROM (
+        SELECT id,
+               ROW_NUMBER() OVER (ORDER BY (cash + portfolio_value_usd) DESC) AS rank,
+               COUNT(*) OVER () AS total
+        FROM users
+    ) WHERE id = ?
+'''
+
+SQL_SELECT_SETTINGS = 'SELECT starting_cash, commission, game_duration_days FROM game_settings ORDER BY id DESC LIMIT 1'
+
+# Reads of portfolios, trades and the leaderboard are cached briefly across reruns. Each write bumps
+# a version, (db_path, user_id) for the user's own data and (db_path, None) for the leaderboard,
+# and the versions are part of the cache keys, so a trade is visible on the very next rerun.
+DB_READ_TTL_SECONDS = 15
+
+@st.cache_resource(show_spinner=False)
+def shared_state(name: str) -> dict:
+    """A named dict shared by every rerun and session; plain module globals are rebuilt on each rerun."""
+    return {}
+
+_DB_WRITE_VERSIONS: Dict[tuple, int] = shared_state('db_write_versions')
+
 # Database Manager Class
 class TradingGameDatabase:
     def __init__(self, db_path: str = "trading_game.db"):
-        """Initialize the database connection and create tables if they don't exist."""
+        """Open a long-lived database connection and create tables if they don't exist."""
         self.db_path = db_path
+        # One connection per database object, shared by every method and guarded by
+        # a lock, instead of reopening the .db file on every call.
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                                     detect_types=sqlite3.PARSE_DECLTYPES)
+        # WAL lets readers proceed while a trade commits; journal_mode is stored in the file,
+        # the other settings apply to this connection
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('PRAGMA wal_autocheckpoint=1000')
+        self._conn.execute('PRAGMA busy_timeout=5000')
+        self._conn.execute('PRAGMA temp_store=MEMORY')
+        # The app shares this one connection process-wide (see get_database), so it can afford a 64 MiB page cache
+        self._conn.execute('PRAGMA cache_size=-65536')
+        self._conn.execute('PRAGMA mmap_size=268435456')
+        # Enforce the portfolio/trades -> users references declared in the schema
+        self._conn.execute('PRAGMA foreign_keys=ON')
+        # Argon2id with t=2 / 19 MiB / p=1 (~20 ms per hash)
+        self._ph = PasswordHasher(time_cost=2, memory_cost=19 * 1024, parallelism=1)
+        self._dummy_hash = None
         self.init_database()
     
+    @contextmanager
+    def _cursor(self):
+        """Yield a cursor on the shared connection; commits on success, rolls back on error."""
+        with self._lock, self._conn:
+            yield self._conn.cursor()
+    
+    def _write_version(self, user_id: Optional[str] = None) -> int:
+        """Current write version for a user's data, or for the leaderboard when user_id is None."""
+        return _DB_WRITE_VERSIONS.get((self.db_path, user_id), 0)
+    
+    def _record_write(self, user_id: str):
+        """Invalidate cached reads of this user's data and of the leaderboard."""
+        for key in ((self.db_path, user_id), (self.db_path, None)):
+            _DB_WRITE_VERSIONS[key] = _DB_WRITE_VERSIONS.get(key, 0) + 1
+    
     def init_database(self):
         """Create database tables if they don't exist."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Create users table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id TEXT PRIMARY KEY,
-                username TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                email TEXT UNIQUE NOT NULL,
-                cash REAL DEFAULT 100000.00,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                last_login DATETIME,
-                total_trades INTEGER DEFAULT 0,
-                total_profit_loss REAL DEFAULT 0.0,
-                best_trade REAL DEFAULT 0.0,
-                worst_trade REAL DEFAULT 0.0
-            )
-        ''')
-        
-        # Create portfolio table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS portfolio (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id TEXT,
-                symbol TEXT NOT NULL,
-                shares INTEGER NOT NULL,
-                avg_price REAL NOT NULL,
-                stock_name TEXT,
-                FOREIGN KEY (user_id) REFERENCES users (id),
-                UNIQUE(user_id, symbol)
-            )
-        ''')
-        
-        # Create trades table - UPDATED to store original currency and local price
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS trades (
-                id TEXT PRIMARY KEY,
-                user_id TEXT,
-                trade_type TEXT NOT NULL,
-                symbol TEXT NOT NULL,
-                shares INTEGER NOT NULL,
-                price REAL NOT NULL,
-                total_cost REAL NOT NULL,
-                commission REAL NOT NULL,
-                profit_loss REAL DEFAULT 0.0,
-                stock_name TEXT,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                original_currency TEXT DEFAULT 'USD',
-                original_price REAL,
-                FOREIGN KEY (user_id) REFERENCES users (id)
-            )
-        ''')
-        
-        # Add new columns to existing trades table if they don't exist
-        try:
-            cursor.execute('ALTER TABLE trades ADD COLUMN original_currency TEXT DEFAULT "USD"')
-        except sqlite3.OperationalError:
-            pass  # Column already exists
-        
-        try:
-            cursor.execute('ALTER TABLE trades ADD COLUMN original_price REAL')
-        except sqlite3.OperationalError:
-            pass  # Column already exists
-        
-        # Create game_settings table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS game_settings (
-                id INTEGER PRIMARY KEY,
-                starting_cash REAL DEFAULT 100000.00,
-                commission REAL DEFAULT 9.99,
-                game_duration_days INTEGER DEFAULT 30,
-                created_date DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Insert default settings if none exist
-        cursor.execute('SELECT COUNT(*) FROM game_settings')
-        if cursor.fetchone()[0] == 0:
+        with self._cursor() as cursor:
+            # Create users table
             cursor.execute('''
-                INSERT INTO game_settings (starting_cash, commission, game_duration_days)
-                VALUES (100000.00, 0.00, 30)
+                CREATE TABLE IF NOT EXISTS users (
+                    id TEXT PRIMARY KEY,
+                    username TEXT UNIQUE NOT NULL,
+                    password_hash TEXT NOT NULL,
+                    email TEXT UNIQUE NOT NULL,
+                    cash REAL DEFAULT 100000.00,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    last_login DATETIME,
+                    total_trades INTEGER DEFAULT 0,
+                    total_profit_loss REAL DEFAULT 0.0,
+                    best_trade REAL DEFAULT 0.0,
+                    worst_trade REAL DEFAULT 0.0,
+                    portfolio_value_usd REAL DEFAULT 0.0
+                )
+            ''')
+            
+            # Create portfolio table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS portfolio (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id TEXT,
+                    symbol TEXT NOT NULL,
+                    shares INTEGER NOT NULL,
+                    avg_price REAL NOT NULL,
+                    stock_name TEXT,
+                    FOREIGN KEY (user_id) REFERENCES users (id),
+                    UNIQUE(user_id, symbol)
+                )
+            ''')
+            
+            # Create trades table - UPDATED to store original currency and local price
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS trades (
+                    id TEXT PRIMARY KEY,
+                    user_id TEXT,
+                    trade_type TEXT NOT NULL,
+                    symbol TEXT NOT NULL,
+                    shares INTEGER NOT NULL,
+                    price REAL NOT NULL,
+                    total_cost REAL NOT NULL,
+                    commission REAL NOT NULL,
+                    profit_loss REAL DEFAULT 0.0,
+                    stock_name TEXT,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    original_currency TEXT DEFAULT 'USD',
+                    original_price REAL,
+                    FOREIGN KEY (user_id) REFERENCES users (id)
+                )
+            ''')
+            
+            # Add new columns to existing trades table if they don't exist
+            try:
+                cursor.execute('ALTER TABLE trades ADD COLUMN original_currency TEXT DEFAULT "USD"')
+            except sqlite3.OperationalError:
+                pass  # Column already exists
+            
+            try:
+                cursor.execute('ALTER TABLE trades ADD COLUMN original_price REAL')
+            except sqlite3.OperationalError:
+                pass  # Column already exists
+            
+            # Cost basis of open positions, maintained by execute_trade for the leaderboard
+            try:
+                cursor.execute('ALTER TABLE users ADD COLUMN portfolio_value_usd REAL DEFAULT 0.0')
+                cursor.execute('''
+                    UPDATE users SET portfolio_value_usd = COALESCE(
+                        (SELECT SUM(p.shares * p.avg_price) FROM portfolio p WHERE p.user_id = users.id), 0)
+                ''')
+            except sqlite3.OperationalError:
+                pass  # Column already exists
+            
+            # Create game_settings table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS game_settings (
+                    id INTEGER PRIMARY KEY,
+                    starting_cash REAL DEFAULT 100000.00,
+                    commission REAL DEFAULT 9.99,
+                    game_duration_days INTEGER DEFAULT 30,
+                    created_date DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Indexes for the per-user lookups; users.username is already indexed by its UNIQUE constraint
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_trades_user_ts ON trades(user_id, timestamp DESC)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_portfolio_user ON portfolio(user_id) WHERE shares > 0')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_net_worth ON users((cash + portfolio_value_usd) DESC)')
+            
+            # Refresh planner statistics for those indexes; this runs once per process (see get_database)
+            # and analysis_limit samples big tables, so it stays quick however many trades there are
+            cursor.execute('PRAGMA analysis_limit=400')
+            cursor.execute('ANALYZE')
+            
+            # Insert default settings if none exist (a no-op once row 1 is there)
+            cursor.execute('''
+                INSERT OR IGNORE INTO game_settings (id, starting_cash, commission, game_duration_days)
+                VALUES (1, 100000.00, 0.00, 30)
             ''')
-        
-        conn.commit()
-        conn.close()
     
     def hash_password(self, password: str) -> str:
         """Hash a password for secure storage."""
-        return hashlib.sha256(password.encode()).hexdigest()
+        return self._ph.hash(password)
+    
+    def verify_password(self, stored_hash: str, password: str) -> bool:
+        """Check a password against an Argon2 hash or a legacy unsalted SHA-256 hash."""
+        if not stored_hash.startswith('$argon2'):
+            legacy_hash = hashlib.sha256(password.encode()).hexdigest()
+            return hmac.compare_digest(stored_hash, legacy_hash)
+        try:
+            return self._ph.verify(stored_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+    
+    def needs_rehash(self, stored_hash: str) -> bool:
+        """Return True if a stored hash is legacy SHA-256 or uses outdated Argon2 parameters."""
+        if not stored_hash.startswith('$argon2'):
+            return True
+        return self._ph.check_needs_rehash(stored_hash)
+    
+    def _unknown_user_hash(self) -> str:
+        """Argon2 hash of a random secret, verified against when a username doesn't exist."""
+        if self._dummy_hash is None:
+            self._dummy_hash = self._ph.hash(uuid.uuid4().hex)
+        return self._dummy_hash
     
     def create_user(self, username: str, password: str, email: str) -> Dict:
         """Create a new user account."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            # Cheap probe first so a taken name doesn't pay for an Argon2 hash
+            with self._cursor() as cursor:
+                cursor.execute(SQL_USER_EXISTS, (username, email))
+                taken = cursor.fetchone() is not None
+            if taken:
+                return {'success': False, 'message': 'Username or email already exists'}
             
             user_id = str(uuid.uuid4())[:8]
             password_hash = self.hash_password(password)
+            starting_cash = self.get_game_settings()['starting_cash']
             
-            # Get starting cash from settings
-            cursor.execute('SELECT starting_cash FROM game_settings ORDER BY id DESC LIMIT 1')
-            starting_cash = cursor.fetchone()[0]
-            
-            cursor.execute('''
-                INSERT INTO users (id, username, password_hash, email, cash) 
-                VALUES (?, ?, ?, ?, ?)
-            ''', (user_id, username, password_hash, email, starting_cash))
+            with self._cursor() as cursor:
+                # DO NOTHING returns no row if another signup took the name in the meantime
+                cursor.execute(SQL_INSERT_USER, (user_id, username, password_hash, email, starting_cash))
+                created = cursor.fetchone() is not None
             
-            conn.commit()
-            conn.close()
+            if not created:
+                return {'success': False, 'message': 'Username or email already exists'}
+            self._record_write(user_id)
             return {'success': True, 'user_id': user_id, 'message': 'User created successfully'}
-        except sqlite3.IntegrityError:
-            return {'success': False, 'message': 'Username or email already exists'}
         except Exception as e:
             return {'success': False, 'message': f'Error creating user: {str(e)}'}
     
     def authenticate_user(self, username: str, password: str) -> Dict:
         """Authenticate user and return user data if successful."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            with self._cursor() as cursor:
+                cursor.execute(SQL_SELECT_USER_FOR_LOGIN, (username,))
+                user = cursor.fetchone()
             
-            password_hash = self.hash_password(password)
-            cursor.execute('''
-                SELECT id, username, email, cash, created_at, last_login, total_trades, 
-                       total_profit_loss, best_trade, worst_trade
-                FROM users 
-                WHERE username = ? AND password_hash = ?
-            ''', (username, password_hash))
+            # Verify outside the lock; Argon2 is deliberately slow. Unknown usernames are
+            # checked against a throwaway hash so they take as long as a wrong password.
+            stored_hash = user[10] if user else self._unknown_user_hash()
+            if not self.verify_password(stored_hash, password):
+                user = None
             
-            user = cursor.fetchone()
             if user:
-                # Update last login
-                cursor.execute('''
-                    UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE id = ?
-                ''', (user[0],))
-                conn.commit()
+                # Transparently upgrade legacy SHA-256 hashes on successful login
+                new_hash = self.hash_password(password) if self.needs_rehash(user[10]) else None
+                with self._cursor() as cursor:
+                    # Update last login
+                    cursor.execute(SQL_UPDATE_LAST_LOGIN, (user[0],))
+                    if new_hash:
+                        cursor.execute(SQL_UPDATE_PASSWORD_HASH, (new_hash, user[0]))
                 
                 user_data = {
                     'id': user[0],
@@ -178,10 +391,8 @@ class TradingGameDatabase:
                     'best_trade': user[8],
                     'worst_trade': user[9]
                 }
-                conn.close()
                 return {'success': True, 'user': user_data}
             
-            conn.close()
             return {'success': False, 'message': 'Invalid username or password'}
         except Exception as e:
             return {'success': False, 'message': f'Login error: {str(e)}'}
@@ -189,17 +400,10 @@ class TradingGameDatabase:
     def get_user_data(self, user_id: str) -> Dict:
         """Get user data by ID."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT id, username, email, cash, created_at, last_login, total_trades, 
-                       total_profit_loss, best_trade, worst_trade
-                FROM users WHERE id = ?
-            ''', (user_id,))
-            
-            user = cursor.fetchone()
-            conn.close()
+            with self._cursor() as cursor:
+                cursor.execute(SQL_SELECT_USER, (user_id,))
+                
+                user = cursor.fetchone()
             
             if user:
                 return {
@@ -222,192 +426,142 @@ class TradingGameDatabase:
     def get_user_portfolio(self, user_id: str) -> List[Dict]:
         """Get user's portfolio."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT symbol, shares, avg_price, stock_name
-                FROM portfolio 
-                WHERE user_id = ? AND shares > 0
-            ''', (user_id,))
-            
-            portfolio = []
-            for row in cursor.fetchall():
-                portfolio.append({
-                    'symbol': row[0],
-                    'shares': row[1],
-                    'avg_price': row[2],
-                    'name': row[3] or row[0]
-                })
-            
-            conn.close()
-            return portfolio
+            return self._load_user_portfolio(self.db_path, user_id, self._write_version(user_id))
         except Exception as e:
             st.error(f"Error getting portfolio: {str(e)}")
             return []
     
-    def get_user_trades(self, user_id: str) -> List[Dict]:
-        """Get user's trade history."""
+    @st.cache_data(ttl=DB_READ_TTL_SECONDS, max_entries=1000, show_spinner=False)
+    def _load_user_portfolio(_self, db_path: str, user_id: str, version: int) -> List[Dict]:
+        """Read a user's open positions; version is part of the cache key so trades invalidate it."""
+        with _self._cursor() as cursor:
+            cursor.execute(SQL_SELECT_PORTFOLIO, (user_id,))
+            rows = cursor.fetchall()
+        
+        portfolio = []
+        for row in rows:
+            name = row[3] or row[0]
+            portfolio.append({
+                'symbol': row[0],
+                'shares': row[1],
+                'avg_price': row[2],
+                'name': name,
+                'short_name': name[:SHORT_NAME_LENGTH]
+            })
+        
+        return portfolio
+    
+    def get_user_trades(self, user_id: str, limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+        """Get user's trade history, newest first; pass limit/offset to fetch a single page."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT id, trade_type, symbol, shares, price, total_cost, commission, 
-                       profit_loss, stock_name, timestamp, original_currency, original_price
-                FROM trades 
-                WHERE user_id = ? 
-                ORDER BY timestamp DESC
-            ''', (user_id,))
-            
-            trades = []
-            for row in cursor.fetchall():
-                trades.append({
-                    'id': row[0],
-                    'type': row[1],
-                    'symbol': row[2],
-                    'shares': row[3],
-                    'price': row[4],  # USD price (stored)
-                    'total_cost': row[5],  # USD total cost (stored)
-                    'commission': row[6],
-                    'profit_loss': row[7],
-                    'name': row[8] or row[2],
-                    'timestamp': datetime.strptime(row[9], '%Y-%m-%d %H:%M:%S'),
-                    'original_currency': row[10] or 'USD',
-                    'original_price': row[11] or row[4]  # Fallback to USD price if no original price
-                })
-            
-            conn.close()
-            return trades
+            return self._load_user_trades(self.db_path, user_id, limit, offset, self._write_version(user_id))
         except Exception as e:
             st.error(f"Error getting trades: {str(e)}")
             return []
     
-    def execute_trade(self, user_id: str, symbol: str, action: str, shares: int, price: float, stock_name: str, currency: str = 'USD', original_price: float = None) -> Dict:
-        """Execute a trade and update database with currency conversion"""
+    @st.cache_data(ttl=DB_READ_TTL_SECONDS, max_entries=1000, show_spinner=False)
+    def _load_user_trades(_self, db_path: str, user_id: str, limit: Optional[int], offset: int, version: int) -> List[Dict]:
+        """Read a page of a user's trades; version is part of the cache key so trades invalidate it."""
+        with _self._cursor() as cursor:
+            # LIMIT -1 means no limit in SQLite
+            cursor.execute(SQL_SELECT_TRADES, (user_id, -1 if limit is None else limit, offset))
+            rows = cursor.fetchall()
+        
+        trades = []
+        for row in rows:
+            name = row[8] or row[2]
+            trades.append({
+                'id': row[0],
+                'type': row[1],
+                'symbol': row[2],
+                'shares': row[3],
+                'price': row[4],  # USD price (stored)
+                'total_cost': row[5],  # USD total cost (stored)
+                'commission': row[6],
+                'profit_loss': row[7],
+                'name': name,
+                'short_name': name[:SHORT_NAME_LENGTH],
+                'timestamp': row[9],
+                'original_currency': row[10] or 'USD',
+                'original_price': row[11] or row[4]  # Fallback to USD price if no original price
+            })
+        
+        return trades
+    
+    def get_user_trade_stats(self, user_id: str) -> Dict:
+        """Get trade counts and realized P&L over the user's whole history in one aggregate query."""
+        try:
+            return self._load_user_trade_stats(self.db_path, user_id, self._write_version(user_id))
+        except Exception as e:
+            st.error(f"Error getting trade stats: {str(e)}")
+            return {'total': 0, 'buys': 0, 'sells': 0, 'realized_pl': 0.0}
+    
+    @st.cache_data(ttl=DB_READ_TTL_SECONDS, max_entries=1000, show_spinner=False)
+    def _load_user_trade_stats(_self, db_path: str, user_id: str, version: int) -> Dict:
+        """Aggregate a user's trades; version is part of the cache key so trades invalidate it."""
+        with _self._cursor() as cursor:
+            cursor.execute(SQL_SELECT_TRADE_STATS, (user_id,))
+            total, buys, sells, realized_pl = cursor.fetchone()
+        return {'total': total, 'buys': buys, 'sells': sells, 'realized_pl': realized_pl}
+    
+    def execute_trade(self, user_id: str, symbol: str, action: str, shares: int, price_usd: float, stock_name: str, currency: str = 'USD', original_price: float = None) -> Dict:
+        """Execute a trade at a USD price; currency/original_price record the local quote for display"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Get commission from settings
-            cursor.execute('SELECT commission FROM game_settings ORDER BY id DESC LIMIT 1')
-            commission = cursor.fetchone()[0]
-            
-            # Get current user data
-            cursor.execute('SELECT cash FROM users WHERE id = ?', (user_id,))
-            current_cash = cursor.fetchone()[0]
-            
-            # Convert price to USD for internal calculations
-            exchange_rates = {
-                'USD': 1.0,
-                'GHS': 12.50,
-                'KES': 155.0,
-                'NGN': 1580.0,
-                'ZAR': 18.50,
-                'EGP': 49.0
-            }
-            
-            rate = exchange_rates.get(currency, 1.0)
-            price_usd = price / rate
-            
             # Store the original price in local currency for display purposes
             if original_price is None:
-                original_price = price
-            
-            total_cost_usd = price_usd * shares
-            
-            if action.upper() == 'BUY':
-                if current_cash < total_cost_usd:
-                    conn.close()
-                    return {'success': False, 'message': 'Insufficient funds'}
-                
-                # Update cash (stored in USD)
-                new_cash = current_cash - total_cost_usd
-                cursor.execute('UPDATE users SET cash = ? WHERE id = ?', (new_cash, user_id))
-                
-                # Update portfolio (store prices in USD)
-                cursor.execute('''
-                    SELECT shares, avg_price FROM portfolio WHERE user_id = ? AND symbol = ?
-                ''', (user_id, symbol))
-                
-                existing = cursor.fetchone()
-                if existing:
-                    old_shares, old_avg_price = existing
-                    new_shares = old_shares + shares
-                    new_avg_price = ((old_shares * old_avg_price) + (shares * price_usd)) / new_shares
+                original_price = price_usd
+            
+            # Money moves in whole cents; price_usd itself keeps full precision for the cost basis
+            total_cost_usd = round(price_usd * shares, 2)
+            trade_id = str(uuid.uuid4())[:8]
+            
+            # Every statement below runs in one transaction
+            with self._cursor() as cursor:
+                if action.upper() == 'BUY':
+                    cursor.execute(SQL_SELECT_CASH, (user_id,))
+                    if cursor.fetchone()[0] < total_cost_usd:
+                        return {'success': False, 'message': 'Insufficient funds'}
                     
-                    cursor.execute('''
-                        UPDATE portfolio SET shares = ?, avg_price = ?, stock_name = ?
-                        WHERE user_id = ? AND symbol = ?
-                    ''', (new_shares, new_avg_price, stock_name, user_id, symbol))
-                else:
-                    cursor.execute('''
-                        INSERT INTO portfolio (user_id, symbol, shares, avg_price, stock_name)
-                        VALUES (?, ?, ?, ?, ?)
-                    ''', (user_id, symbol, shares, price_usd, stock_name))
-                
-                # Record trade (store in USD but also save original price and currency)
-                trade_id = str(uuid.uuid4())[:8]
-                cursor.execute('''
-                    INSERT INTO trades (id, user_id, trade_type, symbol, shares, price, total_cost, commission, stock_name, original_currency, original_price)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (trade_id, user_id, action, symbol, shares, price_usd, total_cost_usd, 0.00, stock_name, currency, original_price))
-                
-                profit_loss = 0
-                
-            elif action.upper() == 'SELL':
-                # Check if user owns enough shares
-                cursor.execute('''
-                    SELECT shares, avg_price FROM portfolio WHERE user_id = ? AND symbol = ?
-                ''', (user_id, symbol))
-                
-                existing = cursor.fetchone()
-                if not existing or existing[0] < shares:
-                    conn.close()
-                    return {'success': False, 'message': 'Insufficient shares'}
-                
-                owned_shares, avg_price_usd = existing
-                
-                # Calculate profit/loss in USD (no commission)
-                profit_loss = (price_usd - avg_price_usd) * shares
-                
-                # Update cash (in USD)
-                total_proceeds_usd = price_usd * shares
-                new_cash = current_cash + total_proceeds_usd
-                cursor.execute('UPDATE users SET cash = ? WHERE id = ?', (new_cash, user_id))
-                
-                # Update portfolio
-                new_shares = owned_shares - shares
-                if new_shares > 0:
-                    cursor.execute('''
-                        UPDATE portfolio SET shares = ? WHERE user_id = ? AND symbol = ?
-                    ''', (new_shares, user_id, symbol))
-                else:
-                    cursor.execute('''
-                        DELETE FROM portfolio WHERE user_id = ? AND symbol = ?
-                    ''', (user_id, symbol))
-                
-                # Record trade (in USD but also save original price and currency)
-                trade_id = str(uuid.uuid4())[:8]
-                cursor.execute('''
-                    INSERT INTO trades (id, user_id, trade_type, symbol, shares, price, total_cost, commission, profit_loss, stock_name, original_currency, original_price)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (trade_id, user_id, action, symbol, shares, price_usd, total_proceeds_usd, 0.00, profit_loss, stock_name, currency, original_price))
+                    # Add to the position, re-averaging the USD cost basis
+                    cursor.execute(SQL_UPSERT_PORTFOLIO, (user_id, symbol, shares, price_usd, stock_name))
+                    
+                    # Record trade (store in USD but also save original price and currency)
+                    cursor.execute(SQL_INSERT_TRADE, (trade_id, user_id, action, symbol, shares, price_usd, total_cost_usd, 0.00, 0.0, stock_name, currency, original_price))
+                    
+                    profit_loss = 0
+                    cash_delta = -total_cost_usd
+                    cost_basis_delta = total_cost_usd
+                    
+                elif action.upper() == 'SELL':
+                    # Check if user owns enough shares
+                    cursor.execute(SQL_SELECT_POSITION, (user_id, symbol))
+                    
+                    existing = cursor.fetchone()
+                    if not existing or existing[0] < shares:
+                        return {'success': False, 'message': 'Insufficient shares'}
+                    
+                    owned_shares, avg_price_usd = existing
+                    
+                    # Calculate profit/loss in USD (no commission)
+                    profit_loss = round((price_usd - avg_price_usd) * shares, 2)
+                    
+                    # Update portfolio
+                    new_shares = owned_shares - shares
+                    if new_shares > 0:
+                        cursor.execute(SQL_UPDATE_POSITION_SHARES, (new_shares, user_id, symbol))
+                    else:
+                        cursor.execute(SQL_DELETE_POSITION, (user_id, symbol))
+                    
+                    # Record trade (in USD but also save original price and currency)
+                    cursor.execute(SQL_INSERT_TRADE, (trade_id, user_id, action, symbol, shares, price_usd, total_cost_usd, 0.00, profit_loss, stock_name, currency, original_price))
+                    
+                    cash_delta = total_cost_usd
+                    cost_basis_delta = -shares * avg_price_usd
                 
-                # Update user statistics
-                cursor.execute('''
-                    UPDATE users SET total_profit_loss = total_profit_loss + ?,
-                                   best_trade = CASE WHEN ? > best_trade THEN ? ELSE best_trade END,
-                                   worst_trade = CASE WHEN ? < worst_trade THEN ? ELSE worst_trade END
-                    WHERE id = ?
-                ''', (profit_loss, profit_loss, profit_loss, profit_loss, profit_loss, user_id))
-            
-            # Update total trades
-            cursor.execute('UPDATE users SET total_trades = total_trades + 1 WHERE id = ?', (user_id,))
-            
-            conn.commit()
-            conn.close()
+                # Update cash (in USD) and user statistics in a single statement
+                cursor.execute(SQL_UPDATE_USER_AFTER_TRADE, (cash_delta, cost_basis_delta, profit_loss, profit_loss, profit_loss, user_id))
             
+            self._record_write(user_id)
             return {
                 'success': True,
                 'message': f'{action.upper()} order executed successfully',
@@ -418,64 +572,73 @@ class TradingGameDatabase:
         except Exception as e:
             return {'success': False, 'message': f'Error executing trade: {str(e)}'}
     
-    def get_leaderboard(self) -> List[Dict]:
-        """Get leaderboard data."""
+    def get_leaderboard(self, limit: Optional[int] = None) -> List[Dict]:
+        """Get leaderboard data, optionally only the top `limit` traders."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT u.id, u.username, u.cash, u.total_trades, u.total_profit_loss,
-                       COALESCE(SUM(p.shares * p.avg_price), 0) as portfolio_value
-                FROM users u
-                LEFT JOIN portfolio p ON u.id = p.user_id
-                GROUP BY u.id, u.username, u.cash, u.total_trades, u.total_profit_loss
-                ORDER BY (u.cash + COALESCE(SUM(p.shares * p.avg_price), 0)) DESC
-            ''')
-            
-            leaderboard = []
-            for row in cursor.fetchall():
-                total_value = row[2] + row[5]  # cash + portfolio value
-                leaderboard.append({
-                    'user_id': row[0],
-                    'username': row[1],
-                    'cash': row[2],
-                    'total_trades': row[3],
-                    'total_profit_loss': row[4],
-                    'portfolio_value': total_value,
-                    'rank': 0  # Will be assigned later
-                })
-            
-            # Assign ranks
-            for i, player in enumerate(leaderboard):
-                player['rank'] = i + 1
-            
-            conn.close()
-            return leaderboard
+            return self._load_leaderboard(self.db_path, limit, self._write_version())
         except Exception as e:
             st.error(f"Error getting leaderboard: {str(e)}")
             return []
     
+    @st.cache_data(ttl=DB_READ_TTL_SECONDS, show_spinner=False)
+    def _load_leaderboard(_self, db_path: str, limit: Optional[int], version: int) -> List[Dict]:
+        """Read the leaderboard; version is part of the cache key so any trade or signup invalidates it."""
+        with _self._cursor() as cursor:
+            cursor.execute(SQL_SELECT_LEADERBOARD, (-1 if limit is None else limit,))
+            rows = cursor.fetchall()
+        
+        return [{
+            'user_id': row[0],
+            'username': row[1],
+            'cash': row[2],
+            'total_trades': row[3],
+            'total_profit_loss': row[4],
+            'portfolio_value': row[5],  # cash + portfolio value
+            'rank': row[6]
+        } for row in rows]
+    
+    def get_user_rank(self, user_id: str) -> Dict:
+        """Get a user's leaderboard rank and the total number of traders."""
+        try:
+            with self._cursor() as cursor:
+                # Same ordering as get_leaderboard so tied net worths rank identically
+                cursor.execute(SQL_SELECT_USER_RANK, (user_id,))
+                row = cursor.fetchone()
+            
+            if row:
+                return {'rank': row[0], 'total': row[1]}
+            return {'rank': None, 'total': 0}
+        except Exception as e:
+            st.error(f"Error getting rank: {str(e)}")
+            return {'rank': None, 'total': 0}
+    
     def get_game_settings(self) -> Dict:
         """Get game settings."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('SELECT starting_cash, commission, game_duration_days FROM game_settings ORDER BY id DESC LIMIT 1')
-            settings = cursor.fetchone()
-            conn.close()
-            
-            if settings:
-                return {
-                    'starting_cash': settings[0],
-                    'commission': settings[1],
-                    'game_duration_days': settings[2]
-                }
-            return {'starting_cash': 100000, 'commission': 0.00, 'game_duration_days': 30}
+            return self._load_game_settings(self.db_path)
         except Exception as e:
             st.error(f"Error getting settings: {str(e)}")
             return {'starting_cash': 100000, 'commission': 0.00, 'game_duration_days': 30}
+    
+    @st.cache_data(ttl=300, show_spinner=False)
+    def _load_game_settings(_self, db_path: str) -> Dict:
+        """Read the latest settings row; cached because settings almost never change."""
+        with _self._cursor() as cursor:
+            cursor.execute(SQL_SELECT_SETTINGS)
+            settings = cursor.fetchone()
+        
+        if settings:
+            return {
+                'starting_cash': settings[0],
+                'commission': settings[1],
+                'game_duration_days': settings[2]
+            }
+        return {'starting_cash': 100000, 'commission': 0.00, 'game_duration_days': 30}
+
+@st.cache_resource(show_spinner=False)
+def get_database(db_path: str = "trading_game.db") -> TradingGameDatabase:
+    """The process-wide database object: one connection and one schema check for the server's lifetime, not per rerun."""
+    return TradingGameDatabase(db_path)
 
 # Configure Streamlit page
 st.set_page_config(
@@ -486,7 +649,7 @@ st.set_page_config(
 )
 
 # Enhanced CSS with updated color palette and enhanced sidebar user info
-st.markdown("""
+APP_CSS = """
 <style>
     /* Import Google Fonts */
     @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&family=Roboto:wght@300;400;500;700&display=swap');
@@ -585,6 +748,19 @@ st.markdown("""
         transform: translateY(-4px);
     }
     
+    /* Rows of metric cards sent as one element; wraps to fewer columns on narrow screens */
+    .card-grid {
+        display: grid;
+        grid-template-columns: repeat(auto-fit, minmax(14rem, 1fr));
+        column-gap: 1rem;
+    }
+    
+    .summary-cards {
+        display: grid;
+        grid-template-columns: repeat(4, minmax(0, 1fr));
+        gap: 1rem;
+    }
+    
     .summary-card {
         background: white;
         border-radius: 12px;
@@ -1146,6 +1322,10 @@ st.markdown("""
             padding: 1rem;
         }
         
+        .summary-cards {
+            grid-template-columns: repeat(2, minmax(0, 1fr));
+        }
+        
         .summary-card {
             padding: 1.5rem;
         }
@@ -1156,13 +1336,882 @@ st.markdown("""
         }
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# Streamlit drops any element a rerun doesn't emit again, so the styles are re-sent every run
+st.markdown(APP_CSS, unsafe_allow_html=True)
+
+@st.cache_resource(show_spinner=False)
+def http_session() -> requests.Session:
+    """The process-wide HTTP session, kept as a resource so its connection pool outlives reruns."""
+    session = requests.Session()
+    # Only 429/5xx answers are retried; a host that can't be reached or times out fails at once, so
+    # the worst case stays one timeout per API and the next API is tried
+    session.mount('https://', HTTPAdapter(max_retries=Retry(total=2, connect=0, read=0, backoff_factor=0.3,
+                                                            status_forcelist=(429, 500, 502, 503, 504),
+                                                            respect_retry_after_header=False)))
+    return session
+
+# Shared HTTP session for the exchange-rate APIs
+HTTP_SESSION = http_session()
+
+# Live exchange rates are fetched at most once per TTL and shared by every session
+@st.cache_data(ttl=1800, show_spinner=False)
+def fetch_live_exchange_rates() -> Optional[Dict]:
+    """Fetch USD rates for the supported currencies from the first API that responds, or None."""
+    # Try multiple free APIs for better reliability
+    apis_to_try = [
+        "https://api.exchangerate-api.com/v4/latest/USD",
+        "https://api.fxratesapi.com/latest?base=USD",
+        "https://open.er-api.com/v6/latest/USD"
+    ]
+    
+    for api_url in apis_to_try:
+        try:
+            response = HTTP_SESSION.get(api_url, timeout=5)
+            
+            if response.status_code == 200:
+                rates = response.json().get('rates', {})
+                if rates:
+                    return {
+                        'rates': {code: rates[code] for code in ('GHS', 'KES', 'NGN', 'ZAR', 'EGP') if code in rates},
+                        'source': f"Live API: {api_url.split('//')[1].split('/')[0]}"
+                    }
+        except Exception:
+            continue  # Try next API
+    
+    return None
+
+def get_history_with_fallback(symbol: str, period: str) -> pd.DataFrame:
+    """get_history for the period, falling back to one month when Yahoo has nothing for it."""
+    hist = get_history(symbol, period)
+    if hist.empty:
+        hist = get_history(symbol, "1mo")  # Fallback
+        if hist.empty:
+            mark_bad_symbol(symbol)
+    return hist
+
+# Daily bars for live-data symbols (recent quotes, comparison charts), downloaded in batches
+# instead of one request per symbol
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_recent_history(symbols: tuple, period: str = '5d') -> Dict[str, pd.DataFrame]:
+    """OHLCV frames keyed by symbol from yf.download in chunks of 10; symbols without data are left out."""
+    histories = {}
+    for start in range(0, len(symbols), 10):
+        chunk = list(symbols[start:start + 10])
+        try:
+            frame = yf.download(chunk, period=period, group_by='ticker', progress=False, threads=True)
+        except Exception:
+            continue  # Symbols in a failed batch fall back to single-symbol lookups
+        if frame is None or frame.empty:
+            continue
+        
+        for symbol in chunk:
+            if isinstance(frame.columns, pd.MultiIndex):
+                if symbol not in frame.columns.get_level_values(0):
+                    continue
+                hist = frame[symbol]
+            else:
+                hist = frame
+            hist = hist.dropna(subset=['Close'])
+            if not hist.empty:
+                histories[symbol] = hist
+    
+    return histories
+
+class TokenBucket:
+    """Thread-safe token-bucket rate limiter: bursts up to `burst` calls, then `rate_per_sec` on average."""
+    
+    def __init__(self, rate_per_sec: float = 5.0, burst: int = 10):
+        self.rate_per_sec = rate_per_sec
+        self.burst = burst
+        self.tokens = float(burst)
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Take one token, sleeping only as long as needed for the next one to accrue."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate_per_sec)
+            self.last_refill = now
+            self.tokens -= 1
+            # A negative balance is this caller's place in the queue; later callers wait longer
+            wait = -self.tokens / self.rate_per_sec if self.tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+
+@st.cache_resource(show_spinner=False)
+def yahoo_rate_limiter() -> TokenBucket:
+    """The process-wide limiter, kept as a resource so reruns don't reset its token count."""
+    return TokenBucket(rate_per_sec=5.0, burst=10)
+
+# Paces single-symbol Yahoo lookups across all sessions in this process
+YAHOO_RATE_LIMITER = yahoo_rate_limiter()
+
+# yfinance Ticker objects and history frames shared by every rerun and session. Tickers are
+# recycled hourly because they memoize .info (previous close, market cap) for their lifetime.
+_TICKER_CACHE: Dict[str, tuple] = shared_state('tickers')
+
+_HIST_CACHE: Dict[tuple, tuple] = shared_state('history')
+
+TICKER_TTL_SECONDS = 3600
+
+HISTORY_TTL_SECONDS = 300
+
+# Symbols Yahoo recently failed or had no data for, with when that happened. Lookups for them are
+# skipped until the entry expires, so a rate-limited or mistyped ticker costs one request, not one per rerun.
+_BAD_SYMBOLS: Dict[str, float] = shared_state('bad_symbols')
+
+BAD_SYMBOL_TTL_SECONDS = 1800
+
+# How long a session reuses its last portfolio valuation and allocation chart while cash and holdings are unchanged
+PORTFOLIO_VALUE_TTL_SECONDS = 30
+
+# Quotes read the same period the research chart opens on, so the price card and the default
+# chart share one history request
+QUOTE_HISTORY_PERIOD = '3mo'
+
+# On-disk copies of yfinance responses so restarts and new sessions don't start cold. Daily
+# history includes today's in-progress bar, so it is kept for an hour rather than a day.
+FILE_CACHE = FileCache('.cache')
+
+QUOTE_DISK_TTL_SECONDS = 300
+
+HISTORY_DISK_TTL_SECONDS = 3600
+
+def mark_bad_symbol(symbol: str):
+    """Skip Yahoo lookups for a symbol until BAD_SYMBOL_TTL_SECONDS have passed."""
+    _BAD_SYMBOLS[symbol] = time.monotonic()
+
+def is_bad_symbol(symbol: str) -> bool:
+    """Whether a symbol failed recently; expired entries are dropped so it gets retried."""
+    marked_at = _BAD_SYMBOLS.get(symbol)
+    if marked_at is None:
+        return False
+    if time.monotonic() - marked_at >= BAD_SYMBOL_TTL_SECONDS:
+        _BAD_SYMBOLS.pop(symbol, None)
+        return False
+    return True
+
+def get_ticker(symbol: str) -> yf.Ticker:
+    """Shared yf.Ticker for a symbol, created on first use and replaced once it is an hour old."""
+    now = time.monotonic()
+    cached = _TICKER_CACHE.get(symbol)
+    if cached is not None and now - cached[0] < TICKER_TTL_SECONDS:
+        return cached[1]
+    ticker = yf.Ticker(symbol)
+    _TICKER_CACHE[symbol] = (now, ticker)
+    return ticker
+
+def get_history(symbol: str, period: str) -> pd.DataFrame:
+    """Ticker history for a period, from memory (5 min), then disk (1 hour), then Yahoo; empty results are not cached."""
+    now = time.monotonic()
+    cached = _HIST_CACHE.get((symbol, period))
+    if cached is None or now - cached[0] >= HISTORY_TTL_SECONDS:
+        disk_key = f'{symbol}:history:{period}'
+        hist = FILE_CACHE.get(disk_key, HISTORY_DISK_TTL_SECONDS)
+        if hist is None:
+            if is_bad_symbol(symbol):
+                return pd.DataFrame()
+            try:
+                hist = get_ticker(symbol).history(period=period)
+            except Exception:
+                mark_bad_symbol(symbol)
+                raise
+            if hist.empty:
+                return hist
+            FILE_CACHE.set(disk_key, hist)
+        cached = (now, hist)
+        _HIST_CACHE[(symbol, period)] = cached
+    # Shallow copy: callers add indicator columns without touching the shared frame
+    return cached[1].copy(deep=False)
+
+def cached_history(symbol: str, period: str) -> Optional[pd.DataFrame]:
+    """History already held in memory and under five minutes old, or None; never goes to disk or Yahoo."""
+    cached = _HIST_CACHE.get((symbol, period))
+    if cached is None or time.monotonic() - cached[0] >= HISTORY_TTL_SECONDS:
+        return None
+    return cached[1].copy(deep=False)
+
+def remember_history(symbol: str, period: str, hist: pd.DataFrame):
+    """Store history fetched elsewhere (e.g. a batch download) so single-symbol lookups reuse it."""
+    _HIST_CACHE[(symbol, period)] = (time.monotonic(), hist)
+
+def get_quote_history(symbol: str) -> pd.DataFrame:
+    """Recent daily bars for a quote: the chart's default period, then five days, then one."""
+    for period in (QUOTE_HISTORY_PERIOD, "5d", "1d"):
+        hist = get_history(symbol, period)
+        if not hist.empty:
+            break
+    else:
+        mark_bad_symbol(symbol)
+    return hist
+
+# Every tradable symbol: US stocks/ETFs, crypto pairs and the African exchanges
+AVAILABLE_STOCKS = (
+    # Large Cap Tech
+    'AAPL', 'MSFT', 'GOOGL', 'GOOG', 'AMZN', 'NVDA', 'TSLA', 'META', 'NFLX', 'ADBE',
+    'CRM', 'ORCL', 'IBM', 'INTC', 'AMD', 'QCOM', 'AVGO', 'TXN', 'AMAT', 'LRCX',
+    'NOW', 'INTU', 'PANW', 'CRWD', 'ZS', 'SNOW', 'PLTR', 'DDOG', 'OKTA', 'ZM',
+    
+    # Finance
+    'BRK-B', 'JPM', 'BAC', 'WFC', 'GS', 'MS', 'C', 'USB', 'PNC', 'TFC',
+    'COF', 'AXP', 'BLK', 'SCHW', 'SPGI', 'ICE', 'CME', 'CB', 'AIG', 'PGR',
+    'V', 'MA', 'PYPL', 'SQ', 'FIS', 'FISV', 'COIN',
+    
+    # Healthcare & Biotech
+    'UNH', 'JNJ', 'PFE', 'ABBV', 'TMO', 'ABT', 'DHR', 'BMY', 'AMGN', 'GILD',
+    'BIIB', 'REGN', 'VRTX', 'ILMN', 'ISRG', 'DXCM', 'ZTS', 'MRNA', 'BNTX', 'CVS',
+    
+    # Consumer & Retail
+    'HD', 'WMT', 'PG', 'KO', 'PEP', 'COST', 'NKE', 'SBUX', 'MCD', 'DIS',
+    'LOW', 'TJX', 'TGT', 'LULU', 'CMG', 'YUM', 'ULTA', 'ROST', 'BBY',
+    
+    # Energy
+    'XOM', 'CVX', 'COP', 'EOG', 'SLB', 'MPC', 'VLO', 'PSX', 'OXY', 'KMI',
+    
+    # ETFs
+    'SPY', 'QQQ', 'IWM', 'VTI', 'VOO', 'VEA', 'VWO', 'BND', 'AGG',
+    'XLE', 'XLF', 'XLK', 'XLV', 'XLI', 'XLU', 'XLP', 'XLY', 'XLB',
+    
+    # Cryptocurrencies (USD pairs)
+    'BTC-USD', 'ETH-USD', 'BNB-USD', 'XRP-USD', 'SOL-USD', 'ADA-USD', 'AVAX-USD',
+    'DOT-USD', 'DOGE-USD', 'SHIB-USD', 'MATIC-USD', 'LTC-USD', 'BCH-USD', 'LINK-USD',
+    'UNI-USD', 'ATOM-USD', 'XLM-USD', 'VET-USD', 'FIL-USD', 'TRX-USD', 'ETC-USD',
+    'ALGO-USD', 'MANA-USD', 'SAND-USD', 'AXS-USD', 'THETA-USD', 'AAVE-USD', 'COMP-USD',
+    'MKR-USD', 'SNX-USD', 'SUSHI-USD', 'YFI-USD', 'BAT-USD', 'ZRX-USD', 'ENJ-USD',
+    'CRV-USD', 'GALA-USD', 'CHZ-USD', 'FLOW-USD', 'ICP-USD', 'NEAR-USD', 'APT-USD',
+    'ARB-USD', 'OP-USD', 'PEPE-USD', 'FLOKI-USD', 'BONK-USD',
+    
+    # African Markets
+    # Ghana (GSE)
+    'GOIL.AC', 'ECOBANK.AC', 'CAL.AC', 'MTNGH.AC', 'GWEB.AC', 'SOGEGH.AC',
+    'AYRTN.AC', 'UNIL.AC', 'CMLT.AC', 'RBGH.AC', 'BOPP.AC', 'TOTAL.AC',
+    'GGBL.AC', 'SCBGH.AC', 'DIGP.AC', 'CLYD.AC', 'AADS.AC', 'CAPL.AC',
+    'NICO.AC', 'HORDS.AC', 'TRANSOL.AC', 'PRODUCE.AC', 'PIONEER.AC',
+    
+    # South Africa (JSE)
+    'NPN.JO', 'PRX.JO', 'ABG.JO', 'SHP.JO', 'BVT.JO', 'MTN.JO', 'VOD.JO',
+    'DSY.JO', 'TKG.JO', 'REM.JO', 'BID.JO', 'SBK.JO', 'FSR.JO', 'NED.JO',
+    'AGL.JO', 'IMP.JO', 'SOL.JO', 'CPI.JO', 'RNI.JO', 'APN.JO', 'MCG.JO',
+    'PIK.JO', 'WHL.JO', 'TBS.JO', 'GFI.JO', 'HAR.JO', 'SLM.JO', 'AMS.JO',
+    'CFR.JO', 'INP.JO', 'BTI.JO', 'ARI.JO', 'SPP.JO', 'MRP.JO', 'RBX.JO',
+    
+    # Kenya (NSE)
+    'KCB.NR', 'EQTY.NR', 'SCBK.NR', 'ABSA.NR', 'DTBK.NR', 'BAT.NR', 'EABL.NR',
+    'SAFCOM.NR', 'BRITAM.NR', 'JUBILEE.NR', 'LIBERTY.NR', 'COOP.NR', 'UNGA.NR',
+    'KAKUZI.NR', 'SASINI.NR', 'KAPCHORUA.NR', 'WILLIAMSON.NR', 'BAMBURI.NR',
+    'CROWN.NR', 'KENGEN.NR', 'KPLC.NR', 'KEGN.NR', 'KENOL.NR', 'TPS.NR',
+    'UMEME.NR', 'TOTAL.NR', 'CARBACID.NR', 'BOC.NR', 'OLYMPIA.NR', 'CENTUM.NR',
+    
+    # Nigeria (NGX)
+    'GTCO.LG', 'ZENITHBANK.LG', 'UBA.LG', 'ACCESS.LG', 'FBNH.LG', 'FIDELITYBK.LG',
+    'STERLINGNG.LG', 'WEMA.LG', 'UNITY.LG', 'STANBIC.LG', 'DANGCEM.LG', 'BUA.LG',
+    'MTNN.LG', 'AIRTELAFRI.LG', 'SEPLAT.LG', 'OANDO.LG', 'TOTAL.LG', 'CONOIL.LG',
+    'GUINNESS.LG', 'NB.LG', 'INTBREW.LG', 'NESTLE.LG', 'UNILEVER.LG', 'DANGSUGAR.LG',
+    'FLOURMILL.LG', 'HONEYFLOUR.LG', 'CADBURY.LG', 'VITAFOAM.LG', 'JBERGER.LG',
+    'LIVESTOCK.LG', 'CHIPLC.LG', 'ELLAHLAKES.LG', 'NAHCO.LG', 'RTBRISCOE.LG',
+    
+    # Egypt (EGX)
+    'CIB.CA', 'COMI.CA', 'ALEX.CA', 'ABUK.CA', 'SAIB.CA', 'ADIB.CA', 'QNBK.CA',
+    'ELSWEDY.CA', 'HRHO.CA', 'TMGH.CA', 'OTMT.CA', 'PHDC.CA', 'PALM.CA', 'MNHD.CA',
+    'MOPCO.CA', 'EGAS.CA', 'EGTS.CA', 'EGCH.CA', 'SKPC.CA', 'IRON.CA', 'EZDK.CA',
+    'AMOC.CA', 'ETEL.CA', 'ORWE.CA', 'EAST.CA', 'JUFO.CA', 'AMER.CA', 'SPMD.CA',
+    'EMFD.CA', 'CLHO.CA', 'EKHO.CA', 'DOMTY.CA', 'EDBE.CA', 'IDBE.CA', 'MTIE.CA'
+)
+
+# African exchanges and the symbols listed on each
+AFRICAN_MARKETS = {
+    "Ghana Stock Exchange (GSE)": [
+        'GOIL.AC', 'ECOBANK.AC', 'CAL.AC', 'MTNGH.AC', 'GWEB.AC', 'SOGEGH.AC',
+        'AYRTN.AC', 'UNIL.AC', 'CMLT.AC', 'RBGH.AC', 'BOPP.AC', 'TOTAL.AC',
+        'GGBL.AC', 'SCBGH.AC', 'DIGP.AC', 'CLYD.AC', 'AADS.AC', 'CAPL.AC',
+        'NICO.AC', 'HORDS.AC', 'TRANSOL.AC', 'PRODUCE.AC', 'PIONEER.AC'
+    ],
+    "Johannesburg Stock Exchange (JSE)": [
+        'NPN.JO', 'PRX.JO', 'ABG.JO', 'SHP.JO', 'BVT.JO', 'MTN.JO', 'VOD.JO',
+        'DSY.JO', 'TKG.JO', 'REM.JO', 'BID.JO', 'SBK.JO', 'FSR.JO', 'NED.JO',
+        'AGL.JO', 'IMP.JO', 'SOL.JO', 'CPI.JO', 'RNI.JO', 'APN.JO', 'MCG.JO',
+        'PIK.JO', 'WHL.JO', 'TBS.JO', 'GFI.JO', 'HAR.JO', 'SLM.JO', 'AMS.JO',
+        'CFR.JO', 'INP.JO', 'BTI.JO', 'ARI.JO', 'SPP.JO', 'MRP.JO', 'RBX.JO'
+    ],
+    "Nairobi Securities Exchange (NSE)": [
+        'KCB.NR', 'EQTY.NR', 'SCBK.NR', 'ABSA.NR', 'DTBK.NR', 'BAT.NR', 'EABL.NR',
+        'SAFCOM.NR', 'BRITAM.NR', 'JUBILEE.NR', 'LIBERTY.NR', 'COOP.NR', 'UNGA.NR',
+        'KAKUZI.NR', 'SASINI.NR', 'KAPCHORUA.NR', 'WILLIAMSON.NR', 'BAMBURI.NR',
+        'CROWN.NR', 'KENGEN.NR', 'KPLC.NR', 'KEGN.NR', 'KENOL.NR', 'TPS.NR',
+        'UMEME.NR', 'TOTAL.NR', 'CARBACID.NR', 'BOC.NR', 'OLYMPIA.NR', 'CENTUM.NR'
+    ],
+    "Nigerian Exchange (NGX)": [
+        'GTCO.LG', 'ZENITHBANK.LG', 'UBA.LG', 'ACCESS.LG', 'FBNH.LG', 'FIDELITYBK.LG',
+        'STERLINGNG.LG', 'WEMA.LG', 'UNITY.LG', 'STANBIC.LG', 'DANGCEM.LG', 'BUA.LG',
+        'MTNN.LG', 'AIRTELAFRI.LG', 'SEPLAT.LG', 'OANDO.LG', 'TOTAL.LG', 'CONOIL.LG',
+        'GUINNESS.LG', 'NB.LG', 'INTBREW.LG', 'NESTLE.LG', 'UNILEVER.LG', 'DANGSUGAR.LG',
+        'FLOURMILL.LG', 'HONEYFLOUR.LG', 'CADBURY.LG', 'VITAFOAM.LG', 'JBERGER.LG',
+        'LIVESTOCK.LG', 'CHIPLC.LG', 'ELLAHLAKES.LG', 'NAHCO.LG', 'RTBRISCOE.LG'
+    ],
+    "Egyptian Exchange (EGX)": [
+        'CIB.CA', 'COMI.CA', 'ALEX.CA', 'ABUK.CA', 'SAIB.CA', 'ADIB.CA', 'QNBK.CA',
+        'ELSWEDY.CA', 'HRHO.CA', 'TMGH.CA', 'OTMT.CA', 'PHDC.CA', 'PALM.CA', 'MNHD.CA',
+        'MOPCO.CA', 'EGAS.CA', 'EGTS.CA', 'EGCH.CA', 'SKPC.CA', 'IRON.CA', 'EZDK.CA',
+        'AMOC.CA', 'ETEL.CA', 'ORWE.CA', 'EAST.CA', 'JUFO.CA', 'AMER.CA', 'SPMD.CA',
+        'EMFD.CA', 'CLHO.CA', 'EKHO.CA', 'DOMTY.CA', 'EDBE.CA', 'IDBE.CA', 'MTIE.CA'
+    ]
+}
+
+# Exchange names for the African market selector, in display order
+AFRICAN_MARKET_NAMES = tuple(AFRICAN_MARKETS)
+
+# Display names for African-listed symbols
+AFRICAN_STOCK_NAMES = {
+    # Ghana
+    'GOIL.AC': 'Ghana Oil Company Limited',
+    'ECOBANK.AC': 'Ecobank Ghana Limited',
+    'CAL.AC': 'CAL Bank Limited',
+    'MTNGH.AC': 'MTN Ghana Limited',
+    'GWEB.AC': 'Golden Web Limited',
+    'SOGEGH.AC': 'Societe Generale Ghana',
+    'AYRTN.AC': 'Ayrton Drug Manufacturing',
+    'UNIL.AC': 'Unilever Ghana Limited',
+    'CMLT.AC': 'Camelot Ghana Limited',
+    'RBGH.AC': 'Republic Bank Ghana',
+    'BOPP.AC': 'Benso Oil Palm Plantation',
+    'TOTAL.AC': 'Total Petroleum Ghana',
+    'GGBL.AC': 'Ghana Breweries Limited',
+    'SCBGH.AC': 'Standard Chartered Bank Ghana',
+    'DIGP.AC': 'Dalex Finance & Leasing',
+    'CLYD.AC': 'Clydestone Ghana Limited',
+    'AADS.AC': 'Aluworks Limited',
+    'CAPL.AC': 'Cocoa Processing Company',
+    'NICO.AC': 'NICO Insurance Company',
+    'HORDS.AC': 'Hords Investment Limited',
+    'TRANSOL.AC': 'Transol Solutions Limited',
+    'PRODUCE.AC': 'Produce Buying Company',
+    'PIONEER.AC': 'Pioneer Kitchenware Limited',
+    
+    # South Africa
+    'NPN.JO': 'Naspers Limited',
+    'PRX.JO': 'Prosus NV',
+    'ABG.JO': 'Absa Group Limited',
+    'SHP.JO': 'Shoprite Holdings Limited',
+    'BVT.JO': 'Bidvest Group Limited',
+    'MTN.JO': 'MTN Group Limited',
+    'VOD.JO': 'Vodacom Group Limited',
+    'DSY.JO': 'Discovery Limited',
+    'TKG.JO': 'Telkom SA SOC Limited',
+    'REM.JO': 'Remgro Limited',
+    'BID.JO': 'Bid Corporation Limited',
+    'SBK.JO': 'Standard Bank Group Limited',
+    'FSR.JO': 'FirstRand Limited',
+    'NED.JO': 'Nedbank Group Limited',
+    'AGL.JO': 'Anglo American plc',
+    'IMP.JO': 'Impala Platinum Holdings Limited',
+    'SOL.JO': 'Sasol Limited',
+    'CPI.JO': 'Capitec Bank Holdings Limited',
+    'RNI.JO': 'Reinet Investments SCA',
+    'APN.JO': 'Aspen Pharmacare Holdings Limited',
+    'MCG.JO': 'Multichoice Group Limited',
+    'PIK.JO': 'Pick n Pay Stores Limited',
+    'WHL.JO': 'Woolworths Holdings Limited',
+    'TBS.JO': 'Tiger Brands Limited',
+    'GFI.JO': 'Gold Fields Limited',
+    'HAR.JO': 'Harmony Gold Mining Company Limited',
+    'SLM.JO': 'Sanlam Limited',
+    'AMS.JO': 'Anglo American Platinum Limited',
+    'CFR.JO': 'Cartrack Holdings Limited',
+    'INP.JO': 'Investec plc',
+    'BTI.JO': 'Brait SE',
+    'ARI.JO': 'African Rainbow Minerals Limited',
+    'SPP.JO': 'Spar Group Limited',
+    'MRP.JO': 'Mr Price Group Limited',
+    'RBX.JO': 'Raubex Group Limited',
+    
+    # Kenya
+    'KCB.NR': 'KCB Group Limited',
+    'EQTY.NR': 'Equity Group Holdings Limited',
+    'SCBK.NR': 'Standard Chartered Bank Kenya Limited',
+    'ABSA.NR': 'Absa Bank Kenya Limited',
+    'DTBK.NR': 'Diamond Trust Bank Kenya Limited',
+    'BAT.NR': 'British American Tobacco Kenya Limited',
+    'EABL.NR': 'East African Breweries Limited',
+    'SAFCOM.NR': 'Safaricom Limited',
+    'BRITAM.NR': 'Britam Holdings Limited',
+    'JUBILEE.NR': 'Jubilee Holdings Limited',
+    'LIBERTY.NR': 'Liberty Kenya Holdings Limited',
+    'COOP.NR': 'Co-operative Bank of Kenya Limited',
+    'UNGA.NR': 'Unga Group Limited',
+    'KAKUZI.NR': 'Kakuzi Limited',
+    'SASINI.NR': 'Sasini Limited',
+    'KAPCHORUA.NR': 'Kapchorua Tea Company Limited',
+    'WILLIAMSON.NR': 'Williamson Tea Kenya Limited',
+    'BAMBURI.NR': 'Bamburi Cement Limited',
+    'CROWN.NR': 'Crown Berger Limited',
+    'KENGEN.NR': 'Kenya Electricity Generating Company Limited',
+    'KPLC.NR': 'Kenya Power and Lighting Company Limited',
+    'KEGN.NR': 'KenGen Limited',
+    'KENOL.NR': 'KenolKobil Limited',
+    'TPS.NR': 'TPS Eastern Africa Limited',
+    'UMEME.NR': 'Umeme Limited',
+    'TOTAL.NR': 'Total Kenya Limited',
+    'CARBACID.NR': 'Carbacid Investments Limited',
+    'BOC.NR': 'BOC Kenya Limited',
+    'OLYMPIA.NR': 'Olympia Capital Holdings Limited',
+    'CENTUM.NR': 'Centum Investment Company Limited',
+    
+    # Nigeria
+    'GTCO.LG': 'Guaranty Trust Holding Company Plc',
+    'ZENITHBANK.LG': 'Zenith Bank Plc',
+    'UBA.LG': 'United Bank for Africa Plc',
+    'ACCESS.LG': 'Access Holdings Plc',
+    'FBNH.LG': 'FBN Holdings Plc',
+    'FIDELITYBK.LG': 'Fidelity Bank Plc',
+    'STERLINGNG.LG': 'Sterling Bank Plc',
+    'WEMA.LG': 'Wema Bank Plc',
+    'UNITY.LG': 'Unity Bank Plc',
+    'STANBIC.LG': 'Stanbic IBTC Holdings Plc',
+    'DANGCEM.LG': 'Dangote Cement Plc',
+    'BUA.LG': 'BUA Cement Plc',
+    'MTNN.LG': 'MTN Nigeria Communications Plc',
+    'AIRTELAFRI.LG': 'Airtel Africa Plc',
+    'SEPLAT.LG': 'Seplat Petroleum Development Company Plc',
+    'OANDO.LG': 'Oando Plc',
+    'TOTAL.LG': 'Total Nigeria Plc',
+    'CONOIL.LG': 'Conoil Plc',
+    'GUINNESS.LG': 'Guinness Nigeria Plc',
+    'NB.LG': 'Nigerian Breweries Plc',
+    'INTBREW.LG': 'International Breweries Plc',
+    'NESTLE.LG': 'Nestle Nigeria Plc',
+    'UNILEVER.LG': 'Unilever Nigeria Plc',
+    'DANGSUGAR.LG': 'Dangote Sugar Refinery Plc',
+    'FLOURMILL.LG': 'Flour Mills of Nigeria Plc',
+    'HONEYFLOUR.LG': 'Honeywell Flour Mill Plc',
+    'CADBURY.LG': 'Cadbury Nigeria Plc',
+    'VITAFOAM.LG': 'Vitafoam Nigeria Plc',
+    'JBERGER.LG': 'Julius Berger Nigeria Plc',
+    'LIVESTOCK.LG': 'Livestock Feeds Plc',
+    'CHIPLC.LG': 'Champion Breweries Plc',
+    'ELLAHLAKES.LG': 'Ellah Lakes Plc',
+    'NAHCO.LG': 'Nigerian Aviation Handling Company Plc',
+    'RTBRISCOE.LG': 'RT Briscoe Plc',
+    
+    # Egypt
+    'CIB.CA': 'Commercial International Bank Egypt',
+    'COMI.CA': 'Commercial Bank of Egypt',
+    'ALEX.CA': 'Bank of Alexandria',
+    'ABUK.CA': 'Arab Bank of Egypt',
+    'SAIB.CA': 'Suez Canal Bank',
+    'ADIB.CA': 'Abu Dhabi Islamic Bank Egypt',
+    'QNBK.CA': 'QNB Egypt',
+    'ELSWEDY.CA': 'El Sewedy Electric Company',
+    'HRHO.CA': 'Hassan Allam Holding',
+    'TMGH.CA': 'TMG Holding',
+    'OTMT.CA': 'Orascom Telecom Media Technology',
+    'PHDC.CA': 'Palm Hills Developments',
+    'PALM.CA': 'Palm Trees Development Company',
+    'MNHD.CA': 'Madinet Nasr Housing and Development',
+    'MOPCO.CA': 'Middle East Oil Refinery',
+    'EGAS.CA': 'Egyptian Gas Company',
+    'EGTS.CA': 'Egyptian Gulf Company',
+    'EGCH.CA': 'Egyptian Chemicals Company',
+    'SKPC.CA': 'Suez Canal Container Terminal',
+    'IRON.CA': 'Iron & Steel for Mines and Quarries',
+    'EZDK.CA': 'Ezz Dekheila Steel Company',
+    'AMOC.CA': 'Arab Moltaka Investment Company',
+    'ETEL.CA': 'Egyptian Telecommunications Company',
+    'ORWE.CA': 'Orascom West El Balad',
+    'EAST.CA': 'Eastern Company',
+    'JUFO.CA': 'Juhayna Food Industries',
+    'AMER.CA': 'Amer Group Holding',
+    'SPMD.CA': 'Sphinx Medical Development',
+    'EMFD.CA': 'Egyptian Media Production City',
+    'CLHO.CA': 'Cairo for Hotels Company',
+    'EKHO.CA': 'Egyptian Kuwaiti Holding Company',
+    'DOMTY.CA': 'Domty Company',
+    'EDBE.CA': 'Egyptian Drugs and Beverages Company',
+    'IDBE.CA': 'Egyptian Drinks and Beverages Company',
+    'MTIE.CA': 'Misr for Trade and Investment Company'
+}
+
+# African exchange country by exchange suffix (the part after the last '.')
+SUFFIX_COUNTRIES = {
+    'AC': 'Ghana',
+    'JO': 'South Africa',
+    'NR': 'Kenya',
+    'LG': 'Nigeria',
+    'CA': 'Egypt'
+}
+
+# Readable names for crypto tickers (without the -USD suffix) when Yahoo only returns the ticker
+CRYPTO_LONG_NAMES = {
+    'BTC': 'Bitcoin',
+    'ETH': 'Ethereum',
+    'BNB': 'Binance Coin',
+    'XRP': 'XRP',
+    'SOL': 'Solana',
+    'ADA': 'Cardano',
+    'AVAX': 'Avalanche',
+    'DOT': 'Polkadot',
+    'DOGE': 'Dogecoin',
+    'SHIB': 'Shiba Inu',
+    'MATIC': 'Polygon',
+    'LTC': 'Litecoin',
+    'BCH': 'Bitcoin Cash',
+    'LINK': 'Chainlink',
+    'UNI': 'Uniswap',
+    'ATOM': 'Cosmos',
+    'XLM': 'Stellar',
+    'VET': 'VeChain',
+    'FIL': 'Filecoin',
+    'TRX': 'TRON',
+    'ETC': 'Ethereum Classic',
+    'ALGO': 'Algorand',
+    'MANA': 'Decentraland',
+    'SAND': 'The Sandbox',
+    'AXS': 'Axie Infinity',
+    'THETA': 'Theta Network',
+    'AAVE': 'Aave',
+    'COMP': 'Compound',
+    'MKR': 'Maker',
+    'SNX': 'Synthetix',
+    'SUSHI': 'SushiSwap',
+    'YFI': 'yearn.finance',
+    'BAT': 'Basic Attention Token',
+    'ZRX': '0x Protocol',
+    'ENJ': 'Enjin Coin',
+    'CRV': 'Curve DAO',
+    'GALA': 'Gala',
+    'CHZ': 'Chiliz',
+    'FLOW': 'Flow',
+    'ICP': 'Internet Computer',
+    'NEAR': 'NEAR Protocol',
+    'APT': 'Aptos',
+    'ARB': 'Arbitrum',
+    'OP': 'Optimism',
+    'PEPE': 'Pepe',
+    'FLOKI': 'Floki Inu',
+    'BONK': 'Bonk'
+}
+
+# Asset names are cut to these lengths once, when a quote or database row is built, instead of
+# being sliced again by every table that shows them
+NAME_MAX_LENGTH = 50
+
+SHORT_NAME_LENGTH = 25
+
+# Display symbols for trading currencies; the larger-unit currencies are shown without decimals
+CURRENCY_SYMBOLS = {'USD': '$', 'GHS': '₵', 'KES': 'KSh', 'NGN': '₦', 'ZAR': 'R', 'EGP': 'E£'}
+
+WHOLE_UNIT_CURRENCIES = ('KES', 'NGN')
+
+# Line colours for the multi-asset comparison chart, reused in order
+COMPARISON_COLORS = ('#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#7f7f7f')
+
+# Trading currency by exchange suffix (the part after the last '.')
+SUFFIX_CURRENCIES = {
+    'AC': 'GHS',  # Ghana Cedi
+    'JO': 'ZAR',  # South African Rand
+    'NR': 'KES',  # Kenyan Shilling
+    'LG': 'NGN',  # Nigerian Naira
+    'CA': 'EGP'   # Egyptian Pound
+}
+
+# Mock market parameters; base prices in local currencies (realistic values)
+GHANA_STOCKS = {
+    'GOIL.AC': {'base_price': 25.50, 'volatility': 0.02, 'trend': 0.001},
+    'ECOBANK.AC': {'base_price': 74.25, 'volatility': 0.025, 'trend': 0.0005},
+    'CAL.AC': {'base_price': 10.88, 'volatility': 0.03, 'trend': -0.001},
+    'MTNGH.AC': {'base_price': 15.36, 'volatility': 0.02, 'trend': 0.002},
+    'GWEB.AC': {'base_price': 5.76, 'volatility': 0.04, 'trend': 0.001},
+    'SOGEGH.AC': {'base_price': 23.68, 'volatility': 0.02, 'trend': 0.0005},
+    'AYRTN.AC': {'base_price': 9.60, 'volatility': 0.03, 'trend': -0.0005},
+    'UNIL.AC': {'base_price': 236.80, 'volatility': 0.015, 'trend': 0.001},
+    'CMLT.AC': {'base_price': 12.16, 'volatility': 0.035, 'trend': 0.002},
+    'RBGH.AC': {'base_price': 8.32, 'volatility': 0.025, 'trend': 0.0005},
+    'BOPP.AC': {'base_price': 30.72, 'volatility': 0.03, 'trend': 0.001},
+    'TOTAL.AC': {'base_price': 48.64, 'volatility': 0.02, 'trend': 0.0005},
+    'GGBL.AC': {'base_price': 22.40, 'volatility': 0.025, 'trend': 0.001},
+    'SCBGH.AC': {'base_price': 194.56, 'volatility': 0.02, 'trend': 0.0005},
+    'DIGP.AC': {'base_price': 3.20, 'volatility': 0.05, 'trend': -0.001},
+    'CLYD.AC': {'base_price': 4.48, 'volatility': 0.04, 'trend': 0.002},
+    'AADS.AC': {'base_price': 7.04, 'volatility': 0.035, 'trend': 0.001},
+    'CAPL.AC': {'base_price': 5.76, 'volatility': 0.03, 'trend': 0.0005},
+    'NICO.AC': {'base_price': 12.16, 'volatility': 0.025, 'trend': 0.001},
+    'HORDS.AC': {'base_price': 1.92, 'volatility': 0.06, 'trend': 0.003},
+    'TRANSOL.AC': {'base_price': 3.20, 'volatility': 0.05, 'trend': 0.002},
+    'PRODUCE.AC': {'base_price': 4.48, 'volatility': 0.04, 'trend': 0.001},
+    'PIONEER.AC': {'base_price': 10.88, 'volatility': 0.03, 'trend': 0.0015}
+}
+
+# Initialize Kenya stocks data (in KES)
+KENYA_STOCKS = {
+    'KCB.NR': {'base_price': 7189.00, 'volatility': 0.025, 'trend': 0.001},
+    'EQTY.NR': {'base_price': 8334.50, 'volatility': 0.03, 'trend': 0.002},
+    'SCBK.NR': {'base_price': 25596.00, 'volatility': 0.02, 'trend': 0.0005},
+    'ABSA.NR': {'base_price': 2030.30, 'volatility': 0.025, 'trend': 0.001},
+    'DTBK.NR': {'base_price': 13035.00, 'volatility': 0.03, 'trend': 0.0015},
+    'BAT.NR': {'base_price': 76630.00, 'volatility': 0.02, 'trend': 0.001},
+    'EABL.NR': {'base_price': 30810.00, 'volatility': 0.025, 'trend': 0.0005},
+    'SAFCOM.NR': {'base_price': 4503.00, 'volatility': 0.02, 'trend': 0.002},
+    'BRITAM.NR': {'base_price': 1019.10, 'volatility': 0.035, 'trend': 0.001},
+    'JUBILEE.NR': {'base_price': 38710.00, 'volatility': 0.03, 'trend': 0.0015},
+    'LIBERTY.NR': {'base_price': 1382.50, 'volatility': 0.04, 'trend': 0.002},
+    'COOP.NR': {'base_price': 2243.60, 'volatility': 0.025, 'trend': 0.001},
+    'UNGA.NR': {'base_price': 6083.00, 'volatility': 0.035, 'trend': 0.0005},
+    'KAKUZI.NR': {'base_price': 67150.00, 'volatility': 0.04, 'trend': 0.002},
+    'SASINI.NR': {'base_price': 1975.00, 'volatility': 0.05, 'trend': 0.001},
+    'KAPCHORUA.NR': {'base_price': 22910.00, 'volatility': 0.045, 'trend': 0.0015},
+    'WILLIAMSON.NR': {'base_price': 6715.00, 'volatility': 0.04, 'trend': 0.001},
+    'BAMBURI.NR': {'base_price': 9164.00, 'volatility': 0.03, 'trend': 0.0005},
+    'CROWN.NR': {'base_price': 3910.50, 'volatility': 0.035, 'trend': 0.001},
+    'KENGEN.NR': {'base_price': 448.72, 'volatility': 0.025, 'trend': 0.0005},
+    'KPLC.NR': {'base_price': 292.30, 'volatility': 0.04, 'trend': -0.001},
+    'KEGN.NR': {'base_price': 466.10, 'volatility': 0.03, 'trend': 0.001},
+    'KENOL.NR': {'base_price': 3555.00, 'volatility': 0.03, 'trend': 0.0015},
+    'TPS.NR': {'base_price': 197.50, 'volatility': 0.05, 'trend': 0.002},
+    'UMEME.NR': {'base_price': 7110.00, 'volatility': 0.025, 'trend': 0.001},
+    'TOTAL.NR': {'base_price': 2923.00, 'volatility': 0.02, 'trend': 0.0005},
+    'CARBACID.NR': {'base_price': 1240.30, 'volatility': 0.035, 'trend': 0.001},
+    'BOC.NR': {'base_price': 6636.00, 'volatility': 0.03, 'trend': 0.0015},
+    'OLYMPIA.NR': {'base_price': 829.50, 'volatility': 0.04, 'trend': 0.002},
+    'CENTUM.NR': {'base_price': 2962.50, 'volatility': 0.035, 'trend': 0.001}
+}
+
+# Initialize Nigeria stocks data (in NGN)
+NIGERIA_STOCKS = {
+    'GTCO.LG': {'base_price': 45600.00, 'volatility': 0.025, 'trend': 0.001},
+    'ZENITHBANK.LG': {'base_price': 39600.00, 'volatility': 0.03, 'trend': 0.0015},
+    'UBA.LG': {'base_price': 25360.00, 'volatility': 0.025, 'trend': 0.001},
+    'ACCESS.LG': {'base_price': 19920.00, 'volatility': 0.03, 'trend': 0.002},
+    'FBNH.LG': {'base_price': 29120.00, 'volatility': 0.035, 'trend': 0.0005},
+    'FIDELITYBK.LG': {'base_price': 14000.00, 'volatility': 0.03, 'trend': 0.001},
+    'STERLINGNG.LG': {'base_price': 3920.00, 'volatility': 0.04, 'trend': 0.0015},
+    'WEMA.LG': {'base_price': 8400.00, 'volatility': 0.035, 'trend': 0.001},
+    'UNITY.LG': {'base_price': 2960.00, 'volatility': 0.05, 'trend': 0.002},
+    'STANBIC.LG': {'base_price': 68000.00, 'volatility': 0.025, 'trend': 0.0005},
+    'DANGCEM.LG': {'base_price': 456000.00, 'volatility': 0.02, 'trend': 0.001},
+    'BUA.LG': {'base_price': 152800.00, 'volatility': 0.025, 'trend': 0.0015},
+    'MTNN.LG': {'base_price': 296000.00, 'volatility': 0.02, 'trend': 0.001},
+    'AIRTELAFRI.LG': {'base_price': 2960000.00, 'volatility': 0.025, 'trend': 0.002},
+    'SEPLAT.LG': {'base_price': 2000000.00, 'volatility': 0.03, 'trend': 0.0005},
+    'OANDO.LG': {'base_price': 13520.00, 'volatility': 0.04, 'trend': 0.001},
+    'TOTAL.LG': {'base_price': 776000.00, 'volatility': 0.02, 'trend': 0.0005},
+    'CONOIL.LG': {'base_price': 56800.00, 'volatility': 0.03, 'trend': 0.001},
+    'GUINNESS.LG': {'base_price': 78000.00, 'volatility': 0.025, 'trend': 0.0015},
+    'NB.LG': {'base_price': 104000.00, 'volatility': 0.025, 'trend': 0.001},
+    'INTBREW.LG': {'base_price': 9360.00, 'volatility': 0.035, 'trend': 0.002},
+    'NESTLE.LG': {'base_price': 2376000.00, 'volatility': 0.015, 'trend': 0.001},
+    'UNILEVER.LG': {'base_price': 26000.00, 'volatility': 0.025, 'trend': 0.0005},
+    'DANGSUGAR.LG': {'base_price': 29600.00, 'volatility': 0.03, 'trend': 0.001},
+    'FLOURMILL.LG': {'base_price': 52400.00, 'volatility': 0.025, 'trend': 0.0015},
+    'HONEYFLOUR.LG': {'base_price': 6800.00, 'volatility': 0.04, 'trend': 0.002},
+    'CADBURY.LG': {'base_price': 20560.00, 'volatility': 0.03, 'trend': 0.001},
+    'VITAFOAM.LG': {'base_price': 24800.00, 'volatility': 0.035, 'trend': 0.0005},
+    'JBERGER.LG': {'base_price': 61200.00, 'volatility': 0.025, 'trend': 0.001},
+    'LIVESTOCK.LG': {'base_price': 3920.00, 'volatility': 0.05, 'trend': 0.002},
+    'CHIPLC.LG': {'base_price': 1360.00, 'volatility': 0.06, 'trend': 0.003},
+    'ELLAHLAKES.LG': {'base_price': 7600.00, 'volatility': 0.045, 'trend': 0.0015},
+    'NAHCO.LG': {'base_price': 13600.00, 'volatility': 0.04, 'trend': 0.001},
+    'RTBRISCOE.LG': {'base_price': 880.00, 'volatility': 0.055, 'trend': 0.002}
+}
+
+# Exchange suffixes served from simulated (mock) markets, and the market each belongs to.
+# These suffix tables feed classify_symbol, the single place a symbol's suffix is parsed.
+MOCK_MARKET_SUFFIXES = {'AC': 'ghana', 'NR': 'kenya', 'LG': 'nigeria'}
+
+class AssetKind(IntEnum):
+    """Small tag for what a symbol is, so label lookups are one dict fetch instead of branch chains."""
+    CRYPTO = 0
+    GHANA = 1
+    KENYA = 2
+    NIGERIA = 3
+    AFRICAN_OTHER = 4
+    STOCK = 5
+
+MOCK_MARKET_KINDS = {'ghana': AssetKind.GHANA, 'kenya': AssetKind.KENYA, 'nigeria': AssetKind.NIGERIA}
+
+# (type label, short label, chart title) per kind; live African listings add their country to the chart title
+ASSET_KIND_LABELS = {
+    AssetKind.CRYPTO: ('Cryptocurrency', 'CRYPTO', 'Cryptocurrency'),
+    AssetKind.GHANA: ('African Stock', 'AFRICAN', 'Ghana Stock Exchange (GSE) - Live Mock Data'),
+    AssetKind.KENYA: ('African Stock', 'AFRICAN', 'Kenya NSE - Live Mock Data'),
+    AssetKind.NIGERIA: ('African Stock', 'AFRICAN', 'Nigeria NGX - Live Mock Data'),
+    AssetKind.AFRICAN_OTHER: ('African Stock', 'AFRICAN', 'African Stock - {country}'),
+    AssetKind.STOCK: ('Stock', 'STOCK', 'Stock')
+}
+
+@dataclass(frozen=True, slots=True)
+class SymbolMeta:
+    """Everything the UI derives from a symbol's suffix, worked out once per symbol."""
+    symbol: str
+    kind: AssetKind
+    is_crypto: bool
+    is_african: bool
+    mock_market: Optional[str]
+    country: Optional[str]
+    currency: str
+    display_name: str
+    type_label: str
+    short_label: str
+    chart_label: str
+    legend_label: str
+    
+    @property
+    def is_mock(self) -> bool:
+        return self.mock_market is not None
+
+# SymbolMeta per symbol, shared by every rerun and session (symbols never change kind). Entries can come
+# from an earlier run's AssetKind class, so kinds are compared with ==, never `is`.
+_SYMBOL_META: Dict[str, SymbolMeta] = shared_state('symbol_meta')
+
+SYMBOL_META_LIMIT = 4096
+
+def classify_symbol(symbol: str) -> SymbolMeta:
+    """Asset kind, market, currency and display labels for a symbol, worked out once per process."""
+    meta = _SYMBOL_META.get(symbol)
+    if meta is None:
+        meta = _classify_symbol(symbol)
+        # Searches can produce arbitrary symbols, so the memo stops growing at the limit
+        if len(_SYMBOL_META) < SYMBOL_META_LIMIT:
+            _SYMBOL_META[symbol] = meta
+    return meta
+
+def _classify_symbol(symbol: str) -> SymbolMeta:
+    """Build a symbol's SymbolMeta from its suffix."""
+    _, dot, suffix = symbol.rpartition('.')
+    suffix = suffix if dot else ''
+    is_crypto = symbol.endswith('-USD')
+    country = SUFFIX_COUNTRIES.get(suffix)
+    mock_market = MOCK_MARKET_SUFFIXES.get(suffix)
+    if is_crypto:
+        kind = AssetKind.CRYPTO
+    elif country:
+        kind = MOCK_MARKET_KINDS[mock_market] if mock_market else AssetKind.AFRICAN_OTHER
+    else:
+        kind = AssetKind.STOCK
+    type_label, short_label, chart_label = ASSET_KIND_LABELS[kind]
+    display_name = symbol.replace('-USD', '') if is_crypto else symbol
+    return SymbolMeta(
+        symbol=symbol,
+        kind=kind,
+        is_crypto=is_crypto,
+        is_african=country is not None,
+        mock_market=mock_market,
+        country=country,
+        currency=SUFFIX_CURRENCIES.get(suffix, 'USD'),
+        display_name=display_name,
+        type_label=type_label,
+        short_label=short_label,
+        chart_label=chart_label.format(country=country),
+        # Live African listings also show their country in chart legends
+        legend_label=f"{symbol} ({country})" if kind == AssetKind.AFRICAN_OTHER else display_name
+    )
+
+@st.cache_resource(show_spinner=False)
+def asset_type_filters() -> Dict[str, tuple]:
+    """Tradable symbols split by asset type, built once per process rather than on every rerun."""
+    stocks = tuple(symbol for symbol in AVAILABLE_STOCKS if classify_symbol(symbol).kind == AssetKind.STOCK)
+    crypto = tuple(symbol for symbol in AVAILABLE_STOCKS if classify_symbol(symbol).is_crypto)
+    african = tuple(symbol for symbol in AVAILABLE_STOCKS if classify_symbol(symbol).is_african)
+    return {'Stocks & ETFs': stocks, 'US Stocks': stocks, 'Cryptocurrencies': crypto, 'African Markets': african}
+
+# Filter option label -> symbols for the research, screener and trade filters; labels not listed
+# here ("All Assets", "All Markets") mean every symbol
+ASSET_TYPE_FILTERS = asset_type_filters()
+
+# Trades listed on the history page, newest first
+TRADE_HISTORY_LIMIT = 100
+
+# Leaderboard rank labels for the podium places; other ranks are shown as "<n>th"
+LEADERBOARD_RANK_LABELS = {1: '1st', 2: '2nd', 3: '3rd'}
+
+# Assets shown in the trade page's Market Movers panel
+TRENDING_ASSETS = ('AAPL', 'TSLA', 'BTC-USD', 'ETH-USD', 'MTNGH.AC', 'SAFCOM.NR')
+
+# Asset pickers list at most this many symbols
+ASSET_SELECT_LIMIT = 100
+
+# Both helpers are keyed by the filter label and search text (short strings), not the symbol tuples,
+# so a cache hit never rehashes a bucket. They are resources, not lru_caches, so reruns get the very same
+# objects; the position maps are shared, so callers only read them.
+@st.cache_resource(max_entries=256, show_spinner=False)
+def asset_select_options(filter_label: str, query: str = '') -> tuple:
+    """Selectbox options for a filter: a blank choice, then the first ASSET_SELECT_LIMIT symbols containing the search text."""
+    symbols = ASSET_TYPE_FILTERS.get(filter_label, AVAILABLE_STOCKS)
+    query = query.strip().upper()
+    matches = [symbol for symbol in symbols if query in symbol] if query else symbols
+    return ('', *matches[:ASSET_SELECT_LIMIT])
+
+@st.cache_resource(max_entries=256, show_spinner=False)
+def asset_option_positions(filter_label: str, query: str = '') -> Dict[str, int]:
+    """Symbol -> position in asset_select_options for the same filter and search text."""
+    return {symbol: i for i, symbol in enumerate(asset_select_options(filter_label, query))}
+
+# Days of history covered by each chart period
+PERIOD_DAYS = {'1mo': 30, '3mo': 90, '6mo': 180, '1y': 365, '2y': 730, '5y': 1825}
+
+# Chart period choices: selector label -> yfinance period
+CHART_PERIODS = {'1 Month': '1mo', '3 Months': '3mo', '6 Months': '6mo', '1 Year': '1y', '2 Years': '2y'}
+
+CHART_PERIOD_LABELS = tuple(CHART_PERIODS)
+
+# Mock exchange sessions: hours offset from server time and (open, close) in local hours
+MARKET_UTC_OFFSETS = {'ghana': 0, 'kenya': 3, 'nigeria': 1}
+
+MARKET_HOURS = {'ghana': (9, 15), 'kenya': (9, 15), 'nigeria': (10, 14.5)}
+
+@lru_cache(maxsize=32)
+def market_session(market: str, minute: datetime) -> tuple:
+    """(is_weekday, is_trading_hours, volatility_multiplier) for a market at a minute-truncated time."""
+    if market not in MARKET_HOURS:
+        return True, True, 1.0
+    local_time = minute + timedelta(hours=MARKET_UTC_OFFSETS[market])
+    open_hour, close_hour = MARKET_HOURS[market]
+    is_weekday = local_time.weekday() < 5
+    is_trading_hours = open_hour <= local_time.hour + local_time.minute / 60 < close_hour
+    # Outside trading hours prices move with smaller steps
+    return is_weekday, is_trading_hours, 1.0 if (is_weekday and is_trading_hours) else 0.3
+
+def step_mock_prices(prices: np.ndarray, volatilities: np.ndarray, trends: np.ndarray,
+                     noise: np.ndarray, multiplier: float) -> np.ndarray:
+    """One random-walk tick for a market: (N(0, vol*m) + trend*m) * price, floored at 0.01."""
+    return np.maximum(0.01, prices * (1.0 + (noise * volatilities + trends) * multiplier))
+
+def simple_moving_average(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean via cumulative sums; NaN until a window fills or while it holds a NaN, as with rolling().mean()."""
+    valid = ~np.isnan(values)
+    # Missing closes add nothing to the running sum, and the valid count marks the windows they fall in
+    sums = np.concatenate(([0.0], np.cumsum(np.where(valid, values, 0.0))))
+    counts = np.concatenate(([0], np.cumsum(valid)))
+    sma = np.full(len(values), np.nan)
+    full = counts[window:] - counts[:-window] == window
+    sma[window - 1:] = np.where(full, (sums[window:] - sums[:-window]) / window, np.nan)
+    return sma
+
+def latest_rsi(closes: np.ndarray, period: int = 14) -> float:
+    """RSI of the last bar from simple averages of the last `period` gains and losses; NaN if undefined."""
+    deltas = np.diff(closes[-(period + 1):])
+    gain = deltas[deltas > 0].sum() / period
+    loss = -deltas[deltas < 0].sum() / period
+    if loss == 0:
+        return 100.0 if gain > 0 else float('nan')
+    return 100 - 100 / (1 + gain / loss)
 
 class TradingSimulator:
     def __init__(self):
-        self.db = TradingGameDatabase()
+        self.db = get_database()
         self.initialize_session_state()
         self.available_stocks = self.get_available_stocks()
+        self._rng = np.random.default_rng()
+        # Mock symbols already brought up to date during this script run (the simulator is rebuilt every rerun)
+        self._refreshed_symbols = set()
+        # Set once main() has rendered the page; fragment reruns after that reuse this simulator
+        self._run_finished = False
+        # Quote failures from this run, shown together by report_fetch_errors instead of one warning each
+        self.fetch_errors: List[str] = []
+        # Portfolios already read during this run, by user id (a trade is always followed by st.rerun)
+        self._portfolios: Dict[str, List[Dict]] = {}
+        self._positions: Dict[str, Dict[str, Dict]] = {}
         self.initialize_exchange_rates()
         self.initialize_all_mock_data()
         
@@ -1172,6 +2221,9 @@ class TradingSimulator:
             st.session_state.current_user = None
         if 'logged_in' not in st.session_state:
             st.session_state.logged_in = False
+        if 'user_data_dirty' not in st.session_state:
+            # Set whenever the stored user row may have changed (login, trades); main re-reads it then
+            st.session_state.user_data_dirty = True
         if 'game_settings' not in st.session_state:
             st.session_state.game_settings = self.db.get_game_settings()
         if 'market_data_cache' not in st.session_state:
@@ -1184,18 +2236,12 @@ class TradingSimulator:
         # Initialize mock data for all markets
         if 'ghana_mock_data' not in st.session_state:
             st.session_state.ghana_mock_data = {}
-        if 'ghana_last_update' not in st.session_state:
-            st.session_state.ghana_last_update = datetime.now()
         
         if 'kenya_mock_data' not in st.session_state:
             st.session_state.kenya_mock_data = {}
-        if 'kenya_last_update' not in st.session_state:
-            st.session_state.kenya_last_update = datetime.now()
         
         if 'nigeria_mock_data' not in st.session_state:
             st.session_state.nigeria_mock_data = {}
-        if 'nigeria_last_update' not in st.session_state:
-            st.session_state.nigeria_last_update = datetime.now()
         
         # Initialize exchange rates
         if 'exchange_rates' not in st.session_state:
@@ -1230,40 +2276,15 @@ class TradingSimulator:
         st.session_state.exchange_rates = self.get_fallback_exchange_rates()
         
         try:
-            # Try multiple free APIs for better reliability
-            apis_to_try = [
-                "https://api.exchangerate-api.com/v4/latest/USD",
-                "https://api.fxratesapi.com/latest?base=USD",
-                "https://open.er-api.com/v6/latest/USD"
-            ]
-            
-            for api_url in apis_to_try:
-                try:
-                    response = requests.get(api_url, timeout=5)
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        rates = data.get('rates', {})
-                        
-                        # Update with live rates if available
-                        if rates:
-                            st.session_state.exchange_rates.update({
-                                'USD': 1.0,
-                                'GHS': rates.get('GHS', st.session_state.exchange_rates['GHS']),
-                                'KES': rates.get('KES', st.session_state.exchange_rates['KES']),
-                                'NGN': rates.get('NGN', st.session_state.exchange_rates['NGN']),
-                                'ZAR': rates.get('ZAR', st.session_state.exchange_rates['ZAR']),
-                                'EGP': rates.get('EGP', st.session_state.exchange_rates['EGP'])
-                            })
-                            st.session_state.exchange_rates_last_update = current_time
-                            st.session_state.exchange_rates_source = f"Live API: {api_url.split('//')[1].split('/')[0]}"
-                            break  # Success, stop trying other APIs
-                        
-                except Exception:
-                    continue  # Try next API
+            live = fetch_live_exchange_rates()
+            
+            # Update with live rates if available
+            if live:
+                st.session_state.exchange_rates.update(live['rates'])
+                st.session_state.exchange_rates_source = live['source']
             
             # If no API worked, note that we're using fallback
-            if 'exchange_rates_source' not in st.session_state:
+            elif 'exchange_rates_source' not in st.session_state:
                 st.session_state.exchange_rates_source = "Fallback rates"
                 
         except Exception as e:
@@ -1292,274 +2313,183 @@ class TradingSimulator:
         rate = st.session_state.exchange_rates.get(currency, 1.0)
         return amount_usd * rate
     
+    def exchange_rate_column(self, currencies: pd.Series) -> pd.Series:
+        """Local units per USD for a column of currencies (1.0 for USD and unknown currencies)"""
+        self.update_exchange_rates()
+        return currencies.map(st.session_state.exchange_rates).fillna(1.0).where(currencies != 'USD', 1.0)
+    
     def format_currency_display(self, amount: float, currency: str) -> str:
         """Format currency for display with proper symbol and formatting"""
-        currency_symbols = {
-            'USD': '$',
-            'GHS': '₵',
-            'KES': 'KSh',
-            'NGN': '₦',
-            'ZAR': 'R',
-            'EGP': 'E£'
-        }
+        symbol = CURRENCY_SYMBOLS.get(currency, currency + ' ')
         
-        symbol = currency_symbols.get(currency, currency + ' ')
-        
-        if currency in ['KES', 'NGN']:
+        if currency in WHOLE_UNIT_CURRENCIES:
             # For currencies with larger numbers, use commas
             return f"{symbol}{amount:,.0f}"
         else:
             # For others, use 2 decimal places
             return f"{symbol}{amount:,.2f}"
     
+    def format_currency_column(self, amounts: pd.Series, currencies: pd.Series) -> pd.Series:
+        """format_currency_display for whole columns of amounts and their currencies"""
+        symbols = currencies.map(CURRENCY_SYMBOLS).fillna(currencies + ' ')
+        text = amounts.map('{:,.2f}'.format).mask(currencies.isin(WHOLE_UNIT_CURRENCIES), amounts.map('{:,.0f}'.format))
+        return symbols + text
+    
     def initialize_all_mock_data(self):
         """Initialize mock data for all African Stock Exchanges"""
         # Update exchange rates first
         self.update_exchange_rates()
         
-        # Base prices in local currencies (realistic values)
-        ghana_stocks = {
-            'GOIL.AC': {'base_price': 25.50, 'volatility': 0.02, 'trend': 0.001},
-            'ECOBANK.AC': {'base_price': 74.25, 'volatility': 0.025, 'trend': 0.0005},
-            'CAL.AC': {'base_price': 10.88, 'volatility': 0.03, 'trend': -0.001},
-            'MTNGH.AC': {'base_price': 15.36, 'volatility': 0.02, 'trend': 0.002},
-            'GWEB.AC': {'base_price': 5.76, 'volatility': 0.04, 'trend': 0.001},
-            'SOGEGH.AC': {'base_price': 23.68, 'volatility': 0.02, 'trend': 0.0005},
-            'AYRTN.AC': {'base_price': 9.60, 'volatility': 0.03, 'trend': -0.0005},
-            'UNIL.AC': {'base_price': 236.80, 'volatility': 0.015, 'trend': 0.001},
-            'CMLT.AC': {'base_price': 12.16, 'volatility': 0.035, 'trend': 0.002},
-            'RBGH.AC': {'base_price': 8.32, 'volatility': 0.025, 'trend': 0.0005},
-            'BOPP.AC': {'base_price': 30.72, 'volatility': 0.03, 'trend': 0.001},
-            'TOTAL.AC': {'base_price': 48.64, 'volatility': 0.02, 'trend': 0.0005},
-            'GGBL.AC': {'base_price': 22.40, 'volatility': 0.025, 'trend': 0.001},
-            'SCBGH.AC': {'base_price': 194.56, 'volatility': 0.02, 'trend': 0.0005},
-            'DIGP.AC': {'base_price': 3.20, 'volatility': 0.05, 'trend': -0.001},
-            'CLYD.AC': {'base_price': 4.48, 'volatility': 0.04, 'trend': 0.002},
-            'AADS.AC': {'base_price': 7.04, 'volatility': 0.035, 'trend': 0.001},
-            'CAPL.AC': {'base_price': 5.76, 'volatility': 0.03, 'trend': 0.0005},
-            'NICO.AC': {'base_price': 12.16, 'volatility': 0.025, 'trend': 0.001},
-            'HORDS.AC': {'base_price': 1.92, 'volatility': 0.06, 'trend': 0.003},
-            'TRANSOL.AC': {'base_price': 3.20, 'volatility': 0.05, 'trend': 0.002},
-            'PRODUCE.AC': {'base_price': 4.48, 'volatility': 0.04, 'trend': 0.001},
-            'PIONEER.AC': {'base_price': 10.88, 'volatility': 0.03, 'trend': 0.0015}
-        }
-        
-        # Initialize Kenya stocks data (in KES)
-        kenya_stocks = {
-            'KCB.NR': {'base_price': 7189.00, 'volatility': 0.025, 'trend': 0.001},
-            'EQTY.NR': {'base_price': 8334.50, 'volatility': 0.03, 'trend': 0.002},
-            'SCBK.NR': {'base_price': 25596.00, 'volatility': 0.02, 'trend': 0.0005},
-            'ABSA.NR': {'base_price': 2030.30, 'volatility': 0.025, 'trend': 0.001},
-            'DTBK.NR': {'base_price': 13035.00, 'volatility': 0.03, 'trend': 0.0015},
-            'BAT.NR': {'base_price': 76630.00, 'volatility': 0.02, 'trend': 0.001},
-            'EABL.NR': {'base_price': 30810.00, 'volatility': 0.025, 'trend': 0.0005},
-            'SAFCOM.NR': {'base_price': 4503.00, 'volatility': 0.02, 'trend': 0.002},
-            'BRITAM.NR': {'base_price': 1019.10, 'volatility': 0.035, 'trend': 0.001},
-            'JUBILEE.NR': {'base_price': 38710.00, 'volatility': 0.03, 'trend': 0.0015},
-            'LIBERTY.NR': {'base_price': 1382.50, 'volatility': 0.04, 'trend': 0.002},
-            'COOP.NR': {'base_price': 2243.60, 'volatility': 0.025, 'trend': 0.001},
-            'UNGA.NR': {'base_price': 6083.00, 'volatility': 0.035, 'trend': 0.0005},
-            'KAKUZI.NR': {'base_price': 67150.00, 'volatility': 0.04, 'trend': 0.002},
-            'SASINI.NR': {'base_price': 1975.00, 'volatility': 0.05, 'trend': 0.001},
-            'KAPCHORUA.NR': {'base_price': 22910.00, 'volatility': 0.045, 'trend': 0.0015},
-            'WILLIAMSON.NR': {'base_price': 6715.00, 'volatility': 0.04, 'trend': 0.001},
-            'BAMBURI.NR': {'base_price': 9164.00, 'volatility': 0.03, 'trend': 0.0005},
-            'CROWN.NR': {'base_price': 3910.50, 'volatility': 0.035, 'trend': 0.001},
-            'KENGEN.NR': {'base_price': 448.72, 'volatility': 0.025, 'trend': 0.0005},
-            'KPLC.NR': {'base_price': 292.30, 'volatility': 0.04, 'trend': -0.001},
-            'KEGN.NR': {'base_price': 466.10, 'volatility': 0.03, 'trend': 0.001},
-            'KENOL.NR': {'base_price': 3555.00, 'volatility': 0.03, 'trend': 0.0015},
-            'TPS.NR': {'base_price': 197.50, 'volatility': 0.05, 'trend': 0.002},
-            'UMEME.NR': {'base_price': 7110.00, 'volatility': 0.025, 'trend': 0.001},
-            'TOTAL.NR': {'base_price': 2923.00, 'volatility': 0.02, 'trend': 0.0005},
-            'CARBACID.NR': {'base_price': 1240.30, 'volatility': 0.035, 'trend': 0.001},
-            'BOC.NR': {'base_price': 6636.00, 'volatility': 0.03, 'trend': 0.0015},
-            'OLYMPIA.NR': {'base_price': 829.50, 'volatility': 0.04, 'trend': 0.002},
-            'CENTUM.NR': {'base_price': 2962.50, 'volatility': 0.035, 'trend': 0.001}
-        }
-        
-        # Initialize Nigeria stocks data (in NGN)
-        nigeria_stocks = {
-            'GTCO.LG': {'base_price': 45600.00, 'volatility': 0.025, 'trend': 0.001},
-            'ZENITHBANK.LG': {'base_price': 39600.00, 'volatility': 0.03, 'trend': 0.0015},
-            'UBA.LG': {'base_price': 25360.00, 'volatility': 0.025, 'trend': 0.001},
-            'ACCESS.LG': {'base_price': 19920.00, 'volatility': 0.03, 'trend': 0.002},
-            'FBNH.LG': {'base_price': 29120.00, 'volatility': 0.035, 'trend': 0.0005},
-            'FIDELITYBK.LG': {'base_price': 14000.00, 'volatility': 0.03, 'trend': 0.001},
-            'STERLINGNG.LG': {'base_price': 3920.00, 'volatility': 0.04, 'trend': 0.0015},
-            'WEMA.LG': {'base_price': 8400.00, 'volatility': 0.035, 'trend': 0.001},
-            'UNITY.LG': {'base_price': 2960.00, 'volatility': 0.05, 'trend': 0.002},
-            'STANBIC.LG': {'base_price': 68000.00, 'volatility': 0.025, 'trend': 0.0005},
-            'DANGCEM.LG': {'base_price': 456000.00, 'volatility': 0.02, 'trend': 0.001},
-            'BUA.LG': {'base_price': 152800.00, 'volatility': 0.025, 'trend': 0.0015},
-            'MTNN.LG': {'base_price': 296000.00, 'volatility': 0.02, 'trend': 0.001},
-            'AIRTELAFRI.LG': {'base_price': 2960000.00, 'volatility': 0.025, 'trend': 0.002},
-            'SEPLAT.LG': {'base_price': 2000000.00, 'volatility': 0.03, 'trend': 0.0005},
-            'OANDO.LG': {'base_price': 13520.00, 'volatility': 0.04, 'trend': 0.001},
-            'TOTAL.LG': {'base_price': 776000.00, 'volatility': 0.02, 'trend': 0.0005},
-            'CONOIL.LG': {'base_price': 56800.00, 'volatility': 0.03, 'trend': 0.001},
-            'GUINNESS.LG': {'base_price': 78000.00, 'volatility': 0.025, 'trend': 0.0015},
-            'NB.LG': {'base_price': 104000.00, 'volatility': 0.025, 'trend': 0.001},
-            'INTBREW.LG': {'base_price': 9360.00, 'volatility': 0.035, 'trend': 0.002},
-            'NESTLE.LG': {'base_price': 2376000.00, 'volatility': 0.015, 'trend': 0.001},
-            'UNILEVER.LG': {'base_price': 26000.00, 'volatility': 0.025, 'trend': 0.0005},
-            'DANGSUGAR.LG': {'base_price': 29600.00, 'volatility': 0.03, 'trend': 0.001},
-            'FLOURMILL.LG': {'base_price': 52400.00, 'volatility': 0.025, 'trend': 0.0015},
-            'HONEYFLOUR.LG': {'base_price': 6800.00, 'volatility': 0.04, 'trend': 0.002},
-            'CADBURY.LG': {'base_price': 20560.00, 'volatility': 0.03, 'trend': 0.001},
-            'VITAFOAM.LG': {'base_price': 24800.00, 'volatility': 0.035, 'trend': 0.0005},
-            'JBERGER.LG': {'base_price': 61200.00, 'volatility': 0.025, 'trend': 0.001},
-            'LIVESTOCK.LG': {'base_price': 3920.00, 'volatility': 0.05, 'trend': 0.002},
-            'CHIPLC.LG': {'base_price': 1360.00, 'volatility': 0.06, 'trend': 0.003},
-            'ELLAHLAKES.LG': {'base_price': 7600.00, 'volatility': 0.045, 'trend': 0.0015},
-            'NAHCO.LG': {'base_price': 13600.00, 'volatility': 0.04, 'trend': 0.001},
-            'RTBRISCOE.LG': {'base_price': 880.00, 'volatility': 0.055, 'trend': 0.002}
-        }
-        
-        self.initialize_mock_data_for_market('ghana', ghana_stocks)
-        self.initialize_mock_data_for_market('kenya', kenya_stocks)
-        self.initialize_mock_data_for_market('nigeria', nigeria_stocks)
+        self.initialize_mock_data_for_market('ghana', GHANA_STOCKS)
+        self.initialize_mock_data_for_market('kenya', KENYA_STOCKS)
+        self.initialize_mock_data_for_market('nigeria', NIGERIA_STOCKS)
     
     def initialize_mock_data_for_market(self, market: str, stocks_config: dict):
         """Initialize mock data for a specific market"""
         session_key = f'{market}_mock_data'
         
+        state_key = f'{market}_mock_state'
+        
         # Initialize mock data if not exists
-        if session_key not in st.session_state or not st.session_state[session_key]:
+        if session_key not in st.session_state or not st.session_state[session_key] or state_key not in st.session_state:
             current_time = datetime.now()
             st.session_state[session_key] = {}
             
-            for symbol, config in stocks_config.items():
-                # Generate 30 days of historical data
-                historical_data = []
-                price = config['base_price']
-                
-                for i in range(30):
-                    date = current_time - timedelta(days=29-i)
-                    
-                    # Add trend and random walk
-                    price_change = (random.gauss(0, config['volatility']) + config['trend']) * price
-                    price = max(0.01, price + price_change)  # Ensure price doesn't go below 0.01
-                    
-                    # Generate volume (random but realistic)
-                    volume = random.randint(10000, 500000)
-                    
-                    historical_data.append({
-                        'date': date,
-                        'open': price * random.uniform(0.995, 1.005),
-                        'high': price * random.uniform(1.005, 1.02),
-                        'low': price * random.uniform(0.98, 0.995),
-                        'close': price,
-                        'volume': volume
-                    })
+            # Per-market parameters as parallel arrays (one slot per symbol) so ticks are vectorized
+            symbols = list(stocks_config)
+            base_prices = np.array([stocks_config[s]['base_price'] for s in symbols])
+            volatilities = np.array([stocks_config[s]['volatility'] for s in symbols])
+            trends = np.array([stocks_config[s]['trend'] for s in symbols])
+            n = len(symbols)
+            
+            # Generate 30 days of historical data for every symbol at once: a compounded
+            # random walk with trend, floored at 0.01, plus bulk-drawn volumes and OHLC spreads
+            noise = self._rng.standard_normal((n, 30))
+            daily_factors = 1 + noise * volatilities[:, None] + trends[:, None]
+            closes = np.maximum(0.01, base_prices[:, None] * np.cumprod(daily_factors, axis=1))
+            opens = closes * self._rng.uniform(0.995, 1.005, (n, 30))
+            highs = closes * self._rng.uniform(1.005, 1.02, (n, 30))
+            lows = closes * self._rng.uniform(0.98, 0.995, (n, 30))
+            volumes = self._rng.integers(10000, 500000, (n, 30), endpoint=True)
+            # Timestamps are second-resolution datetime64 (plain int64 underneath), one per day back from now
+            dates = np.datetime64(current_time, 's') - np.arange(29, -1, -1) * np.timedelta64(1, 'D')
+            # Fundamentals are fixed per symbol for the session so market cap and P/E don't flicker
+            shares_outstanding = self._rng.integers(100000000, 1000000000, n, endpoint=True)
+            pe_ratios = self._rng.uniform(8, 25, n)
+            prices = closes[:, -1].copy()
+            
+            for i, symbol in enumerate(symbols):
+                # History is columnar: one array per field, all the same length
+                historical_data = {
+                    'date': dates,
+                    'open': opens[i],
+                    'high': highs[i],
+                    'low': lows[i],
+                    'close': closes[i],
+                    'volume': volumes[i]
+                }
                 
                 st.session_state[session_key][symbol] = {
-                    'config': config,
                     'historical_data': historical_data,
-                    'current_price': price,
-                    'last_update': current_time
+                    'shares_outstanding': int(shares_outstanding[i]),
+                    'pe_ratio': float(pe_ratios[i]),
+                    'last_update': int(current_time.timestamp())
                 }
+            
+            st.session_state[state_key] = {
+                'symbols': symbols,
+                'index': {symbol: i for i, symbol in enumerate(symbols)},
+                'base_price': base_prices,
+                'volatility': volatilities,
+                'trend': trends,
+                'prices': prices,
+                'last_tick': np.full(n, time.monotonic())
+            }
     
-    def update_mock_data_for_market(self, market: str, last_update_key: str):
-        """Update mock data for a specific market"""
-        current_time = datetime.now()
+    def update_mock_data_for_market(self, market: str, symbols: Optional[List[str]] = None):
+        """Advance a market's mock symbols (all of them by default) that are due a tick"""
         session_key = f'{market}_mock_data'
+        state = st.session_state[f'{market}_mock_state']
         
-        # Update every 30 seconds to simulate real-time updates
-        if (current_time - st.session_state[last_update_key]).total_seconds() < 30:
+        if symbols is None:
+            indices = np.arange(len(state['symbols']))
+        else:
+            indices = np.array([state['index'][symbol] for symbol in symbols], dtype=np.intp)
+        
+        # Update every 30 seconds to simulate real-time updates; each symbol keeps its own
+        # monotonic clock, and wall-clock time is only read once a tick is actually due
+        now = time.monotonic()
+        indices = indices[now - state['last_tick'][indices] >= 30.0]
+        if len(indices) == 0:
             return
+        current_time = datetime.now()
         
-        st.session_state[last_update_key] = current_time
-        
-        # Check if it's trading hours based on market
-        if market == 'ghana':
-            # Ghana: 9:00 AM - 3:00 PM GMT
-            gmt_time = current_time.utctimetuple()
-            is_weekday = gmt_time.tm_wday < 5
-            is_trading_hours = 9 <= gmt_time.tm_hour < 15
-        elif market == 'kenya':
-            # Kenya: 9:00 AM - 3:00 PM EAT (GMT+3)
-            eat_time = (current_time + timedelta(hours=3)).timetuple()
-            is_weekday = eat_time.tm_wday < 5
-            is_trading_hours = 9 <= eat_time.tm_hour < 15
-        elif market == 'nigeria':
-            # Nigeria: 10:00 AM - 2:30 PM WAT (GMT+1)
-            wat_time = (current_time + timedelta(hours=1)).timetuple()
-            is_weekday = wat_time.tm_wday < 5
-            is_trading_hours = 10 <= wat_time.tm_hour < 14 or (wat_time.tm_hour == 14 and wat_time.tm_min <= 30)
+        is_weekday, is_trading_hours, volatility_multiplier = market_session(
+            market, current_time.replace(second=0, microsecond=0))
+        
+        # Advance the due symbols with one vectorized random-walk step
+        prices = state['prices'][indices]
+        noise = self._rng.standard_normal(len(indices))
+        new_prices = step_mock_prices(prices, state['volatility'][indices], state['trend'][indices],
+                                      noise, volatility_multiplier)
+        
+        # Generate realistic volumes for all of them in one draw
+        if is_weekday and is_trading_hours:
+            volumes = self._rng.integers(50000, 800000, len(indices), endpoint=True)
         else:
-            is_weekday = True
-            is_trading_hours = True
+            volumes = self._rng.integers(5000, 100000, len(indices), endpoint=True)
         
-        # If not trading hours, use smaller price movements
-        volatility_multiplier = 1.0 if (is_weekday and is_trading_hours) else 0.3
+        # Each tick's bar spans open (previous price) to close (new price), widened by a random spread
+        highs = np.maximum(prices, new_prices) * self._rng.uniform(1.0, 1.01, len(indices))
+        lows = np.minimum(prices, new_prices) * self._rng.uniform(0.99, 1.0, len(indices))
         
-        for symbol, data in st.session_state[session_key].items():
-            config = data['config']
-            current_price = data['current_price']
-            
-            # Generate new price with trend and volatility
-            price_change = (random.gauss(0, config['volatility'] * volatility_multiplier) + 
-                          config['trend'] * volatility_multiplier) * current_price
-            
-            new_price = max(0.01, current_price + price_change)
-            
-            # Generate realistic volume
-            if is_weekday and is_trading_hours:
-                base_volume = random.randint(50000, 800000)
-            else:
-                base_volume = random.randint(5000, 100000)
+        current_date = np.datetime64(current_time, 's')
+        cutoff_date = current_date - np.timedelta64(30, 'D')
+        last_update = int(current_time.timestamp())
+        for j, i in enumerate(indices):
+            data = st.session_state[session_key][state['symbols'][i]]
             
             # Add new data point
             new_data_point = {
-                'date': current_time,
-                'open': current_price,
-                'high': max(current_price, new_price) * random.uniform(1.0, 1.01),
-                'low': min(current_price, new_price) * random.uniform(0.99, 1.0),
-                'close': new_price,
-                'volume': base_volume
+                'date': current_date,
+                'open': prices[j],
+                'high': highs[j],
+                'low': lows[j],
+                'close': new_prices[j],
+                'volume': volumes[j]
             }
             
-            # Keep only last 30 days of data
-            data['historical_data'].append(new_data_point)
-            cutoff_date = current_time - timedelta(days=30)
-            data['historical_data'] = [
-                d for d in data['historical_data'] 
-                if d['date'] >= cutoff_date
-            ]
-            
-            # Update current price
-            data['current_price'] = new_price
-            data['last_update'] = current_time
-    
-    def get_currency_symbol(self, symbol: str) -> str:
-        """Get currency symbol for different markets"""
-        if symbol.endswith('.AC'):
-            return 'GHS'  # Ghana Cedi
-        elif symbol.endswith('.JO'):
-            return 'ZAR'  # South African Rand
-        elif symbol.endswith('.NR'):
-            return 'KES'  # Kenyan Shilling
-        elif symbol.endswith('.LG'):
-            return 'NGN'  # Nigerian Naira
-        elif symbol.endswith('.CA'):
-            return 'EGP'  # Egyptian Pound
-        elif symbol.endswith('-USD'):
-            return 'USD'  # US Dollar for crypto
-        else:
-            return 'USD'  # US Dollar for US stocks
+            # Keep only last 30 days of data; dates are sorted, so the cutoff is a binary search
+            history = data['historical_data']
+            keep_from = np.searchsorted(history['date'], cutoff_date, side='left')
+            for field, value in new_data_point.items():
+                history[field] = np.append(history[field][keep_from:], value)
+            data['last_update'] = last_update
+            data.pop('history_frame', None)
+            data.pop('quote', None)
+        
+        state['prices'][indices] = new_prices
+        state['last_tick'][indices] = now
     
-    def get_ghana_mock_price(self, symbol: str) -> Dict:
-        """Get mock price data for Ghana stocks"""
-        return self.get_mock_price_for_market(symbol, 'ghana')
+    def refresh_symbol_once(self, market: str, symbol: str):
+        """Run a mock symbol's 30-second update check at most once per script run"""
+        if symbol not in self._refreshed_symbols:
+            self._refreshed_symbols.add(symbol)
+            self.update_mock_data_for_market(market, [symbol])
     
-    def get_kenya_mock_price(self, symbol: str) -> Dict:
-        """Get mock price data for Kenya stocks"""
-        return self.get_mock_price_for_market(symbol, 'kenya')
+    def finish_run(self):
+        """Mark the full script run as done, so later fragment reruns know they reuse this simulator"""
+        self._run_finished = True
     
-    def get_nigeria_mock_price(self, symbol: str) -> Dict:
-        """Get mock price data for Nigeria stocks"""
-        return self.get_mock_price_for_market(symbol, 'nigeria')
+    def start_fragment_run(self):
+        """Called first in a fragment: on a fragment-only rerun, mock symbols get their update check again"""
+        if self._run_finished:
+            self._refreshed_symbols.clear()
+    
+    def get_currency_symbol(self, symbol: str) -> str:
+        """Get currency symbol for different markets"""
+        # US stocks and crypto (no exchange suffix) trade in US Dollars
+        return classify_symbol(symbol).currency
     
     def get_mock_price_for_market(self, symbol: str, market: str) -> Dict:
         """Get mock price data for a specific market"""
@@ -1569,45 +2499,47 @@ class TradingSimulator:
             return None
         
         # Update mock data
-        self.update_mock_data_for_market(market, f'{market}_last_update')
+        self.refresh_symbol_once(market, symbol)
         
         data = st.session_state[session_key][symbol]
+        quote = data.get('quote')
+        if quote is not None:
+            # Quotes only change on a tick, which drops the cached one
+            return dict(quote)
+        
         historical_data = data['historical_data']
+        closes = historical_data['close']
         
-        if len(historical_data) < 2:
+        if len(closes) < 2:
             return None
         
-        current_point = historical_data[-1]
-        previous_point = historical_data[-2]
-        
-        current_price = current_point['close']
-        previous_price = previous_point['close']
+        current_price = float(closes[-1])
+        previous_price = float(closes[-2])
         
         change = current_price - previous_price
         change_percent = (change / previous_price) * 100 if previous_price > 0 else 0
         
         # Get stock name
-        african_names = self.get_african_stock_names()
-        stock_name = african_names.get(symbol, symbol)
+        stock_name = AFRICAN_STOCK_NAMES.get(symbol, symbol)
         
         # Calculate market cap (mock value based on price)
-        shares_outstanding = random.randint(100000000, 1000000000)  # Mock shares outstanding
-        market_cap = current_price * shares_outstanding
+        market_cap = current_price * data['shares_outstanding']
         
         # Get currency symbol
         currency = self.get_currency_symbol(symbol)
         
-        return {
+        quote = {
             'symbol': symbol,
             'name': stock_name,
+            'short_name': stock_name[:SHORT_NAME_LENGTH],
             'price': float(current_price),
             'change': float(change),
             'change_percent': float(change_percent),
-            'volume': int(current_point['volume']),
+            'volume': int(historical_data['volume'][-1]),
             'market_cap': market_cap,
-            'pe_ratio': random.uniform(8, 25),  # Mock P/E ratio
-            'day_high': float(current_point['high']),
-            'day_low': float(current_point['low']),
+            'pe_ratio': data['pe_ratio'],  # Mock P/E ratio
+            'day_high': float(historical_data['high'][-1]),
+            'day_low': float(historical_data['low'][-1]),
             'sector': f'African Markets - {market.title()}',
             'industry': f'{market.title()} Stock Exchange',
             'is_crypto': False,
@@ -1615,20 +2547,10 @@ class TradingSimulator:
             'is_mock': True,  # Flag to indicate this is mock data
             'country': market.title(),
             'currency': currency,
-            'last_updated': datetime.now()
+            'last_updated': datetime.fromtimestamp(data['last_update'])
         }
-    
-    def get_ghana_mock_history(self, symbol: str, period: str = "3mo") -> pd.DataFrame:
-        """Get historical mock data for Ghana stocks"""
-        return self.get_mock_history_for_market(symbol, 'ghana', period)
-    
-    def get_kenya_mock_history(self, symbol: str, period: str = "3mo") -> pd.DataFrame:
-        """Get historical mock data for Kenya stocks"""
-        return self.get_mock_history_for_market(symbol, 'kenya', period)
-    
-    def get_nigeria_mock_history(self, symbol: str, period: str = "3mo") -> pd.DataFrame:
-        """Get historical mock data for Nigeria stocks"""
-        return self.get_mock_history_for_market(symbol, 'nigeria', period)
+        data['quote'] = quote
+        return dict(quote)
     
     def get_mock_history_for_market(self, symbol: str, market: str, period: str = "3mo") -> pd.DataFrame:
         """Get historical mock data for a specific market"""
@@ -1637,388 +2559,129 @@ class TradingSimulator:
         if symbol not in st.session_state[session_key]:
             return pd.DataFrame()
         
-        self.update_mock_data_for_market(market, f'{market}_last_update')
+        self.refresh_symbol_once(market, symbol)
         
         data = st.session_state[session_key][symbol]
-        historical_data = data['historical_data']
-        
-        # Convert to DataFrame
-        df = pd.DataFrame(historical_data)
-        df['Date'] = pd.to_datetime(df['date'])
-        df.set_index('Date', inplace=True)
-        
-        # Rename columns to match yfinance format
-        df.rename(columns={
-            'open': 'Open',
-            'high': 'High',
-            'low': 'Low',
-            'close': 'Close',
-            'volume': 'Volume'
-        }, inplace=True)
-        
-        # Filter by period
-        current_time = datetime.now()
-        if period == "1mo":
-            cutoff = current_time - timedelta(days=30)
-        elif period == "3mo":
-            cutoff = current_time - timedelta(days=90)
-        elif period == "6mo":
-            cutoff = current_time - timedelta(days=180)
-        elif period == "1y":
-            cutoff = current_time - timedelta(days=365)
-        elif period == "2y":
-            cutoff = current_time - timedelta(days=730)
-        elif period == "5y":
-            cutoff = current_time - timedelta(days=1825)
-        else:
-            cutoff = current_time - timedelta(days=90)
+        df = data.get('history_frame')
+        if df is None:
+            # Build the yfinance-shaped frame once per tick; it is dropped whenever the history advances.
+            # Ticks replace the history arrays rather than writing into them, so the frame can share them.
+            history = data['historical_data']
+            df = pd.DataFrame({
+                'Open': history['open'],
+                'High': history['high'],
+                'Low': history['low'],
+                'Close': history['close'],
+                'Volume': history['volume']
+            }, index=pd.DatetimeIndex(history['date'], name='Date', copy=False), copy=False)
+            data['history_frame'] = df
         
-        df = df[df.index >= cutoff]
+        # Filter by period (unknown periods fall back to 3 months)
+        cutoff = datetime.now() - timedelta(days=PERIOD_DAYS.get(period, 90))
         
-        return df
+        # The index is sorted, so this is a binary-search slice rather than a boolean mask
+        return df.loc[cutoff:]
     
     def get_available_stocks(self) -> List[str]:
         """Get list of available stocks and cryptocurrencies for trading"""
-        return [
-            # Large Cap Tech
-            'AAPL', 'MSFT', 'GOOGL', 'GOOG', 'AMZN', 'NVDA', 'TSLA', 'META', 'NFLX', 'ADBE',
-            'CRM', 'ORCL', 'IBM', 'INTC', 'AMD', 'QCOM', 'AVGO', 'TXN', 'AMAT', 'LRCX',
-            'NOW', 'INTU', 'PANW', 'CRWD', 'ZS', 'SNOW', 'PLTR', 'DDOG', 'OKTA', 'ZM',
-            
-            # Finance
-            'BRK-B', 'JPM', 'BAC', 'WFC', 'GS', 'MS', 'C', 'USB', 'PNC', 'TFC',
-            'COF', 'AXP', 'BLK', 'SCHW', 'SPGI', 'ICE', 'CME', 'CB', 'AIG', 'PGR',
-            'V', 'MA', 'PYPL', 'SQ', 'FIS', 'FISV', 'COIN',
-            
-            # Healthcare & Biotech
-            'UNH', 'JNJ', 'PFE', 'ABBV', 'TMO', 'ABT', 'DHR', 'BMY', 'AMGN', 'GILD',
-            'BIIB', 'REGN', 'VRTX', 'ILMN', 'ISRG', 'DXCM', 'ZTS', 'MRNA', 'BNTX', 'CVS',
-            
-            # Consumer & Retail
-            'HD', 'WMT', 'PG', 'KO', 'PEP', 'COST', 'NKE', 'SBUX', 'MCD', 'DIS',
-            'LOW', 'TJX', 'TGT', 'LULU', 'CMG', 'YUM', 'ULTA', 'ROST', 'BBY',
-            
-            # Energy
-            'XOM', 'CVX', 'COP', 'EOG', 'SLB', 'MPC', 'VLO', 'PSX', 'OXY', 'KMI',
-            
-            # ETFs
-            'SPY', 'QQQ', 'IWM', 'VTI', 'VOO', 'VEA', 'VWO', 'BND', 'AGG',
-            'XLE', 'XLF', 'XLK', 'XLV', 'XLI', 'XLU', 'XLP', 'XLY', 'XLB',
-            
-            # Cryptocurrencies (USD pairs)
-            'BTC-USD', 'ETH-USD', 'BNB-USD', 'XRP-USD', 'SOL-USD', 'ADA-USD', 'AVAX-USD',
-            'DOT-USD', 'DOGE-USD', 'SHIB-USD', 'MATIC-USD', 'LTC-USD', 'BCH-USD', 'LINK-USD',
-            'UNI-USD', 'ATOM-USD', 'XLM-USD', 'VET-USD', 'FIL-USD', 'TRX-USD', 'ETC-USD',
-            'ALGO-USD', 'MANA-USD', 'SAND-USD', 'AXS-USD', 'THETA-USD', 'AAVE-USD', 'COMP-USD',
-            'MKR-USD', 'SNX-USD', 'SUSHI-USD', 'YFI-USD', 'BAT-USD', 'ZRX-USD', 'ENJ-USD',
-            'CRV-USD', 'GALA-USD', 'CHZ-USD', 'FLOW-USD', 'ICP-USD', 'NEAR-USD', 'APT-USD',
-            'ARB-USD', 'OP-USD', 'PEPE-USD', 'FLOKI-USD', 'BONK-USD',
-            
-            # African Markets
-            # Ghana (GSE)
-            'GOIL.AC', 'ECOBANK.AC', 'CAL.AC', 'MTNGH.AC', 'GWEB.AC', 'SOGEGH.AC',
-            'AYRTN.AC', 'UNIL.AC', 'CMLT.AC', 'RBGH.AC', 'BOPP.AC', 'TOTAL.AC',
-            'GGBL.AC', 'SCBGH.AC', 'DIGP.AC', 'CLYD.AC', 'AADS.AC', 'CAPL.AC',
-            'NICO.AC', 'HORDS.AC', 'TRANSOL.AC', 'PRODUCE.AC', 'PIONEER.AC',
-            
-            # South Africa (JSE)
-            'NPN.JO', 'PRX.JO', 'ABG.JO', 'SHP.JO', 'BVT.JO', 'MTN.JO', 'VOD.JO',
-            'DSY.JO', 'TKG.JO', 'REM.JO', 'BID.JO', 'SBK.JO', 'FSR.JO', 'NED.JO',
-            'AGL.JO', 'IMP.JO', 'SOL.JO', 'CPI.JO', 'RNI.JO', 'APN.JO', 'MCG.JO',
-            'PIK.JO', 'WHL.JO', 'TBS.JO', 'GFI.JO', 'HAR.JO', 'SLM.JO', 'AMS.JO',
-            'CFR.JO', 'INP.JO', 'BTI.JO', 'ARI.JO', 'SPP.JO', 'MRP.JO', 'RBX.JO',
-            
-            # Kenya (NSE)
-            'KCB.NR', 'EQTY.NR', 'SCBK.NR', 'ABSA.NR', 'DTBK.NR', 'BAT.NR', 'EABL.NR',
-            'SAFCOM.NR', 'BRITAM.NR', 'JUBILEE.NR', 'LIBERTY.NR', 'COOP.NR', 'UNGA.NR',
-            'KAKUZI.NR', 'SASINI.NR', 'KAPCHORUA.NR', 'WILLIAMSON.NR', 'BAMBURI.NR',
-            'CROWN.NR', 'KENGEN.NR', 'KPLC.NR', 'KEGN.NR', 'KENOL.NR', 'TPS.NR',
-            'UMEME.NR', 'TOTAL.NR', 'CARBACID.NR', 'BOC.NR', 'OLYMPIA.NR', 'CENTUM.NR',
-            
-            # Nigeria (NGX)
-            'GTCO.LG', 'ZENITHBANK.LG', 'UBA.LG', 'ACCESS.LG', 'FBNH.LG', 'FIDELITYBK.LG',
-            'STERLINGNG.LG', 'WEMA.LG', 'UNITY.LG', 'STANBIC.LG', 'DANGCEM.LG', 'BUA.LG',
-            'MTNN.LG', 'AIRTELAFRI.LG', 'SEPLAT.LG', 'OANDO.LG', 'TOTAL.LG', 'CONOIL.LG',
-            'GUINNESS.LG', 'NB.LG', 'INTBREW.LG', 'NESTLE.LG', 'UNILEVER.LG', 'DANGSUGAR.LG',
-            'FLOURMILL.LG', 'HONEYFLOUR.LG', 'CADBURY.LG', 'VITAFOAM.LG', 'JBERGER.LG',
-            'LIVESTOCK.LG', 'CHIPLC.LG', 'ELLAHLAKES.LG', 'NAHCO.LG', 'RTBRISCOE.LG',
-            
-            # Egypt (EGX)
-            'CIB.CA', 'COMI.CA', 'ALEX.CA', 'ABUK.CA', 'SAIB.CA', 'ADIB.CA', 'QNBK.CA',
-            'ELSWEDY.CA', 'HRHO.CA', 'TMGH.CA', 'OTMT.CA', 'PHDC.CA', 'PALM.CA', 'MNHD.CA',
-            'MOPCO.CA', 'EGAS.CA', 'EGTS.CA', 'EGCH.CA', 'SKPC.CA', 'IRON.CA', 'EZDK.CA',
-            'AMOC.CA', 'ETEL.CA', 'ORWE.CA', 'EAST.CA', 'JUFO.CA', 'AMER.CA', 'SPMD.CA',
-            'EMFD.CA', 'CLHO.CA', 'EKHO.CA', 'DOMTY.CA', 'EDBE.CA', 'IDBE.CA', 'MTIE.CA'
-        ]
+        return list(AVAILABLE_STOCKS)
     
     def get_african_markets(self) -> Dict[str, List[str]]:
         """Get African markets categorized by country"""
-        return {
-            "Ghana Stock Exchange (GSE)": [
-                'GOIL.AC', 'ECOBANK.AC', 'CAL.AC', 'MTNGH.AC', 'GWEB.AC', 'SOGEGH.AC',
-                'AYRTN.AC', 'UNIL.AC', 'CMLT.AC', 'RBGH.AC', 'BOPP.AC', 'TOTAL.AC',
-                'GGBL.AC', 'SCBGH.AC', 'DIGP.AC', 'CLYD.AC', 'AADS.AC', 'CAPL.AC',
-                'NICO.AC', 'HORDS.AC', 'TRANSOL.AC', 'PRODUCE.AC', 'PIONEER.AC'
-            ],
-            "Johannesburg Stock Exchange (JSE)": [
-                'NPN.JO', 'PRX.JO', 'ABG.JO', 'SHP.JO', 'BVT.JO', 'MTN.JO', 'VOD.JO',
-                'DSY.JO', 'TKG.JO', 'REM.JO', 'BID.JO', 'SBK.JO', 'FSR.JO', 'NED.JO',
-                'AGL.JO', 'IMP.JO', 'SOL.JO', 'CPI.JO', 'RNI.JO', 'APN.JO', 'MCG.JO',
-                'PIK.JO', 'WHL.JO', 'TBS.JO', 'GFI.JO', 'HAR.JO', 'SLM.JO', 'AMS.JO',
-                'CFR.JO', 'INP.JO', 'BTI.JO', 'ARI.JO', 'SPP.JO', 'MRP.JO', 'RBX.JO'
-            ],
-            "Nairobi Securities Exchange (NSE)": [
-                'KCB.NR', 'EQTY.NR', 'SCBK.NR', 'ABSA.NR', 'DTBK.NR', 'BAT.NR', 'EABL.NR',
-                'SAFCOM.NR', 'BRITAM.NR', 'JUBILEE.NR', 'LIBERTY.NR', 'COOP.NR', 'UNGA.NR',
-                'KAKUZI.NR', 'SASINI.NR', 'KAPCHORUA.NR', 'WILLIAMSON.NR', 'BAMBURI.NR',
-                'CROWN.NR', 'KENGEN.NR', 'KPLC.NR', 'KEGN.NR', 'KENOL.NR', 'TPS.NR',
-                'UMEME.NR', 'TOTAL.NR', 'CARBACID.NR', 'BOC.NR', 'OLYMPIA.NR', 'CENTUM.NR'
-            ],
-            "Nigerian Exchange (NGX)": [
-                'GTCO.LG', 'ZENITHBANK.LG', 'UBA.LG', 'ACCESS.LG', 'FBNH.LG', 'FIDELITYBK.LG',
-                'STERLINGNG.LG', 'WEMA.LG', 'UNITY.LG', 'STANBIC.LG', 'DANGCEM.LG', 'BUA.LG',
-                'MTNN.LG', 'AIRTELAFRI.LG', 'SEPLAT.LG', 'OANDO.LG', 'TOTAL.LG', 'CONOIL.LG',
-                'GUINNESS.LG', 'NB.LG', 'INTBREW.LG', 'NESTLE.LG', 'UNILEVER.LG', 'DANGSUGAR.LG',
-                'FLOURMILL.LG', 'HONEYFLOUR.LG', 'CADBURY.LG', 'VITAFOAM.LG', 'JBERGER.LG',
-                'LIVESTOCK.LG', 'CHIPLC.LG', 'ELLAHLAKES.LG', 'NAHCO.LG', 'RTBRISCOE.LG'
-            ],
-            "Egyptian Exchange (EGX)": [
-                'CIB.CA', 'COMI.CA', 'ALEX.CA', 'ABUK.CA', 'SAIB.CA', 'ADIB.CA', 'QNBK.CA',
-                'ELSWEDY.CA', 'HRHO.CA', 'TMGH.CA', 'OTMT.CA', 'PHDC.CA', 'PALM.CA', 'MNHD.CA',
-                'MOPCO.CA', 'EGAS.CA', 'EGTS.CA', 'EGCH.CA', 'SKPC.CA', 'IRON.CA', 'EZDK.CA',
-                'AMOC.CA', 'ETEL.CA', 'ORWE.CA', 'EAST.CA', 'JUFO.CA', 'AMER.CA', 'SPMD.CA',
-                'EMFD.CA', 'CLHO.CA', 'EKHO.CA', 'DOMTY.CA', 'EDBE.CA', 'IDBE.CA', 'MTIE.CA'
-            ]
-        }
+        return AFRICAN_MARKETS
     
     def get_african_stock_names(self) -> Dict[str, str]:
         """Get African stock names mapping"""
-        return {
-            # Ghana
-            'GOIL.AC': 'Ghana Oil Company Limited',
-            'ECOBANK.AC': 'Ecobank Ghana Limited',
-            'CAL.AC': 'CAL Bank Limited',
-            'MTNGH.AC': 'MTN Ghana Limited',
-            'GWEB.AC': 'Golden Web Limited',
-            'SOGEGH.AC': 'Societe Generale Ghana',
-            'AYRTN.AC': 'Ayrton Drug Manufacturing',
-            'UNIL.AC': 'Unilever Ghana Limited',
-            'CMLT.AC': 'Camelot Ghana Limited',
-            'RBGH.AC': 'Republic Bank Ghana',
-            'BOPP.AC': 'Benso Oil Palm Plantation',
-            'TOTAL.AC': 'Total Petroleum Ghana',
-            'GGBL.AC': 'Ghana Breweries Limited',
-            'SCBGH.AC': 'Standard Chartered Bank Ghana',
-            'DIGP.AC': 'Dalex Finance & Leasing',
-            'CLYD.AC': 'Clydestone Ghana Limited',
-            'AADS.AC': 'Aluworks Limited',
-            'CAPL.AC': 'Cocoa Processing Company',
-            'NICO.AC': 'NICO Insurance Company',
-            'HORDS.AC': 'Hords Investment Limited',
-            'TRANSOL.AC': 'Transol Solutions Limited',
-            'PRODUCE.AC': 'Produce Buying Company',
-            'PIONEER.AC': 'Pioneer Kitchenware Limited',
-            
-            # South Africa
-            'NPN.JO': 'Naspers Limited',
-            'PRX.JO': 'Prosus NV',
-            'ABG.JO': 'Absa Group Limited',
-            'SHP.JO': 'Shoprite Holdings Limited',
-            'BVT.JO': 'Bidvest Group Limited',
-            'MTN.JO': 'MTN Group Limited',
-            'VOD.JO': 'Vodacom Group Limited',
-            'DSY.JO': 'Discovery Limited',
-            'TKG.JO': 'Telkom SA SOC Limited',
-            'REM.JO': 'Remgro Limited',
-            'BID.JO': 'Bid Corporation Limited',
-            'SBK.JO': 'Standard Bank Group Limited',
-            'FSR.JO': 'FirstRand Limited',
-            'NED.JO': 'Nedbank Group Limited',
-            'AGL.JO': 'Anglo American plc',
-            'IMP.JO': 'Impala Platinum Holdings Limited',
-            'SOL.JO': 'Sasol Limited',
-            'CPI.JO': 'Capitec Bank Holdings Limited',
-            'RNI.JO': 'Reinet Investments SCA',
-            'APN.JO': 'Aspen Pharmacare Holdings Limited',
-            'MCG.JO': 'Multichoice Group Limited',
-            'PIK.JO': 'Pick n Pay Stores Limited',
-            'WHL.JO': 'Woolworths Holdings Limited',
-            'TBS.JO': 'Tiger Brands Limited',
-            'GFI.JO': 'Gold Fields Limited',
-            'HAR.JO': 'Harmony Gold Mining Company Limited',
-            'SLM.JO': 'Sanlam Limited',
-            'AMS.JO': 'Anglo American Platinum Limited',
-            'CFR.JO': 'Cartrack Holdings Limited',
-            'INP.JO': 'Investec plc',
-            'BTI.JO': 'Brait SE',
-            'ARI.JO': 'African Rainbow Minerals Limited',
-            'SPP.JO': 'Spar Group Limited',
-            'MRP.JO': 'Mr Price Group Limited',
-            'RBX.JO': 'Raubex Group Limited',
-            
-            # Kenya
-            'KCB.NR': 'KCB Group Limited',
-            'EQTY.NR': 'Equity Group Holdings Limited',
-            'SCBK.NR': 'Standard Chartered Bank Kenya Limited',
-            'ABSA.NR': 'Absa Bank Kenya Limited',
-            'DTBK.NR': 'Diamond Trust Bank Kenya Limited',
-            'BAT.NR': 'British American Tobacco Kenya Limited',
-            'EABL.NR': 'East African Breweries Limited',
-            'SAFCOM.NR': 'Safaricom Limited',
-            'BRITAM.NR': 'Britam Holdings Limited',
-            'JUBILEE.NR': 'Jubilee Holdings Limited',
-            'LIBERTY.NR': 'Liberty Kenya Holdings Limited',
-            'COOP.NR': 'Co-operative Bank of Kenya Limited',
-            'UNGA.NR': 'Unga Group Limited',
-            'KAKUZI.NR': 'Kakuzi Limited',
-            'SASINI.NR': 'Sasini Limited',
-            'KAPCHORUA.NR': 'Kapchorua Tea Company Limited',
-            'WILLIAMSON.NR': 'Williamson Tea Kenya Limited',
-            'BAMBURI.NR': 'Bamburi Cement Limited',
-            'CROWN.NR': 'Crown Berger Limited',
-            'KENGEN.NR': 'Kenya Electricity Generating Company Limited',
-            'KPLC.NR': 'Kenya Power and Lighting Company Limited',
-            'KEGN.NR': 'KenGen Limited',
-            'KENOL.NR': 'KenolKobil Limited',
-            'TPS.NR': 'TPS Eastern Africa Limited',
-            'UMEME.NR': 'Umeme Limited',
-            'TOTAL.NR': 'Total Kenya Limited',
-            'CARBACID.NR': 'Carbacid Investments Limited',
-            'BOC.NR': 'BOC Kenya Limited',
-            'OLYMPIA.NR': 'Olympia Capital Holdings Limited',
-            'CENTUM.NR': 'Centum Investment Company Limited',
-            
-            # Nigeria
-            'GTCO.LG': 'Guaranty Trust Holding Company Plc',
-            'ZENITHBANK.LG': 'Zenith Bank Plc',
-            'UBA.LG': 'United Bank for Africa Plc',
-            'ACCESS.LG': 'Access Holdings Plc',
-            'FBNH.LG': 'FBN Holdings Plc',
-            'FIDELITYBK.LG': 'Fidelity Bank Plc',
-            'STERLINGNG.LG': 'Sterling Bank Plc',
-            'WEMA.LG': 'Wema Bank Plc',
-            'UNITY.LG': 'Unity Bank Plc',
-            'STANBIC.LG': 'Stanbic IBTC Holdings Plc',
-            'DANGCEM.LG': 'Dangote Cement Plc',
-            'BUA.LG': 'BUA Cement Plc',
-            'MTNN.LG': 'MTN Nigeria Communications Plc',
-            'AIRTELAFRI.LG': 'Airtel Africa Plc',
-            'SEPLAT.LG': 'Seplat Petroleum Development Company Plc',
-            'OANDO.LG': 'Oando Plc',
-            'TOTAL.LG': 'Total Nigeria Plc',
-            'CONOIL.LG': 'Conoil Plc',
-            'GUINNESS.LG': 'Guinness Nigeria Plc',
-            'NB.LG': 'Nigerian Breweries Plc',
-            'INTBREW.LG': 'International Breweries Plc',
-            'NESTLE.LG': 'Nestle Nigeria Plc',
-            'UNILEVER.LG': 'Unilever Nigeria Plc',
-            'DANGSUGAR.LG': 'Dangote Sugar Refinery Plc',
-            'FLOURMILL.LG': 'Flour Mills of Nigeria Plc',
-            'HONEYFLOUR.LG': 'Honeywell Flour Mill Plc',
-            'CADBURY.LG': 'Cadbury Nigeria Plc',
-            'VITAFOAM.LG': 'Vitafoam Nigeria Plc',
-            'JBERGER.LG': 'Julius Berger Nigeria Plc',
-            'LIVESTOCK.LG': 'Livestock Feeds Plc',
-            'CHIPLC.LG': 'Champion Breweries Plc',
-            'ELLAHLAKES.LG': 'Ellah Lakes Plc',
-            'NAHCO.LG': 'Nigerian Aviation Handling Company Plc',
-            'RTBRISCOE.LG': 'RT Briscoe Plc',
-            
-            # Egypt
-            'CIB.CA': 'Commercial International Bank Egypt',
-            'COMI.CA': 'Commercial Bank of Egypt',
-            'ALEX.CA': 'Bank of Alexandria',
-            'ABUK.CA': 'Arab Bank of Egypt',
-            'SAIB.CA': 'Suez Canal Bank',
-            'ADIB.CA': 'Abu Dhabi Islamic Bank Egypt',
-            'QNBK.CA': 'QNB Egypt',
-            'ELSWEDY.CA': 'El Sewedy Electric Company',
-            'HRHO.CA': 'Hassan Allam Holding',
-            'TMGH.CA': 'TMG Holding',
-            'OTMT.CA': 'Orascom Telecom Media Technology',
-            'PHDC.CA': 'Palm Hills Developments',
-            'PALM.CA': 'Palm Trees Development Company',
-            'MNHD.CA': 'Madinet Nasr Housing and Development',
-            'MOPCO.CA': 'Middle East Oil Refinery',
-            'EGAS.CA': 'Egyptian Gas Company',
-            'EGTS.CA': 'Egyptian Gulf Company',
-            'EGCH.CA': 'Egyptian Chemicals Company',
-            'SKPC.CA': 'Suez Canal Container Terminal',
-            'IRON.CA': 'Iron & Steel for Mines and Quarries',
-            'EZDK.CA': 'Ezz Dekheila Steel Company',
-            'AMOC.CA': 'Arab Moltaka Investment Company',
-            'ETEL.CA': 'Egyptian Telecommunications Company',
-            'ORWE.CA': 'Orascom West El Balad',
-            'EAST.CA': 'Eastern Company',
-            'JUFO.CA': 'Juhayna Food Industries',
-            'AMER.CA': 'Amer Group Holding',
-            'SPMD.CA': 'Sphinx Medical Development',
-            'EMFD.CA': 'Egyptian Media Production City',
-            'CLHO.CA': 'Cairo for Hotels Company',
-            'EKHO.CA': 'Egyptian Kuwaiti Holding Company',
-            'DOMTY.CA': 'Domty Company',
-            'EDBE.CA': 'Egyptian Drugs and Beverages Company',
-            'IDBE.CA': 'Egyptian Drinks and Beverages Company',
-            'MTIE.CA': 'Misr for Trade and Investment Company'
-        }
+        return AFRICAN_STOCK_NAMES
     
     def is_crypto(self, symbol: str) -> bool:
         """Check if symbol is a cryptocurrency"""
-        return symbol.endswith('-USD')
+        return classify_symbol(symbol).is_crypto
     
     def is_african_stock(self, symbol: str) -> bool:
         """Check if symbol is an African stock"""
-        african_suffixes = ['.AC', '.JO', '.NR', '.LG', '.CA']
-        return any(symbol.endswith(suffix) for suffix in african_suffixes)
+        return classify_symbol(symbol).is_african
     
     def get_african_country_from_symbol(self, symbol: str) -> str:
         """Get African country from stock symbol"""
-        if symbol.endswith('.AC'):
-            return "Ghana"
-        elif symbol.endswith('.JO'):
-            return "South Africa"
-        elif symbol.endswith('.NR'):
-            return "Kenya"
-        elif symbol.endswith('.LG'):
-            return "Nigeria"
-        elif symbol.endswith('.CA'):
-            return "Egypt"
-        return "Unknown"
+        return classify_symbol(symbol).country or "Unknown"
+    
+    def get_stock_quote(self, symbol: str) -> Optional[Dict]:
+        """Get current price and daily change from recent bars only, without the .info request"""
+        meta = classify_symbol(symbol)
+        if meta.is_mock:
+            return self.get_mock_price_for_market(symbol, meta.mock_market)
+        try:
+            hist = get_quote_history(symbol)
+            if hist.empty:
+                return None
+            return self.quote_from_history(symbol, hist)
+        except Exception as e:
+            self.fetch_errors.append(f"{symbol}: {str(e)}")
+            return None
     
+    def get_stock_details(self, symbol: str) -> Dict:
+        """Get current price and .info details, noting fallback data for this run's fetch warning"""
+        details = self._fetch_stock_details(symbol)
+        if details and details.get('error_msg'):
+            self.fetch_errors.append(f"{symbol}: {details['error_msg']}")
+        return details
+    
+    def get_stock_details_bulk(self, symbols: List[str]) -> Dict[str, Dict]:
+        """get_stock_details for many symbols, fetching the live ones concurrently"""
+        # Live lookups are network-bound, so warm their cached entries in parallel first; mock
+        # symbols read session state and stay on the script thread
+        live_symbols = [symbol for symbol in dict.fromkeys(symbols) if not classify_symbol(symbol).is_mock]
+        # Workers share this run's context so the st.cache_data lookups inside them belong to the session
+        with ThreadPoolExecutor(max_workers=max(1, min(8, len(live_symbols))), initializer=add_script_run_ctx,
+                                initargs=(None, get_script_run_ctx(suppress_warning=True))) as executor:
+            list(executor.map(self._fetch_stock_details, live_symbols))
+        return {symbol: self.get_stock_details(symbol) for symbol in dict.fromkeys(symbols)}
+    
+    def report_fetch_errors(self):
+        """Show this run's quote failures as one warning and clear them"""
+        if self.fetch_errors:
+            errors = list(dict.fromkeys(self.fetch_errors))
+            st.warning("Some symbols failed to load:\n" + "\n".join(f"- {error}" for error in errors[:10]))
+            self.fetch_errors.clear()
+    
+    # Returns data only (no Streamlit calls), so cached results never replay stale messages
     @st.cache_data(ttl=300)
-    def get_stock_price(_self, symbol: str) -> Dict:
+    def _fetch_stock_details(_self, symbol: str) -> Dict:
         """Get current stock/crypto price and info with error handling and rate limiting"""
+        meta = classify_symbol(symbol)
         try:
             # Check if it's a mock data stock (these don't use API calls)
-            if symbol.endswith('.AC'):
-                return _self.get_ghana_mock_price(symbol)
-            elif symbol.endswith('.NR'):
-                return _self.get_kenya_mock_price(symbol)
-            elif symbol.endswith('.LG'):
-                return _self.get_nigeria_mock_price(symbol)
+            if meta.is_mock:
+                return _self.get_mock_price_for_market(symbol, meta.mock_market)
+            
+            # A recent quote saved by this or an earlier server process avoids the API entirely
+            quote = FILE_CACHE.get(f'{symbol}:details', QUOTE_DISK_TTL_SECONDS)
+            if quote is not None:
+                return quote
+            if is_bad_symbol(symbol):
+                return None
             
             # For real data, implement rate limiting and better error handling
-            import time
-            time.sleep(0.1)  # Small delay to avoid rate limiting
+            YAHOO_RATE_LIMITER.acquire()  # Only waits when requests arrive faster than the limit
             
             # For all other stocks, use yfinance with error handling
-            ticker = yf.Ticker(symbol)
+            ticker = get_ticker(symbol)
             
             # Try to get data with fallback options
             try:
-                hist = ticker.history(period="5d")
-                if hist.empty:
-                    hist = ticker.history(period="1d")
+                hist = get_quote_history(symbol)
                 if hist.empty:
                     return None
                     
                 info = ticker.info
             except Exception as e:
                 # If real-time data fails, return a fallback structure
-                st.warning(f"Limited data for {symbol}: {str(e)}")
+                mark_bad_symbol(symbol)
                 return {
                     'symbol': symbol,
                     'name': symbol,
+                    'short_name': symbol,
                     'price': 100.0,  # Fallback price
                     'change': 0.0,
                     'change_percent': 0.0,
@@ -2029,13 +2692,14 @@ class TradingSimulator:
                     'day_low': 100.0,
                     'sector': 'Unknown',
                     'industry': 'Unknown',
-                    'is_crypto': symbol.endswith('-USD'),
-                    'is_african': _self.is_african_stock(symbol),
+                    'is_crypto': meta.is_crypto,
+                    'is_african': meta.is_african,
                     'is_mock': False,
-                    'country': _self.get_african_country_from_symbol(symbol) if _self.is_african_stock(symbol) else None,
-                    'currency': _self.get_currency_symbol(symbol),
+                    'country': meta.country,
+                    'currency': meta.currency,
                     'last_updated': datetime.now(),
-                    'error': True
+                    'error': True,
+                    'error_msg': f"Limited data: {str(e)}"
                 }
             
             current_price = hist['Close'].iloc[-1]
@@ -2047,71 +2711,21 @@ class TradingSimulator:
             change_percent = (change / prev_close) * 100 if prev_close > 0 else 0
             
             # Determine asset type
-            is_crypto = symbol.endswith('-USD')
-            is_african = _self.is_african_stock(symbol)
+            is_crypto = meta.is_crypto
+            is_african = meta.is_african
             
             # Get currency symbol
-            currency = _self.get_currency_symbol(symbol)
+            currency = meta.currency
             
             # Get appropriate name
             if is_crypto:
-                display_name = symbol.replace('-USD', '')
+                display_name = meta.display_name
                 long_name = info.get('longName', display_name)
                 if long_name == display_name:
                     # Create better display names for crypto
-                    crypto_names = {
-                        'BTC': 'Bitcoin',
-                        'ETH': 'Ethereum',
-                        'BNB': 'Binance Coin',
-                        'XRP': 'XRP',
-                        'SOL': 'Solana',
-                        'ADA': 'Cardano',
-                        'AVAX': 'Avalanche',
-                        'DOT': 'Polkadot',
-                        'DOGE': 'Dogecoin',
-                        'SHIB': 'Shiba Inu',
-                        'MATIC': 'Polygon',
-                        'LTC': 'Litecoin',
-                        'BCH': 'Bitcoin Cash',
-                        'LINK': 'Chainlink',
-                        'UNI': 'Uniswap',
-                        'ATOM': 'Cosmos',
-                        'XLM': 'Stellar',
-                        'VET': 'VeChain',
-                        'FIL': 'Filecoin',
-                        'TRX': 'TRON',
-                        'ETC': 'Ethereum Classic',
-                        'ALGO': 'Algorand',
-                        'MANA': 'Decentraland',
-                        'SAND': 'The Sandbox',
-                        'AXS': 'Axie Infinity',
-                        'THETA': 'Theta Network',
-                        'AAVE': 'Aave',
-                        'COMP': 'Compound',
-                        'MKR': 'Maker',
-                        'SNX': 'Synthetix',
-                        'SUSHI': 'SushiSwap',
-                        'YFI': 'yearn.finance',
-                        'BAT': 'Basic Attention Token',
-                        'ZRX': '0x Protocol',
-                        'ENJ': 'Enjin Coin',
-                        'CRV': 'Curve DAO',
-                        'GALA': 'Gala',
-                        'CHZ': 'Chiliz',
-                        'FLOW': 'Flow',
-                        'ICP': 'Internet Computer',
-                        'NEAR': 'NEAR Protocol',
-                        'APT': 'Aptos',
-                        'ARB': 'Arbitrum',
-                        'OP': 'Optimism',
-                        'PEPE': 'Pepe',
-                        'FLOKI': 'Floki Inu',
-                        'BONK': 'Bonk'
-                    }
-                    long_name = crypto_names.get(display_name, display_name)
+                    long_name = CRYPTO_LONG_NAMES.get(display_name, display_name)
             elif is_african:
-                african_names = _self.get_african_stock_names()
-                long_name = african_names.get(symbol, symbol)
+                long_name = AFRICAN_STOCK_NAMES.get(symbol, symbol)
             else:
                 long_name = info.get('longName', symbol)
             
@@ -2120,16 +2734,16 @@ class TradingSimulator:
                 sector = 'Cryptocurrency'
                 industry = 'Digital Currency'
             elif is_african:
-                country = _self.get_african_country_from_symbol(symbol)
-                sector = f'African Markets - {country}'
+                sector = f'African Markets - {meta.country}'
                 industry = info.get('industry', 'African Stock')
             else:
                 sector = info.get('sector', 'Unknown')
                 industry = info.get('industry', 'Unknown')
             
-            return {
+            quote = {
                 'symbol': symbol,
-                'name': long_name[:50],
+                'name': long_name[:NAME_MAX_LENGTH],
+                'short_name': long_name[:SHORT_NAME_LENGTH],
                 'price': float(current_price),
                 'change': float(change),
                 'change_percent': float(change_percent),
@@ -2143,16 +2757,19 @@ class TradingSimulator:
                 'is_crypto': is_crypto,
                 'is_african': is_african,
                 'is_mock': False,
-                'country': _self.get_african_country_from_symbol(symbol) if is_african else None,
+                'country': meta.country,
                 'currency': currency,
                 'last_updated': datetime.now()
             }
+            FILE_CACHE.set(f'{symbol}:details', quote)
+            return quote
         except Exception as e:
             # Return fallback data instead of None to prevent crashes
-            st.warning(f"Error fetching data for {symbol}: Rate limited or API issue")
+            mark_bad_symbol(symbol)
             return {
                 'symbol': symbol,
                 'name': symbol,
+                'short_name': symbol,
                 'price': 100.0,  # Fallback price
                 'change': 0.0,
                 'change_percent': 0.0,
@@ -2163,15 +2780,107 @@ class TradingSimulator:
                 'day_low': 100.0,
                 'sector': 'Unknown',
                 'industry': 'Unknown',
-                'is_crypto': symbol.endswith('-USD'),
-                'is_african': _self.is_african_stock(symbol),
+                'is_crypto': meta.is_crypto,
+                'is_african': meta.is_african,
                 'is_mock': False,
-                'country': _self.get_african_country_from_symbol(symbol) if _self.is_african_stock(symbol) else None,
-                'currency': _self.get_currency_symbol(symbol),
+                'country': meta.country,
+                'currency': meta.currency,
                 'last_updated': datetime.now(),
-                'error': True
+                'error': True,
+                'error_msg': "Rate limited or API issue"
             }
     
+    def get_stock_prices_bulk(self, symbols: List[str]) -> Dict[str, Dict]:
+        """Get current prices for many symbols at once, fetching live ones in batched requests"""
+        quotes = {}
+        live_symbols = []
+        for symbol in dict.fromkeys(symbols):
+            if classify_symbol(symbol).is_mock:
+                quotes[symbol] = self.get_stock_quote(symbol)
+                continue
+            # Symbols another panel fetched recently are quoted from memory, so overlapping lists
+            # (movers, holdings, overview) only download what none of them has yet
+            hist = cached_history(symbol, '5d')
+            if hist is None:
+                hist = cached_history(symbol, QUOTE_HISTORY_PERIOD)
+            if hist is None:
+                live_symbols.append(symbol)
+            else:
+                quotes[symbol] = self.quote_from_history(symbol, hist)
+        
+        histories = fetch_recent_history(tuple(sorted(live_symbols))) if live_symbols else {}
+        for symbol in live_symbols:
+            hist = histories.get(symbol)
+            if hist is None:
+                # Anything the batch missed goes through the single-symbol path
+                quotes[symbol] = self.get_stock_quote(symbol)
+            else:
+                remember_history(symbol, '5d', hist)
+                quotes[symbol] = self.quote_from_history(symbol, hist)
+        
+        return quotes
+    
+    def quote_from_history(self, symbol: str, hist: pd.DataFrame) -> Dict:
+        """Price dict in get_stock_details' shape built from daily bars alone (no .info lookup)"""
+        current_price = float(hist['Close'].iloc[-1])
+        prev_close = float(hist['Close'].iloc[-2]) if len(hist) > 1 else current_price
+        change = current_price - prev_close
+        change_percent = (change / prev_close) * 100 if prev_close > 0 else 0
+        volume = hist['Volume'].iloc[-1]
+        
+        meta = classify_symbol(symbol)
+        if meta.is_crypto:
+            name, sector, industry = CRYPTO_LONG_NAMES.get(meta.display_name, meta.display_name), 'Cryptocurrency', 'Digital Currency'
+        elif meta.is_african:
+            name, sector, industry = AFRICAN_STOCK_NAMES.get(symbol, symbol), f'African Markets - {meta.country}', 'African Stock'
+        else:
+            name, sector, industry = symbol, 'Unknown', 'Unknown'
+        
+        return {
+            'symbol': symbol,
+            'name': name[:NAME_MAX_LENGTH],
+            'short_name': name[:SHORT_NAME_LENGTH],
+            'price': current_price,
+            'change': change,
+            'change_percent': change_percent,
+            'volume': 0 if pd.isna(volume) else int(volume),
+            'market_cap': 0,
+            'pe_ratio': None,
+            'day_high': float(hist['High'].iloc[-1]),
+            'day_low': float(hist['Low'].iloc[-1]),
+            'sector': sector,
+            'industry': industry,
+            'is_crypto': meta.is_crypto,
+            'is_african': meta.is_african,
+            'is_mock': False,
+            'country': meta.country,
+            'currency': meta.currency,
+            'last_updated': datetime.now()
+        }
+    
+    def get_user_portfolio(self, user_id: str) -> List[Dict]:
+        """The user's portfolio, read once per script run and shared by the summary, chart and tables"""
+        if user_id not in self._portfolios:
+            self._portfolios[user_id] = self.db.get_user_portfolio(user_id)
+        return self._portfolios[user_id]
+    
+    def get_position(self, user_id: str, symbol: str) -> Optional[Dict]:
+        """A held position from this run's portfolio read, or None; saves a query per trade-form render"""
+        if user_id not in self._positions:
+            self._positions[user_id] = {p['symbol']: p for p in self.get_user_portfolio(user_id)}
+        return self._positions[user_id].get(symbol)
+    
+    def price_positions(self, portfolio: List[Dict]) -> pd.DataFrame:
+        """Portfolio rows joined with current prices, plus invested/current/pl columns; unpriced positions are dropped"""
+        positions = pd.DataFrame(portfolio, columns=['symbol', 'shares', 'avg_price', 'name'])
+        quotes = self.get_stock_prices_bulk(positions['symbol'].tolist())
+        prices = pd.Series({symbol: quote['price'] for symbol, quote in quotes.items() if quote}, name='price', dtype=float)
+        positions = positions.join(prices, on='symbol').dropna(subset=['price'])
+        positions['invested'] = positions['avg_price'] * positions['shares']
+        positions['current'] = positions['price'] * positions['shares']
+        positions['pl'] = positions['current'] - positions['invested']
+        return positions
+    
     def get_portfolio_value(self, user_id: str) -> float:
         """Calculate total portfolio value"""
         try:
@@ -2179,15 +2888,19 @@ class TradingSimulator:
             if not user_data:
                 return 0
             
-            total_value = user_data['cash']
-            portfolio = self.db.get_user_portfolio(user_id)
-            
-            for position in portfolio:
-                stock_data = self.get_stock_price(position['symbol'])
-                if stock_data:
-                    total_value += stock_data['price'] * position['shares']
-            
-            return total_value
+            portfolio = self.get_user_portfolio(user_id)
+            # Mock prices are per session, so the valuation is memoised in session state (not st.cache_data);
+            # any trade changes cash or holdings and so misses the cache
+            signature = (user_id, user_data['cash'], tuple((p['symbol'], p['shares']) for p in portfolio))
+            now = time.monotonic()
+            cached = st.session_state.get('portfolio_value_cache')
+            if cached and cached[0] == signature and now - cached[1] < PORTFOLIO_VALUE_TTL_SECONDS:
+                return cached[2]
+            
+            positions = self.price_positions(portfolio)
+            value = user_data['cash'] + float(positions['current'].sum())
+            st.session_state.portfolio_value_cache = (signature, now, value)
+            return value
         except Exception as e:
             st.error(f"Error calculating portfolio value: {str(e)}")
             return 0
@@ -2195,23 +2908,15 @@ class TradingSimulator:
     def create_comprehensive_chart(self, symbol: str, period: str = "3mo"):
         """Create comprehensive stock/crypto chart with technical analysis"""
         try:
+            meta = classify_symbol(symbol)
+            currency = meta.currency
+            
             # Check if it's a mock data stock
-            if symbol.endswith('.AC'):
-                hist = self.get_ghana_mock_history(symbol, period)
-                currency = 'GHS'
-            elif symbol.endswith('.NR'):
-                hist = self.get_kenya_mock_history(symbol, period)
-                currency = 'KES'
-            elif symbol.endswith('.LG'):
-                hist = self.get_nigeria_mock_history(symbol, period)
-                currency = 'NGN'
+            if meta.is_mock:
+                hist = self.get_mock_history_for_market(symbol, meta.mock_market, period)
             else:
                 try:
-                    ticker = yf.Ticker(symbol)
-                    hist = ticker.history(period=period)
-                    if hist.empty:
-                        hist = ticker.history(period="1mo")  # Fallback to shorter period
-                    currency = self.get_currency_symbol(symbol)
+                    hist = get_history_with_fallback(symbol, period)
                 except Exception as e:
                     st.warning(f"Unable to fetch chart data for {symbol}: {str(e)}")
                     return None
@@ -2220,41 +2925,32 @@ class TradingSimulator:
                 st.warning(f"No data available for {symbol} for the selected period")
                 return None
             
+            # Pull the columns out as arrays once; every trace and indicator below reads these
+            dates = hist.index
+            opens = hist['Open'].to_numpy(dtype=float)
+            highs = hist['High'].to_numpy(dtype=float)
+            lows = hist['Low'].to_numpy(dtype=float)
+            closes = hist['Close'].to_numpy(dtype=float)
+            volumes = hist['Volume'].to_numpy()
+            annotation_y = np.nanmax(highs)
+            
             # Create subplots
             fig = go.Figure()
             
             # Determine asset type
-            is_crypto = symbol.endswith('-USD')
-            is_african = self.is_african_stock(symbol)
-            is_mock = symbol.endswith('.AC') or symbol.endswith('.NR') or symbol.endswith('.LG')
-            
-            if is_crypto:
-                display_name = symbol.replace('-USD', '')
-                asset_type = "Cryptocurrency"
-            elif symbol.endswith('.AC'):
-                display_name = symbol
-                asset_type = "Ghana Stock Exchange (GSE) - Live Mock Data"
-            elif symbol.endswith('.NR'):
-                display_name = symbol
-                asset_type = "Kenya NSE - Live Mock Data"
-            elif symbol.endswith('.LG'):
-                display_name = symbol
-                asset_type = "Nigeria NGX - Live Mock Data"
-            elif is_african:
-                display_name = symbol
-                country = self.get_african_country_from_symbol(symbol)
-                asset_type = f"African Stock - {country}"
-            else:
-                display_name = symbol
-                asset_type = "Stock"
+            is_crypto = meta.is_crypto
+            is_african = meta.is_african
+            is_mock = meta.is_mock
+            display_name = meta.display_name
+            asset_type = meta.chart_label
             
             # Main candlestick chart
             fig.add_trace(go.Candlestick(
-                x=hist.index,
-                open=hist['Open'],
-                high=hist['High'],
-                low=hist['Low'],
-                close=hist['Close'],
+                x=dates,
+                open=opens,
+                high=highs,
+                low=lows,
+                close=closes,
                 name='Price',
                 increasing_line_color='#26a69a',
                 decreasing_line_color='#ef5350',
@@ -2263,21 +2959,19 @@ class TradingSimulator:
             ))
             
             # Add moving averages
-            if len(hist) >= 20:
-                hist['SMA20'] = hist['Close'].rolling(window=20).mean()
+            if len(closes) >= 20:
                 fig.add_trace(go.Scatter(
-                    x=hist.index,
-                    y=hist['SMA20'],
+                    x=dates,
+                    y=simple_moving_average(closes, 20),
                     mode='lines',
                     name='SMA 20',
                     line=dict(color='orange', width=2)
                 ))
             
-            if len(hist) >= 50:
-                hist['SMA50'] = hist['Close'].rolling(window=50).mean()
+            if len(closes) >= 50:
                 fig.add_trace(go.Scatter(
-                    x=hist.index,
-                    y=hist['SMA50'],
+                    x=dates,
+                    y=simple_moving_average(closes, 50),
                     mode='lines',
                     name='SMA 50',
                     line=dict(color='blue', width=2)
@@ -2285,27 +2979,21 @@ class TradingSimulator:
             
             # Add volume bars as secondary y-axis
             fig.add_trace(go.Bar(
-                x=hist.index,
-                y=hist['Volume'],
+                x=dates,
+                y=volumes,
                 name='Volume',
                 marker_color='rgba(158, 158, 158, 0.3)',
                 yaxis='y2'
             ))
             
             # Calculate RSI
-            if len(hist) >= 14:
-                delta = hist['Close'].diff()
-                gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-                loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-                rs = gain / loss
-                rsi = 100 - (100 / (1 + rs))
-                
+            if len(closes) >= 14:
                 # Add RSI as text annotation
-                current_rsi = rsi.iloc[-1]
-                if not pd.isna(current_rsi):
+                current_rsi = latest_rsi(closes, 14)
+                if not np.isnan(current_rsi):
                     fig.add_annotation(
-                        x=hist.index[-1],
-                        y=hist['High'].max(),
+                        x=dates[-1],
+                        y=annotation_y,
                         text=f"RSI: {current_rsi:.1f}",
                         showarrow=False,
                         bgcolor="rgba(255,255,255,0.8)",
@@ -2317,8 +3005,8 @@ class TradingSimulator:
             if is_mock:
                 mock_text = "LIVE MOCK DATA"
                 fig.add_annotation(
-                    x=hist.index[0],
-                    y=hist['High'].max(),
+                    x=dates[0],
+                    y=annotation_y,
                     text=mock_text,
                     showarrow=False,
                     bgcolor="rgba(255,193,7,0.8)",
@@ -2328,7 +3016,7 @@ class TradingSimulator:
                 )
             
             # Price formatting
-            if (is_crypto and hist['Close'].iloc[-1] < 1) or (is_african and hist['Close'].iloc[-1] < 10):
+            if (is_crypto and closes[-1] < 1) or (is_african and closes[-1] < 10):
                 price_format = ".4f"
             else:
                 price_format = ".2f"
@@ -2355,7 +3043,9 @@ class TradingSimulator:
                     rangeslider=dict(visible=False),
                     type="date"
                 ),
-                hovermode='x unified'
+                hovermode='x unified',
+                dragmode='pan',
+                modebar_remove=['lasso', 'select']
             )
             
             return fig
@@ -2368,51 +3058,42 @@ class TradingSimulator:
         """Create comparison chart for multiple assets"""
         try:
             fig = go.Figure()
-            colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#7f7f7f']
             
+            # All live histories come from one batched download up front; mock histories live in
+            # session state and are read per symbol below
+            live_symbols = [symbol for symbol in dict.fromkeys(symbols) if not classify_symbol(symbol).is_mock]
+            live_histories = fetch_recent_history(tuple(sorted(live_symbols)), period) if live_symbols else {}
+            
+            errors = []
             for i, symbol in enumerate(symbols):
                 try:
                     # Check if it's a mock data stock
-                    if symbol.endswith('.AC'):
-                        hist = self.get_ghana_mock_history(symbol, period)
-                    elif symbol.endswith('.NR'):
-                        hist = self.get_kenya_mock_history(symbol, period)
-                    elif symbol.endswith('.LG'):
-                        hist = self.get_nigeria_mock_history(symbol, period)
+                    meta = classify_symbol(symbol)
+                    if meta.is_mock:
+                        hist = self.get_mock_history_for_market(symbol, meta.mock_market, period)
                     else:
-                        ticker = yf.Ticker(symbol)
-                        hist = ticker.history(period=period)
-                        if hist.empty:
-                            hist = ticker.history(period="1mo")  # Fallback
+                        hist = live_histories.get(symbol)
+                        if hist is None:
+                            # Anything the batch missed goes through the single-symbol path
+                            hist = get_history_with_fallback(symbol, period)
                     
                     if not hist.empty:
-                        # Normalize prices to percentage change from start
-                        normalized_prices = ((hist['Close'] / hist['Close'].iloc[0]) - 1) * 100
-                        
-                        # Get display name based on asset type
-                        if symbol.endswith('-USD'):
-                            display_name = symbol.replace('-USD', '')
-                        elif symbol.endswith('.AC'):
-                            display_name = f"{symbol}"
-                        elif symbol.endswith('.NR'):
-                            display_name = f"{symbol}"
-                        elif symbol.endswith('.LG'):
-                            display_name = f"{symbol}"
-                        elif self.is_african_stock(symbol):
-                            display_name = f"{symbol} ({self.get_african_country_from_symbol(symbol)})"
-                        else:
-                            display_name = symbol
+                        # Normalize prices to percentage change from start (as an array, so Plotly skips the Series)
+                        closes = hist['Close'].to_numpy(dtype=float)
+                        normalized_prices = (closes / closes[0] - 1) * 100
                         
                         fig.add_trace(go.Scatter(
                             x=hist.index,
                             y=normalized_prices,
                             mode='lines',
-                            name=display_name,
-                            line=dict(color=colors[i % len(colors)], width=2)
+                            name=meta.legend_label,
+                            line=dict(color=COMPARISON_COLORS[i % len(COMPARISON_COLORS)], width=2)
                         ))
                 except Exception as e:
-                    st.warning(f"Skipping {symbol}: {str(e)}")
-                    continue
+                    errors.append(f"{symbol}: {str(e)}")
+            
+            if errors:
+                st.warning("Skipped in comparison:\n" + "\n".join(f"- {error}" for error in errors[:10]))
             
             fig.update_layout(
                 title=f"Asset Comparison - Normalized Performance ({period})",
@@ -2421,7 +3102,9 @@ class TradingSimulator:
                 template="plotly_white",
                 height=500,
                 showlegend=True,
-                hovermode='x unified'
+                hovermode='x unified',
+                dragmode='pan',
+                modebar_remove=['lasso', 'select']
             )
             
             return fig
@@ -2433,31 +3116,34 @@ class TradingSimulator:
     def create_portfolio_pie_chart(self, user_id: str):
         """Create portfolio allocation pie chart"""
         try:
-            portfolio = self.db.get_user_portfolio(user_id)
+            portfolio = self.get_user_portfolio(user_id)
             
             if not portfolio:
                 return None
             
+            # Memoised in session state like get_portfolio_value; a trade changes the holdings and misses the cache
+            signature = (user_id, tuple((p['symbol'], p['shares']) for p in portfolio))
+            now = time.monotonic()
+            cached = st.session_state.get('portfolio_pie_cache')
+            if cached and cached[0] == signature and now - cached[1] < PORTFOLIO_VALUE_TTL_SECONDS:
+                return cached[2]
+            
             portfolio_data = []
             total_portfolio_value = 0
+            quotes = self.get_stock_prices_bulk([position['symbol'] for position in portfolio])
             
             for position in portfolio:
-                stock_data = self.get_stock_price(position['symbol'])
+                stock_data = quotes.get(position['symbol'])
                 if stock_data:
                     current_value = stock_data['price'] * position['shares']
                     total_portfolio_value += current_value
                     
                     # Add appropriate label based on asset type
-                    if stock_data.get('is_crypto'):
-                        symbol_display = f"{position['symbol'].replace('-USD', '')}"
-                    elif stock_data.get('is_african'):
-                        symbol_display = f"{position['symbol']}"
-                    else:
-                        symbol_display = f"{position['symbol']}"
+                    symbol_display = classify_symbol(position['symbol']).display_name
                     
                     portfolio_data.append({
                         'Symbol': symbol_display,
-                        'Name': position['name'][:20],
+                        'Name': position['short_name'],
                         'Value': current_value,
                         'Shares': position['shares'],
                         'Price': stock_data['price']
@@ -2505,6 +3191,7 @@ class TradingSimulator:
                 margin=dict(l=20, r=120, t=70, b=20)
             )
             
+            st.session_state.portfolio_pie_cache = (signature, now, fig)
             return fig
             
         except Exception as e:
@@ -2514,27 +3201,17 @@ class TradingSimulator:
     def get_portfolio_summary(self, user_id: str) -> Dict:
         """Get portfolio summary statistics"""
         try:
-            portfolio = self.db.get_user_portfolio(user_id)
+            portfolio = self.get_user_portfolio(user_id)
             user_data = self.db.get_user_data(user_id)
             
             if not portfolio or not user_data:
                 return {}
             
-            total_invested = 0
-            total_current_value = 0
-            total_unrealized_pl = 0
             holdings_count = len(portfolio)
-            
-            for position in portfolio:
-                stock_data = self.get_stock_price(position['symbol'])
-                if stock_data:
-                    invested_value = position['avg_price'] * position['shares']
-                    current_value = stock_data['price'] * position['shares']
-                    unrealized_pl = current_value - invested_value
-                    
-                    total_invested += invested_value
-                    total_current_value += current_value
-                    total_unrealized_pl += unrealized_pl
+            totals = self.price_positions(portfolio)[['invested', 'current', 'pl']].sum()
+            total_invested = float(totals['invested'])
+            total_current_value = float(totals['current'])
+            total_unrealized_pl = float(totals['pl'])
             
             return {
                 'cash': user_data['cash'],
@@ -2589,6 +3266,7 @@ def show_login_page():
                         if result['success']:
                             st.session_state.current_user = result['user']
                             st.session_state.logged_in = True
+                            st.session_state.user_data_dirty = True
                             st.success(f"Welcome back, {result['user']['username']}!")
                             st.rerun()
                         else:
@@ -2641,42 +3319,28 @@ def show_dashboard(simulator, current_user):
     total_return = portfolio_value - st.session_state.game_settings['starting_cash']
     return_percentage = (total_return / st.session_state.game_settings['starting_cash']) * 100
     
-    # Summary cards
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.markdown(f"""
+    # Summary cards, laid out by the summary-cards grid and sent as a single element
+    st.markdown(f"""
+    <div class="summary-cards">
         <div class="summary-card portfolio-value">
             <h3>Portfolio Value</h3>
             <h2>${portfolio_value:,.2f}</h2>
         </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown(f"""
         <div class="summary-card cash-available">
             <h3>Cash Available</h3>
             <h2>${current_user['cash']:,.2f}</h2>
         </div>
-        """, unsafe_allow_html=True)
-    
-    with col3:
-        return_color = "total-return" if total_return >= 0 else "total-return"
-        st.markdown(f"""
-        <div class="summary-card {return_color}">
+        <div class="summary-card total-return">
             <h3>Total Return</h3>
             <h2>${total_return:,.2f}</h2>
             <div class="delta {'positive' if total_return >= 0 else 'negative'}">({return_percentage:+.2f}%)</div>
         </div>
-        """, unsafe_allow_html=True)
-    
-    with col4:
-        st.markdown(f"""
         <div class="summary-card total-trades">
             <h3>Total Trades</h3>
             <h2>{current_user['total_trades']}</h2>
         </div>
-        """, unsafe_allow_html=True)
+    </div>
+    """, unsafe_allow_html=True)
     
     # Market overview section
     st.markdown("""
@@ -2687,13 +3351,16 @@ def show_dashboard(simulator, current_user):
     
     # Market indices
     col_idx1, col_idx2 = st.columns(2)
+    indices = ['SPY', 'QQQ', 'IWM', 'VTI']
+    crypto_major = ['BTC-USD', 'ETH-USD', 'BNB-USD', 'XRP-USD']
+    # One batched (and cached) download for both tables instead of a request per symbol
+    overview_quotes = simulator.get_stock_prices_bulk(indices + crypto_major)
     
     with col_idx1:
         st.write("#### Major Indices")
-        indices = ['SPY', 'QQQ', 'IWM', 'VTI']
         indices_data = []
         for index in indices:
-            data = simulator.get_stock_price(index)
+            data = overview_quotes.get(index)
             if data:
                 indices_data.append({
                     'Symbol': index,
@@ -2708,12 +3375,11 @@ def show_dashboard(simulator, current_user):
     
     with col_idx2:
         st.write("#### Top Cryptocurrencies")
-        crypto_major = ['BTC-USD', 'ETH-USD', 'BNB-USD', 'XRP-USD']
         crypto_data = []
         for crypto in crypto_major:
-            data = simulator.get_stock_price(crypto)
+            data = overview_quotes.get(crypto)
             if data:
-                display_name = crypto.replace('-USD', '')
+                display_name = classify_symbol(crypto).display_name
                 crypto_data.append({
                     'Crypto': display_name,
                     'Price': f"${data['price']:.2f}",
@@ -2726,7 +3392,7 @@ def show_dashboard(simulator, current_user):
             st.dataframe(df_crypto, use_container_width=True, hide_index=True)
     
     # Recent portfolio performance
-    portfolio = simulator.db.get_user_portfolio(current_user['id'])
+    portfolio = simulator.get_user_portfolio(current_user['id'])
     if portfolio:
         st.markdown("""
         <div class="chart-container">
@@ -2739,7 +3405,7 @@ def show_dashboard(simulator, current_user):
             st.plotly_chart(pie_chart, use_container_width=True)
     
     # Recent trades
-    trades = simulator.db.get_user_trades(current_user['id'])
+    trades = simulator.db.get_user_trades(current_user['id'], limit=5)
     if trades:
         st.markdown("""
         <div class="chart-container">
@@ -2747,16 +3413,11 @@ def show_dashboard(simulator, current_user):
         </div>
         """, unsafe_allow_html=True)
         
-        recent_trades = trades[:5]  # Show last 5 trades
         trades_data = []
-        for trade in recent_trades:
+        for trade in trades:  # Last 5 trades
             # Asset type display
-            if trade['symbol'].endswith('-USD'):
-                symbol_display = f"CRYPTO {trade['symbol'].replace('-USD', '')}"
-            elif simulator.is_african_stock(trade['symbol']):
-                symbol_display = f"AFRICAN {trade['symbol']}"
-            else:
-                symbol_display = f"STOCK {trade['symbol']}"
+            meta = classify_symbol(trade['symbol'])
+            symbol_display = f"{meta.short_label} {meta.display_name}"
             
             trades_data.append({
                 'Time': trade['timestamp'].strftime('%m/%d %H:%M'),
@@ -2771,6 +3432,56 @@ def show_dashboard(simulator, current_user):
             df_trades = pd.DataFrame(trades_data)
             st.dataframe(df_trades, use_container_width=True, hide_index=True)
 
+@st.fragment
+def show_technical_chart(simulator, symbol: str):
+    """Chart period selector and technical chart; changing the period reruns only this fragment"""
+    simulator.start_fragment_run()
+    
+    # Time period selector
+    selected_period = st.selectbox(
+        "Chart Period",
+        CHART_PERIOD_LABELS,
+        index=1
+    )
+    
+    period = CHART_PERIODS[selected_period]
+    
+    with st.spinner("Loading chart..."):
+        comprehensive_chart = simulator.create_comprehensive_chart(symbol, period)
+        if comprehensive_chart:
+            st.plotly_chart(comprehensive_chart, use_container_width=True)
+        else:
+            st.error("Unable to load chart data")
+
+@st.fragment
+def show_comparison_chart(simulator, symbols: List[str]):
+    """Comparison period selector and chart; changing the period reruns only this fragment"""
+    simulator.start_fragment_run()
+    
+    # Time period for comparison
+    comparison_period = st.selectbox(
+        "Comparison Period",
+        CHART_PERIOD_LABELS,
+        index=1,
+        key="comparison_period"
+    )
+    
+    period = CHART_PERIODS[comparison_period]
+    
+    # Create comparison chart
+    st.markdown("""
+    <div class="chart-container">
+        <h3>Performance Comparison</h3>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    with st.spinner("Loading comparison..."):
+        comparison_chart = simulator.create_comparison_chart(symbols, period)
+        if comparison_chart:
+            st.plotly_chart(comparison_chart, use_container_width=True)
+        else:
+            st.error("Unable to load comparison chart")
+
 def show_research_page(simulator, current_user):
     """Show research and analysis page"""
     st.markdown("""
@@ -2795,41 +3506,26 @@ def show_research_page(simulator, current_user):
             key="asset_type_filter"
         )
         
-        # Filter available assets based on selection
-        if asset_type == "Stocks & ETFs":
-            available_assets = [s for s in simulator.available_stocks if not s.endswith('-USD') and not simulator.is_african_stock(s)]
-        elif asset_type == "Cryptocurrencies":
-            available_assets = [s for s in simulator.available_stocks if s.endswith('-USD')]
-        elif asset_type == "African Markets":
-            available_assets = [s for s in simulator.available_stocks if simulator.is_african_stock(s)]
-        else:
-            available_assets = simulator.available_stocks
-        
-        # Asset selector for analysis
+        # Asset selector for analysis, filtered by type; the search box narrows the options to matching symbols
+        asset_query = st.text_input("Search Assets", "", placeholder="e.g. AAPL, BTC, .AC", key="analysis_asset_search")
         analysis_asset = st.selectbox(
             "Select Asset for Analysis",
-            [''] + available_assets[:100],
+            asset_select_options(asset_type, asset_query),
             key="analysis_asset"
         )
         
         if analysis_asset:
             # Get asset info
-            asset_data = simulator.get_stock_price(analysis_asset)
+            asset_data = simulator.get_stock_details(analysis_asset)
             if asset_data:
                 # Display asset info
                 col_info1, col_info2 = st.columns([2, 1])
                 
                 with col_info1:
                     # Asset header
-                    if asset_data.get('is_crypto'):
-                        asset_display_name = analysis_asset.replace('-USD', '')
-                        asset_type_label = "Cryptocurrency"
-                    elif asset_data.get('is_african'):
-                        asset_display_name = analysis_asset
-                        asset_type_label = "African Stock"
-                    else:
-                        asset_display_name = analysis_asset
-                        asset_type_label = "Stock"
+                    meta = classify_symbol(analysis_asset)
+                    asset_display_name = meta.display_name
+                    asset_type_label = meta.type_label
                     
                     asset_header = f"{asset_data['name']} ({asset_display_name})"
                     if asset_data.get('is_mock'):
@@ -2853,8 +3549,7 @@ def show_research_page(simulator, current_user):
                         st.rerun()
                     
                     # Check if user owns this asset
-                    portfolio = simulator.db.get_user_portfolio(current_user['id'])
-                    owns_asset = any(p['symbol'] == analysis_asset for p in portfolio)
+                    owns_asset = simulator.get_position(current_user['id'], analysis_asset) is not None
                     
                     if owns_asset:
                         if st.button("Quick Sell", key="research_sell", use_container_width=True):
@@ -2905,29 +3600,7 @@ def show_research_page(simulator, current_user):
                 </div>
                 """, unsafe_allow_html=True)
                 
-                # Time period selector
-                period_options = {
-                    '1 Month': '1mo',
-                    '3 Months': '3mo',
-                    '6 Months': '6mo',
-                    '1 Year': '1y',
-                    '2 Years': '2y'
-                }
-                
-                selected_period = st.selectbox(
-                    "Chart Period",
-                    list(period_options.keys()),
-                    index=1
-                )
-                
-                period = period_options[selected_period]
-                
-                with st.spinner("Loading chart..."):
-                    comprehensive_chart = simulator.create_comprehensive_chart(analysis_asset, period)
-                    if comprehensive_chart:
-                        st.plotly_chart(comprehensive_chart, use_container_width=True)
-                    else:
-                        st.error("Unable to load chart data")
+                show_technical_chart(simulator, analysis_asset)
             else:
                 st.error("Unable to load asset data")
     
@@ -2937,43 +3610,13 @@ def show_research_page(simulator, current_user):
         # Asset selector for comparison
         comparison_assets = st.multiselect(
             "Select Assets to Compare (max 5)",
-            simulator.available_stocks[:100],
+            asset_select_options("All Assets")[1:],
             max_selections=5,
             key="comparison_assets"
         )
         
         if comparison_assets:
-            # Time period for comparison
-            period_options = {
-                '1 Month': '1mo',
-                '3 Months': '3mo',
-                '6 Months': '6mo',
-                '1 Year': '1y',
-                '2 Years': '2y'
-            }
-            
-            comparison_period = st.selectbox(
-                "Comparison Period",
-                list(period_options.keys()),
-                index=1,
-                key="comparison_period"
-            )
-            
-            period = period_options[comparison_period]
-            
-            # Create comparison chart
-            st.markdown("""
-            <div class="chart-container">
-                <h3>Performance Comparison</h3>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            with st.spinner("Loading comparison..."):
-                comparison_chart = simulator.create_comparison_chart(comparison_assets, period)
-                if comparison_chart:
-                    st.plotly_chart(comparison_chart, use_container_width=True)
-                else:
-                    st.error("Unable to load comparison chart")
+            show_comparison_chart(simulator, comparison_assets)
             
             # Comparison table
             st.markdown("""
@@ -2982,33 +3625,26 @@ def show_research_page(simulator, current_user):
             </div>
             """, unsafe_allow_html=True)
             
-            comparison_data = []
-            for asset in comparison_assets:
-                asset_data = simulator.get_stock_price(asset)
-                if asset_data:
-                    if asset_data.get('is_crypto'):
-                        display_name = asset.replace('-USD', '')
-                        asset_type_label = "CRYPTO"
-                    elif asset_data.get('is_african'):
-                        display_name = asset
-                        asset_type_label = "AFRICAN"
-                    else:
-                        display_name = asset
-                        asset_type_label = "STOCK"
-                    
-                    comparison_data.append({
-                        'Asset': f"{asset_type_label} {display_name}",
-                        'Name': asset_data['name'][:30],
-                        'Price': simulator.format_currency_display(asset_data['price'], asset_data['currency']),
-                        'Change': simulator.format_currency_display(asset_data['change'], asset_data['currency']),
-                        'Change %': f"{asset_data['change_percent']:+.2f}%",
-                        'Volume': f"{asset_data['volume']:,}",
-                        'Market Cap': f"{asset_data['currency']} {asset_data['market_cap']/1_000_000_000:.1f}B" if asset_data['market_cap'] > 1_000_000_000 else f"{asset_data['currency']} {asset_data['market_cap']/1_000_000:.1f}M" if asset_data['market_cap'] > 0 else "N/A"
-                    })
-            
-            if comparison_data:
-                df = pd.DataFrame(comparison_data)
-                st.dataframe(df, use_container_width=True, hide_index=True)
+            comparison_details = simulator.get_stock_details_bulk(comparison_assets)
+            details = pd.DataFrame([comparison_details[asset] for asset in comparison_assets if comparison_details[asset]])
+            
+            if not details.empty:
+                # Format whole columns at once and hand Streamlit an Arrow table so it skips the pandas conversion
+                currency = details['currency']
+                market_cap = details['market_cap'].fillna(0).astype(float)
+                market_cap_text = (pd.Series("N/A", index=details.index)
+                                   .mask(market_cap > 0, currency + ' ' + (market_cap / 1_000_000).map('{:.1f}M'.format))
+                                   .mask(market_cap > 1_000_000_000, currency + ' ' + (market_cap / 1_000_000_000).map('{:.1f}B'.format)))
+                table = pa.table({
+                    'Asset': [f"{meta.short_label} {meta.display_name}" for meta in map(classify_symbol, details['symbol'])],
+                    'Name': details['short_name'],
+                    'Price': simulator.format_currency_column(details['price'], currency),
+                    'Change': simulator.format_currency_column(details['change'], currency),
+                    'Change %': details['change_percent'].map('{:+.2f}%'.format),
+                    'Volume': details['volume'].map('{:,}'.format),
+                    'Market Cap': market_cap_text
+                })
+                st.dataframe(table, use_container_width=True, hide_index=True)
     
     elif research_mode == "Market Screener":
         st.write("### Market Screener")
@@ -3031,14 +3667,7 @@ def show_research_page(simulator, current_user):
             )
         
         # Filter assets based on selection
-        if market_filter == "US Stocks":
-            filtered_assets = [s for s in simulator.available_stocks if not s.endswith('-USD') and not simulator.is_african_stock(s)]
-        elif market_filter == "Cryptocurrencies":
-            filtered_assets = [s for s in simulator.available_stocks if s.endswith('-USD')]
-        elif market_filter == "African Markets":
-            filtered_assets = [s for s in simulator.available_stocks if simulator.is_african_stock(s)]
-        else:
-            filtered_assets = simulator.available_stocks
+        filtered_assets = ASSET_TYPE_FILTERS.get(market_filter, AVAILABLE_STOCKS)
         
         # Show market data
         st.markdown("""
@@ -3047,34 +3676,22 @@ def show_research_page(simulator, current_user):
         </div>
         """, unsafe_allow_html=True)
         
-        screener_data = []
         with st.spinner("Loading market data..."):
-            for asset in filtered_assets[:30]:  # Limit to first 30 for performance
-                data = simulator.get_stock_price(asset)
-                if data:
-                    if data.get('is_crypto'):
-                        asset_type_label = "CRYPTO"
-                        display_name = asset.replace('-USD', '')
-                    elif data.get('is_african'):
-                        asset_type_label = "AFRICAN"
-                        display_name = asset
-                    else:
-                        asset_type_label = "STOCK"
-                        display_name = asset
-                    
-                    screener_data.append({
-                        'Symbol': f"{asset_type_label} {display_name}",
-                        'Name': data['name'][:25],
-                        'Price': simulator.format_currency_display(data['price'], data['currency']),
-                        'Change': simulator.format_currency_display(data['change'], data['currency']),
-                        'Change %': f"{data['change_percent']:+.2f}%",
-                        'Volume': f"{data['volume']:,}",
-                        'Sector': data.get('sector', 'N/A')[:20]
-                    })
+            screener_details = simulator.get_stock_details_bulk(filtered_assets[:30])  # Limit to first 30 for performance
+            details = pd.DataFrame([data for data in screener_details.values() if data])
         
-        if screener_data:
-            df_screener = pd.DataFrame(screener_data)
-            st.dataframe(df_screener, use_container_width=True, hide_index=True)
+        if not details.empty:
+            # Format whole columns at once and hand Streamlit an Arrow table so it skips the pandas conversion
+            screener_table = pa.table({
+                'Symbol': [f"{meta.short_label} {meta.display_name}" for meta in map(classify_symbol, details['symbol'])],
+                'Name': details['short_name'],
+                'Price': simulator.format_currency_column(details['price'], details['currency']),
+                'Change': simulator.format_currency_column(details['change'], details['currency']),
+                'Change %': details['change_percent'].map('{:+.2f}%'.format),
+                'Volume': details['volume'].map('{:,}'.format),
+                'Sector': details['sector'].fillna('N/A').str[:20]
+            })
+            st.dataframe(screener_table, use_container_width=True, hide_index=True)
     
     elif research_mode == "African Markets":
         st.write("### African Stock Exchanges")
@@ -3083,7 +3700,7 @@ def show_research_page(simulator, current_user):
         african_markets = simulator.get_african_markets()
         selected_african_market = st.selectbox(
             "Select African Market",
-            list(african_markets.keys()),
+            AFRICAN_MARKET_NAMES,
             key="selected_african_market"
         )
         
@@ -3095,29 +3712,27 @@ def show_research_page(simulator, current_user):
             """, unsafe_allow_html=True)
             
             market_stocks = african_markets[selected_african_market]
-            market_data = []
             
             with st.spinner(f"Loading {selected_african_market} data..."):
-                for stock in market_stocks[:20]:  # Limit to first 20 for performance
-                    data = simulator.get_stock_price(stock)
-                    if data:
-                        market_data.append({
-                            'Symbol': stock,
-                            'Company': data['name'][:30],
-                            'Price': f"{data['currency']} {data['price']:.2f}",
-                            'Change': f"{data['change']:+.2f}",
-                            'Change %': f"{data['change_percent']:+.2f}%",
-                            'Volume': f"{data['volume']:,}",
-                            'Sector': data.get('sector', 'N/A')[:20]
-                        })
-            
-            if market_data:
-                df_market = pd.DataFrame(market_data)
-                st.dataframe(df_market, use_container_width=True, hide_index=True)
+                market_quotes = simulator.get_stock_prices_bulk(market_stocks[:20])  # Limit to first 20 for performance
+                quotes = pd.DataFrame([data for data in market_quotes.values() if data])
+            
+            if not quotes.empty:
+                # Format whole columns at once into an Arrow table; the numeric columns stay in quotes for the stats below
+                market_table = pa.table({
+                    'Symbol': quotes['symbol'],
+                    'Company': quotes['short_name'],
+                    'Price': quotes['currency'] + ' ' + quotes['price'].map('{:.2f}'.format),
+                    'Change': quotes['change'].map('{:+.2f}'.format),
+                    'Change %': quotes['change_percent'].map('{:+.2f}%'.format),
+                    'Volume': quotes['volume'].map('{:,}'.format),
+                    'Sector': quotes['sector'].fillna('N/A').str[:20]
+                })
+                st.dataframe(market_table, use_container_width=True, hide_index=True)
                 
                 # Market stats
-                positive_count = len([d for d in market_data if '+' in d['Change']])
-                total_count = len(market_data)
+                positive_count = int((quotes['change'] >= 0).sum())
+                total_count = len(quotes)
                 
                 col_stat1, col_stat2, col_stat3 = st.columns(3)
                 with col_stat1:
@@ -3127,205 +3742,214 @@ def show_research_page(simulator, current_user):
                 with col_stat3:
                     st.metric("Losers", total_count - positive_count)
 
-def show_trade_page(simulator, current_user):
-    """Show trading page"""
+@st.fragment
+def show_order_panel(simulator, current_user):
+    """Asset pickers and trade form; their widget changes rerun only this fragment (a completed trade reruns the app)"""
+    simulator.start_fragment_run()
+    
     st.markdown("""
-    <div class="page-header page-content">
-        <h2>Trade Stocks & Crypto</h2>
-        <p>Execute trades with real-time market data</p>
+    <div class="chart-container">
+        <h3>Place Order</h3>
     </div>
     """, unsafe_allow_html=True)
     
-    # Quick trade setup if coming from research
-    if hasattr(st.session_state, 'quick_trade_asset') and st.session_state.quick_trade_asset:
-        st.info(f"Quick Trade: {st.session_state.quick_trade_action} {st.session_state.quick_trade_asset}")
+    # Asset selection
+    trade_asset_type = st.selectbox(
+        "Asset Type",
+        ["All Assets", "Stocks & ETFs", "Cryptocurrencies", "African Markets"],
+        key="trade_asset_type"
+    )
     
-    # Trading interface
-    trade_col1, trade_col2 = st.columns([2, 1])
+    # Assets filtered by type and search text
+    trade_asset_query = st.text_input("Search Assets", "", placeholder="e.g. AAPL, BTC, .AC", key="trade_asset_search")
+    
+    # The filtered options stay in the session until the asset type or search text changes, so a
+    # typical rerun (a quantity or action change) skips the option cache lookups altogether
+    options_key = (trade_asset_type, trade_asset_query)
+    trade_options = st.session_state.get('trade_asset_options')
+    if trade_options is None or trade_options[0] != options_key:
+        trade_options = (options_key, asset_select_options(*options_key), asset_option_positions(*options_key))
+        st.session_state.trade_asset_options = trade_options
+    _, trade_available_assets, trade_asset_positions = trade_options
+    
+    # Pre-select asset if coming from quick trade (when the current filter lists it)
+    quick_trade_asset = st.session_state.get('quick_trade_asset') or ""
+    selected_asset = st.selectbox(
+        "Select Asset",
+        trade_available_assets,
+        index=trade_asset_positions.get(quick_trade_asset, 0),
+        key="selected_trade_asset"
+    )
     
-    with trade_col1:
-        st.markdown("""
-        <div class="chart-container">
-            <h3>Place Order</h3>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        # Asset selection
-        trade_asset_type = st.selectbox(
-            "Asset Type",
-            ["All Assets", "Stocks & ETFs", "Cryptocurrencies", "African Markets"],
-            key="trade_asset_type"
-        )
+    if selected_asset:
+        # Get current price
+        asset_data = simulator.get_stock_details(selected_asset)
         
-        # Filter assets based on type
-        if trade_asset_type == "Stocks & ETFs":
-            trade_available_assets = [s for s in simulator.available_stocks if not s.endswith('-USD') and not simulator.is_african_stock(s)]
-        elif trade_asset_type == "Cryptocurrencies":
-            trade_available_assets = [s for s in simulator.available_stocks if s.endswith('-USD')]
-        elif trade_asset_type == "African Markets":
-            trade_available_assets = [s for s in simulator.available_stocks if simulator.is_african_stock(s)]
-        else:
-            trade_available_assets = simulator.available_stocks
-        
-        # Pre-select asset if coming from quick trade
-        default_asset = ""
-        if hasattr(st.session_state, 'quick_trade_asset') and st.session_state.quick_trade_asset:
-            if st.session_state.quick_trade_asset in trade_available_assets:
-                default_asset = st.session_state.quick_trade_asset
-        
-        selected_asset = st.selectbox(
-            "Select Asset",
-            [''] + trade_available_assets[:100],
-            index=trade_available_assets.index(default_asset) + 1 if default_asset else 0,
-            key="selected_trade_asset"
-        )
-        
-        if selected_asset:
-            # Get current price
-            asset_data = simulator.get_stock_price(selected_asset)
+        if asset_data:
+            # Display current asset info
+            meta = classify_symbol(selected_asset)
+            display_name = meta.display_name
+            asset_type_label = meta.type_label
             
-            if asset_data:
-                # Display current asset info
-                if asset_data.get('is_crypto'):
-                    display_name = selected_asset.replace('-USD', '')
-                    asset_type_label = "Cryptocurrency"
-                elif asset_data.get('is_african'):
-                    display_name = selected_asset
-                    asset_type_label = "African Stock"
-                else:
-                    display_name = selected_asset
-                    asset_type_label = "Stock"
+            st.markdown(f"""
+            <div class="metric-card">
+                <h3>{asset_data['name']} ({display_name})</h3>
+                <p><strong>Type:</strong> {asset_type_label}</p>
+                <p><strong>Current Price:</strong> {simulator.format_currency_display(asset_data['price'], asset_data['currency'])}</p>
+                <p><strong>24h Change:</strong> <span class="{'positive' if asset_data['change'] >= 0 else 'negative'}">{simulator.format_currency_display(asset_data['change'], asset_data['currency'])} ({asset_data['change_percent']:+.2f}%)</span></p>
+            </div>
+            """, unsafe_allow_html=True)
+            
+            # Trade form
+            with st.form("trade_form"):
+                # Pre-select action if coming from quick trade
+                default_action_index = 0
+                if hasattr(st.session_state, 'quick_trade_action') and st.session_state.quick_trade_action:
+                    if st.session_state.quick_trade_action == 'BUY':
+                        default_action_index = 0
+                    elif st.session_state.quick_trade_action == 'SELL':
+                        default_action_index = 1
                 
-                st.markdown(f"""
-                <div class="metric-card">
-                    <h3>{asset_data['name']} ({display_name})</h3>
-                    <p><strong>Type:</strong> {asset_type_label}</p>
-                    <p><strong>Current Price:</strong> {simulator.format_currency_display(asset_data['price'], asset_data['currency'])}</p>
-                    <p><strong>24h Change:</strong> <span class="{'positive' if asset_data['change'] >= 0 else 'negative'}">{simulator.format_currency_display(asset_data['change'], asset_data['currency'])} ({asset_data['change_percent']:+.2f}%)</span></p>
-                </div>
-                """, unsafe_allow_html=True)
+                trade_action = st.selectbox(
+                    "Action",
+                    ["BUY", "SELL"],
+                    index=default_action_index
+                )
                 
-                # Trade form
-                with st.form("trade_form"):
-                    # Pre-select action if coming from quick trade
-                    default_action_index = 0
-                    if hasattr(st.session_state, 'quick_trade_action') and st.session_state.quick_trade_action:
-                        if st.session_state.quick_trade_action == 'BUY':
-                            default_action_index = 0
-                        elif st.session_state.quick_trade_action == 'SELL':
-                            default_action_index = 1
-                    
-                    trade_action = st.selectbox(
-                        "Action",
-                        ["BUY", "SELL"],
-                        index=default_action_index
-                    )
-                    
-                    shares = st.number_input(
-                        "Number of Shares/Units",
-                        min_value=1,
-                        value=1,
-                        step=1
-                    )
+                shares = st.number_input(
+                    "Number of Shares/Units",
+                    min_value=1,
+                    value=1,
+                    step=1
+                )
+                
+                # Calculate trade cost; the USD unit price is converted once and reused for the order itself
+                commission = st.session_state.game_settings['commission']
+                price_usd = simulator.convert_to_usd(asset_data['price'], asset_data['currency'])
+                
+                if trade_action == "BUY":
+                    # For African stocks, convert local currency price to USD for actual cost
+                    if asset_data['currency'] != 'USD':
+                        actual_cost_usd = price_usd * shares
+                        total_cost_local = asset_data['price'] * shares
+                        cost_display = simulator.format_currency_display(total_cost_local, asset_data['currency'])
+                        st.write(f"**Total Cost:** {cost_display} (commission-free trading)")
+                        st.write(f"**Equivalent to:** ${actual_cost_usd:,.2f} USD")
+                    else:
+                        actual_cost_usd = asset_data['price'] * shares
+                        st.write(f"**Total Cost:** ${actual_cost_usd:,.2f} (commission-free trading)")
                     
-                    # Calculate trade cost
-                    commission = st.session_state.game_settings['commission']
+                    # Check if user has enough cash (in USD)
+                    if actual_cost_usd > current_user['cash']:
+                        st.error(f"Insufficient funds! You need ${actual_cost_usd:,.2f} USD but only have ${current_user['cash']:,.2f} USD")
+                        can_trade = False
+                    else:
+                        can_trade = True
+                
+                else:  # SELL
+                    owned_position = simulator.get_position(current_user['id'], selected_asset)
                     
-                    if trade_action == "BUY":
-                        # For African stocks, convert local currency price to USD for actual cost
+                    if owned_position and owned_position['shares'] >= shares:
+                        # For African stocks, convert local currency price to USD for actual proceeds
                         if asset_data['currency'] != 'USD':
-                            actual_cost_usd = simulator.convert_to_usd(asset_data['price'], asset_data['currency']) * shares
-                            total_cost_local = asset_data['price'] * shares
-                            cost_display = simulator.format_currency_display(total_cost_local, asset_data['currency'])
-                            st.write(f"**Total Cost:** {cost_display} (commission-free trading)")
-                            st.write(f"**Equivalent to:** ${actual_cost_usd:,.2f} USD")
+                            actual_proceeds_usd = price_usd * shares
+                            total_proceeds_local = asset_data['price'] * shares
+                            proceeds_display = simulator.format_currency_display(total_proceeds_local, asset_data['currency'])
+                            
+                            # Convert average price back to local currency for display
+                            avg_price_local = simulator.convert_from_usd(owned_position['avg_price'], asset_data['currency'])
+                            avg_price_display = simulator.format_currency_display(avg_price_local, asset_data['currency'])
+                            
+                            profit_loss_usd = actual_proceeds_usd - (owned_position['avg_price'] * shares)
+                            
+                            st.write(f"**Owned Shares:** {owned_position['shares']}")
+                            st.write(f"**Average Price:** {avg_price_display}")
+                            st.write(f"**Total Proceeds:** {proceeds_display} (commission-free trading)")
+                            st.write(f"**Equivalent to:** ${actual_proceeds_usd:,.2f} USD")
                         else:
-                            actual_cost_usd = asset_data['price'] * shares
-                            st.write(f"**Total Cost:** ${actual_cost_usd:,.2f} (commission-free trading)")
+                            actual_proceeds_usd = asset_data['price'] * shares
+                            profit_loss_usd = (asset_data['price'] - owned_position['avg_price']) * shares
+                            
+                            st.write(f"**Owned Shares:** {owned_position['shares']}")
+                            st.write(f"**Average Price:** ${owned_position['avg_price']:.2f}")
+                            st.write(f"**Total Proceeds:** ${actual_proceeds_usd:,.2f} (commission-free trading)")
+                        
+                        profit_color = "positive" if profit_loss_usd >= 0 else "negative"
+                        st.markdown(f"**Estimated P&L:** <span class='{profit_color}'>${profit_loss_usd:+,.2f} USD</span>", unsafe_allow_html=True)
                         
-                        # Check if user has enough cash (in USD)
-                        if actual_cost_usd > current_user['cash']:
-                            st.error(f"Insufficient funds! You need ${actual_cost_usd:,.2f} USD but only have ${current_user['cash']:,.2f} USD")
-                            can_trade = False
+                        can_trade = True
+                    else:
+                        if owned_position:
+                            st.error(f"Insufficient shares! You own {owned_position['shares']} shares but trying to sell {shares}")
                         else:
-                            can_trade = True
-                    
-                    else:  # SELL
-                        portfolio = simulator.db.get_user_portfolio(current_user['id'])
-                        owned_position = next((p for p in portfolio if p['symbol'] == selected_asset), None)
+                            st.error("You don't own this asset")
+                        can_trade = False
+                
+                # A failed quote comes back with a placeholder price, which must not be traded at
+                if asset_data.get('error'):
+                    st.error(f"No live price for {display_name} right now, so trading it is disabled. Please try again shortly.")
+                    can_trade = False
+                
+                # Submit trade
+                if st.form_submit_button(f"Execute {trade_action}", disabled=not can_trade, use_container_width=True, key="execute_trade"):
+                    if can_trade:
+                        result = simulator.db.execute_trade(
+                            current_user['id'],
+                            selected_asset,
+                            trade_action,
+                            shares,
+                            # Pass the USD price (converted at the live rate) for internal storage
+                            price_usd,
+                            asset_data['name'],
+                            asset_data['currency'],
+                            # Pass the original local currency price for display purposes
+                            asset_data['price']
+                        )
                         
-                        if owned_position and owned_position['shares'] >= shares:
-                            # For African stocks, convert local currency price to USD for actual proceeds
-                            if asset_data['currency'] != 'USD':
-                                actual_proceeds_usd = simulator.convert_to_usd(asset_data['price'], asset_data['currency']) * shares
-                                total_proceeds_local = asset_data['price'] * shares
-                                proceeds_display = simulator.format_currency_display(total_proceeds_local, asset_data['currency'])
-                                
-                                # Convert average price back to local currency for display
-                                avg_price_local = simulator.convert_from_usd(owned_position['avg_price'], asset_data['currency'])
-                                avg_price_display = simulator.format_currency_display(avg_price_local, asset_data['currency'])
-                                
-                                profit_loss_usd = actual_proceeds_usd - (owned_position['avg_price'] * shares)
-                                
-                                st.write(f"**Owned Shares:** {owned_position['shares']}")
-                                st.write(f"**Average Price:** {avg_price_display}")
-                                st.write(f"**Total Proceeds:** {proceeds_display} (commission-free trading)")
-                                st.write(f"**Equivalent to:** ${actual_proceeds_usd:,.2f} USD")
-                            else:
-                                actual_proceeds_usd = asset_data['price'] * shares
-                                profit_loss_usd = (asset_data['price'] - owned_position['avg_price']) * shares
-                                
-                                st.write(f"**Owned Shares:** {owned_position['shares']}")
-                                st.write(f"**Average Price:** ${owned_position['avg_price']:.2f}")
-                                st.write(f"**Total Proceeds:** ${actual_proceeds_usd:,.2f} (commission-free trading)")
+                        if result['success']:
+                            st.success(result['message'])
+                            if trade_action == "SELL" and result.get('profit_loss'):
+                                profit_loss = result['profit_loss']
+                                if profit_loss >= 0:
+                                    st.success(f"Profit: ${profit_loss:+,.2f}")
+                                else:
+                                    st.error(f"Loss: ${profit_loss:+,.2f}")
                             
-                            profit_color = "positive" if profit_loss_usd >= 0 else "negative"
-                            st.markdown(f"**Estimated P&L:** <span class='{profit_color}'>${profit_loss_usd:+,.2f} USD</span>", unsafe_allow_html=True)
+                            # Clear quick trade session state
+                            if hasattr(st.session_state, 'quick_trade_asset'):
+                                del st.session_state.quick_trade_asset
+                            if hasattr(st.session_state, 'quick_trade_action'):
+                                del st.session_state.quick_trade_action
                             
-                            can_trade = True
+                            # Cash, trade count and P&L changed
+                            st.session_state.user_data_dirty = True
+                            st.rerun()
                         else:
-                            if owned_position:
-                                st.error(f"Insufficient shares! You own {owned_position['shares']} shares but trying to sell {shares}")
-                            else:
-                                st.error("You don't own this asset")
-                            can_trade = False
-                    
-                    # Submit trade
-                    if st.form_submit_button(f"Execute {trade_action}", disabled=not can_trade, use_container_width=True):
-                        if can_trade:
-                            result = simulator.db.execute_trade(
-                                current_user['id'],
-                                selected_asset,
-                                trade_action,
-                                shares,
-                                # Pass the USD price for internal storage
-                                simulator.convert_to_usd(asset_data['price'], asset_data['currency']) if asset_data['currency'] != 'USD' else asset_data['price'],
-                                asset_data['name'],
-                                asset_data['currency'],
-                                # Pass the original local currency price for display purposes
-                                asset_data['price']
-                            )
-                            
-                            if result['success']:
-                                st.success(result['message'])
-                                if trade_action == "SELL" and result.get('profit_loss'):
-                                    profit_loss = result['profit_loss']
-                                    if profit_loss >= 0:
-                                        st.success(f"Profit: ${profit_loss:+,.2f}")
-                                    else:
-                                        st.error(f"Loss: ${profit_loss:+,.2f}")
-                                
-                                # Clear quick trade session state
-                                if hasattr(st.session_state, 'quick_trade_asset'):
-                                    del st.session_state.quick_trade_asset
-                                if hasattr(st.session_state, 'quick_trade_action'):
-                                    del st.session_state.quick_trade_action
-                                
-                                st.rerun()
-                            else:
-                                st.error(result['message'])
-            else:
-                st.error("Unable to load asset data")
+                            st.error(result['message'])
+        else:
+            st.error("Unable to load asset data")
+    
+    # A fragment rerun skips the end of main(), so quote failures from this panel are shown here
+    simulator.report_fetch_errors()
+
+def show_trade_page(simulator, current_user):
+    """Show trading page"""
+    st.markdown("""
+    <div class="page-header page-content">
+        <h2>Trade Stocks & Crypto</h2>
+        <p>Execute trades with real-time market data</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Quick trade setup if coming from research
+    if hasattr(st.session_state, 'quick_trade_asset') and st.session_state.quick_trade_asset:
+        st.info(f"Quick Trade: {st.session_state.quick_trade_action} {st.session_state.quick_trade_asset}")
+    
+    # Trading interface
+    trade_col1, trade_col2 = st.columns([2, 1])
+    
+    with trade_col1:
+        show_order_panel(simulator, current_user)
     
     with trade_col2:
         st.markdown("""
@@ -3334,30 +3958,25 @@ def show_trade_page(simulator, current_user):
         </div>
         """, unsafe_allow_html=True)
         
-        # Show some trending assets
-        trending_assets = ['AAPL', 'TSLA', 'BTC-USD', 'ETH-USD', 'MTNGH.AC', 'SAFCOM.NR']
+        # Show some trending assets, quoted in one batch and sent as a single element
+        trending_quotes = simulator.get_stock_prices_bulk(TRENDING_ASSETS)
         
-        for asset in trending_assets:
-            data = simulator.get_stock_price(asset)
+        mover_cards = []
+        for asset in TRENDING_ASSETS:
+            data = trending_quotes.get(asset)
             if data:
-                if data.get('is_crypto'):
-                    display_name = asset.replace('-USD', '')
-                    asset_type_label = "CRYPTO"
-                elif data.get('is_african'):
-                    display_name = asset
-                    asset_type_label = "AFRICAN"
-                else:
-                    display_name = asset
-                    asset_type_label = "STOCK"
-                
+                meta = classify_symbol(asset)
                 change_class = "positive" if data['change'] >= 0 else "negative"
                 
-                st.markdown(f"""
+                mover_cards.append(f"""
                 <div class="metric-card">
-                    <p><strong>{asset_type_label} {display_name}</strong></p>
+                    <p><strong>{meta.short_label} {meta.display_name}</strong></p>
                     <p>{simulator.format_currency_display(data['price'], data['currency'])} <span class="{change_class}">({data['change_percent']:+.2f}%)</span></p>
                 </div>
-                """, unsafe_allow_html=True)
+                """)
+        
+        if mover_cards:
+            st.markdown("".join(mover_cards), unsafe_allow_html=True)
 
 def show_portfolio_page(simulator, current_user):
     """Show portfolio management page"""
@@ -3408,75 +4027,47 @@ def show_portfolio_page(simulator, current_user):
     </div>
     """, unsafe_allow_html=True)
     
-    portfolio = simulator.db.get_user_portfolio(current_user['id'])
+    portfolio = simulator.get_user_portfolio(current_user['id'])
     
     if portfolio:
-        holdings_data = []
-        
-        for position in portfolio:
-            current_data = simulator.get_stock_price(position['symbol'])
-            if current_data:
-                current_value = current_data['price'] * position['shares']
-                invested_value = position['avg_price'] * position['shares']
-                unrealized_pl = current_value - invested_value
-                unrealized_pl_percent = (unrealized_pl / invested_value) * 100 if invested_value > 0 else 0
-                
-                # Asset type label
-                if current_data.get('is_crypto'):
-                    asset_type_label = "CRYPTO"
-                elif current_data.get('is_african'):
-                    asset_type_label = "AFRICAN"
-                else:
-                    asset_type_label = "STOCK"
-                
-                # For African stocks, convert USD stored prices back to local currency for display
-                if current_data.get('is_african') and current_data['currency'] != 'USD':
-                    # Convert average price from USD to local currency
-                    avg_price_local = simulator.convert_from_usd(position['avg_price'], current_data['currency'])
-                    avg_price_display = simulator.format_currency_display(avg_price_local, current_data['currency'])
-                    
-                    # Current price is already in local currency
-                    current_price_display = simulator.format_currency_display(current_data['price'], current_data['currency'])
-                    
-                    # Calculate market value: current USD value for accurate P&L, local currency for display
-                    current_value_usd = simulator.convert_to_usd(current_data['price'], current_data['currency']) * position['shares']
-                    current_value_local = current_data['price'] * position['shares']
-                    market_value_display = f"{simulator.format_currency_display(current_value_local, current_data['currency'])} (${current_value_usd:,.2f})"
-                    
-                    # Calculate P&L in USD for accuracy
-                    unrealized_pl_usd = current_value_usd - (position['avg_price'] * position['shares'])
-                    unrealized_pl_percent_usd = (unrealized_pl_usd / (position['avg_price'] * position['shares'])) * 100 if position['avg_price'] > 0 else 0
-                    
-                    # Calculate P&L in local currency for display
-                    invested_value_local = avg_price_local * position['shares']
-                    unrealized_pl_local = current_value_local - invested_value_local
-                    
-                    holdings_data.append({
-                        'Asset': f"{asset_type_label} {position['symbol']}",
-                        'Company': position['name'][:25],
-                        'Shares': position['shares'],
-                        'Avg Price': avg_price_display,
-                        'Current Price': current_price_display,
-                        'Market Value': market_value_display,
-                        'Unrealized P&L': f"{simulator.format_currency_display(unrealized_pl_local, current_data['currency'])} (${unrealized_pl_usd:+,.2f})",
-                        'P&L %': f"{unrealized_pl_percent_usd:+.2f}%"
-                    })
-                else:
-                    # For USD assets (US stocks, crypto)
-                    holdings_data.append({
-                        'Asset': f"{asset_type_label} {position['symbol']}",
-                        'Company': position['name'][:25],
-                        'Shares': position['shares'],
-                        'Avg Price': f"${position['avg_price']:.2f}",
-                        'Current Price': f"${current_data['price']:.2f}",
-                        'Market Value': f"${current_value:,.2f}",
-                        'Unrealized P&L': f"${unrealized_pl:+,.2f}",
-                        'P&L %': f"{unrealized_pl_percent:+.2f}%"
-                    })
+        # Join the batched quotes onto the positions and derive every column at once; unpriced positions drop out
+        positions = pd.DataFrame(portfolio, columns=['symbol', 'shares', 'avg_price', 'short_name'])
+        quotes = simulator.get_stock_prices_bulk(positions['symbol'].tolist())
+        positions = positions.merge(
+            pd.DataFrame([quote for quote in quotes.values() if quote], columns=['symbol', 'price', 'currency', 'is_african']),
+            on='symbol'
+        )
         
-        if holdings_data:
-            df_holdings = pd.DataFrame(holdings_data)
-            st.dataframe(df_holdings, use_container_width=True, hide_index=True)
+        if not positions.empty:
+            currency = positions['currency']
+            # African listings are quoted in local currency while avg_price is stored in USD: show
+            # local amounts with the USD value alongside, and work out P&L in USD for accuracy
+            is_local = positions['is_african'].astype(bool) & (currency != 'USD')
+            rate = simulator.exchange_rate_column(currency).where(is_local, 1.0)
+            invested_usd = positions['avg_price'] * positions['shares']
+            current_local = positions['price'] * positions['shares']
+            current_usd = current_local / rate
+            pl_usd = current_usd - invested_usd
+            pl_local = current_local - invested_usd * rate
+            pl_percent = (pl_usd / invested_usd * 100).where(invested_usd > 0, 0.0)
+            
+            holdings_table = pa.table({
+                'Asset': [f"{classify_symbol(symbol).short_label} {symbol}" for symbol in positions['symbol']],
+                'Company': positions['short_name'],
+                'Shares': positions['shares'],
+                'Avg Price': positions['avg_price'].map('${:.2f}'.format)
+                             .mask(is_local, simulator.format_currency_column(positions['avg_price'] * rate, currency)),
+                'Current Price': positions['price'].map('${:.2f}'.format)
+                                 .mask(is_local, simulator.format_currency_column(positions['price'], currency)),
+                'Market Value': current_local.map('${:,.2f}'.format)
+                                .mask(is_local, simulator.format_currency_column(current_local, currency) + current_usd.map(' (${:,.2f})'.format)),
+                'Unrealized P&L': pl_usd.map('${:+,.2f}'.format)
+                                  .mask(is_local, simulator.format_currency_column(pl_local, currency) + pl_usd.map(' (${:+,.2f})'.format)),
+                'P&L %': pl_percent
+            })
+            # Mixed-currency columns stay pre-formatted; uniform numeric ones are formatted by the frontend
+            st.dataframe(holdings_table, use_container_width=True, hide_index=True,
+                         column_config={'P&L %': st.column_config.NumberColumn(format='%+.2f%%')})
         else:
             st.info("No current holdings")
     else:
@@ -3491,28 +4082,23 @@ def show_history_page(simulator, current_user):
     </div>
     """, unsafe_allow_html=True)
     
-    # Get trade history
-    trades = simulator.db.get_user_trades(current_user['id'])
+    # Statistics cover the whole history in one aggregate query; only the displayed page of trades is read
+    trade_stats = simulator.db.get_user_trade_stats(current_user['id'])
     
-    if trades:
-        # Trade statistics
-        total_trades = len(trades)
-        buy_trades = len([t for t in trades if t['type'] == 'BUY'])
-        sell_trades = len([t for t in trades if t['type'] == 'SELL'])
-        total_realized_pl = sum([t['profit_loss'] for t in trades if t['profit_loss'] != 0])
-        
+    if trade_stats['total']:
         col_hist1, col_hist2, col_hist3, col_hist4 = st.columns(4)
         
         with col_hist1:
-            st.metric("Total Trades", total_trades)
+            st.metric("Total Trades", trade_stats['total'])
         
         with col_hist2:
-            st.metric("Buy Orders", buy_trades)
+            st.metric("Buy Orders", trade_stats['buys'])
         
         with col_hist3:
-            st.metric("Sell Orders", sell_trades)
+            st.metric("Sell Orders", trade_stats['sells'])
         
         with col_hist4:
+            total_realized_pl = trade_stats['realized_pl']
             color = "normal" if total_realized_pl >= 0 else "inverse"
             st.metric("Realized P&L", f"${total_realized_pl:+,.2f}", delta_color=color)
         
@@ -3523,54 +4109,41 @@ def show_history_page(simulator, current_user):
         </div>
         """, unsafe_allow_html=True)
         
-        trades_data = []
-        for trade in trades[:100]:  # Show last 100 trades
-            # Asset type label
-            if trade['symbol'].endswith('-USD'):
-                asset_type_label = "CRYPTO"
-                is_african = False
-                currency = 'USD'
-            elif simulator.is_african_stock(trade['symbol']):
-                asset_type_label = "AFRICAN"
-                is_african = True
-                currency = simulator.get_currency_symbol(trade['symbol'])
-            else:
-                asset_type_label = "STOCK"
-                is_african = False
-                currency = 'USD'
-            
-            # Use the original_price if available, otherwise convert from USD stored price
-            if trade.get('original_price') and trade['original_currency'] != 'USD':
-                # Use the original local currency price that was stored
-                price_display = simulator.format_currency_display(trade['original_price'], trade['original_currency'])
-                total_display = simulator.format_currency_display(trade['original_price'] * trade['shares'], trade['original_currency'])
-            elif is_african and currency != 'USD':
-                # Convert USD stored prices back to local currency for display
-                trade_price_local = simulator.convert_from_usd(trade['price'], currency)
-                price_display = simulator.format_currency_display(trade_price_local, currency)
-                
-                total_cost_local = simulator.convert_from_usd(trade['total_cost'], currency)
-                total_display = simulator.format_currency_display(total_cost_local, currency)
-            else:
-                # For USD assets
-                price_display = f"${trade['price']:.2f}"
-                total_display = f"${trade['total_cost']:,.2f}"
-            
-            trades_data.append({
-                'Date': trade['timestamp'].strftime('%Y-%m-%d %H:%M'),
-                'Type': 'BUY' if trade['type'] == 'BUY' else 'SELL',
-                'Asset': f"{asset_type_label} {trade['symbol']}",
-                'Company': trade['name'][:20],
-                'Shares': trade['shares'],
-                'Price': price_display,
-                'Total': total_display,
-                'Commission': "$0.00",
-                'P&L': f"${trade['profit_loss']:+,.2f} USD" if trade['profit_loss'] != 0 else "-"
-            })
+        # Format the latest trades column-wise rather than building a dict per row
+        recent = pd.DataFrame(simulator.db.get_user_trades(current_user['id'], limit=TRADE_HISTORY_LIMIT))
+        # Classify each distinct symbol once and map the results onto the rows
+        metas = {symbol: classify_symbol(symbol) for symbol in recent['symbol'].unique()}
+        currency = recent['symbol'].map({symbol: meta.currency for symbol, meta in metas.items()})
+        is_african = recent['symbol'].map({symbol: meta.is_african for symbol, meta in metas.items()})
         
-        if trades_data:
-            df_trades = pd.DataFrame(trades_data)
-            st.dataframe(df_trades, use_container_width=True, hide_index=True)
+        # Prefer the local-currency price stored with the trade; otherwise convert African
+        # listings' USD prices back to local currency, and show everything else in USD
+        has_original = recent['original_price'].astype(bool) & (recent['original_currency'] != 'USD')
+        is_local = ~has_original & is_african & (currency != 'USD')
+        rate = simulator.exchange_rate_column(currency).where(is_local, 1.0)
+        
+        price_text = (recent['price'].map('${:.2f}'.format)
+                      .mask(is_local, simulator.format_currency_column(recent['price'] * rate, currency))
+                      .mask(has_original, simulator.format_currency_column(recent['original_price'], recent['original_currency'])))
+        total_text = (recent['total_cost'].map('${:,.2f}'.format)
+                      .mask(is_local, simulator.format_currency_column(recent['total_cost'] * rate, currency))
+                      .mask(has_original, simulator.format_currency_column(recent['original_price'] * recent['shares'], recent['original_currency'])))
+        
+        trades_table = pa.table({
+            'Date': pd.to_datetime(recent['timestamp']),
+            'Type': recent['type'].where(recent['type'] == 'BUY', 'SELL'),
+            'Asset': recent['symbol'].map({symbol: f"{meta.short_label} {symbol}" for symbol, meta in metas.items()}),
+            'Company': recent['short_name'],
+            'Shares': recent['shares'],
+            'Price': price_text,
+            'Total': total_text,
+            'Commission': pd.Series("$0.00", index=recent.index),
+            'P&L': recent['profit_loss'].where(recent['profit_loss'] != 0)  # Blank for trades with no realized P&L
+        })
+        st.dataframe(trades_table, use_container_width=True, hide_index=True, column_config={
+            'Date': st.column_config.DatetimeColumn(format='YYYY-MM-DD HH:mm'),
+            'P&L': st.column_config.NumberColumn(format='$%+,.2f USD')
+        })
     else:
         st.info("No trades yet. Start trading to see your history!")
 
@@ -3584,7 +4157,7 @@ def show_leaderboard_page(simulator, current_user):
     """, unsafe_allow_html=True)
     
     # Get leaderboard data
-    leaderboard = simulator.db.get_leaderboard()
+    leaderboard = simulator.db.get_leaderboard(limit=20)
     
     if leaderboard:
         st.markdown("""
@@ -3593,39 +4166,27 @@ def show_leaderboard_page(simulator, current_user):
         </div>
         """, unsafe_allow_html=True)
         
-        leaderboard_data = []
-        for i, player in enumerate(leaderboard[:20]):  # Top 20 players
-            # Determine rank display
-            if player['rank'] == 1:
-                rank_display = "1st"
-            elif player['rank'] == 2:
-                rank_display = "2nd"
-            elif player['rank'] == 3:
-                rank_display = "3rd"
-            else:
-                rank_display = f"{player['rank']}th"
-            
+        # Money columns stay numeric and are formatted by the frontend
+        players = pd.DataFrame(leaderboard)
+        leaderboard_table = pa.table({
+            'Rank': players['rank'].map(LEADERBOARD_RANK_LABELS).fillna(players['rank'].map('{}th'.format)),
             # Highlight current user
-            username_display = player['username']
-            if player['user_id'] == current_user['id']:
-                username_display = f"YOU - {username_display}"
-            
-            leaderboard_data.append({
-                'Rank': rank_display,
-                'Trader': username_display,
-                'Portfolio Value': f"${player['portfolio_value']:,.2f}",
-                'Cash': f"${player['cash']:,.2f}",
-                'Total Trades': player['total_trades'],
-                'P&L': f"${player['total_profit_loss']:+,.2f}"
-            })
-        
-        df_leaderboard = pd.DataFrame(leaderboard_data)
-        st.dataframe(df_leaderboard, use_container_width=True, hide_index=True)
+            'Trader': players['username'].mask(players['user_id'] == current_user['id'], "YOU - " + players['username']),
+            'Portfolio Value': players['portfolio_value'],
+            'Cash': players['cash'],
+            'Total Trades': players['total_trades'],
+            'P&L': players['total_profit_loss']
+        })
+        st.dataframe(leaderboard_table, use_container_width=True, hide_index=True, column_config={
+            'Portfolio Value': st.column_config.NumberColumn(format='$%,.2f'),
+            'Cash': st.column_config.NumberColumn(format='$%,.2f'),
+            'P&L': st.column_config.NumberColumn(format='$%+,.2f')
+        })
         
         # Current user stats
-        current_user_rank = next((p['rank'] for p in leaderboard if p['user_id'] == current_user['id']), None)
-        if current_user_rank:
-            st.info(f"Your current rank: #{current_user_rank} out of {len(leaderboard)} traders")
+        user_rank = simulator.db.get_user_rank(current_user['id'])
+        if user_rank['rank']:
+            st.info(f"Your current rank: #{user_rank['rank']} out of {user_rank['total']} traders")
     else:
         st.info("No leaderboard data available")
 
@@ -3675,25 +4236,20 @@ def show_account_page(simulator, current_user):
     # Update exchange rates and show current info
     simulator.update_exchange_rates()
     
-    col_fx1, col_fx2 = st.columns(2)
-    
-    with col_fx1:
-        st.markdown(f"""
+    st.markdown(f"""
+    <div class="card-grid">
         <div class="metric-card">
             <h4>Rate Source</h4>
             <p>{st.session_state.get('exchange_rates_source', 'Not loaded')}</p>
             <small>Last updated: {st.session_state.get('exchange_rates_last_update', 'Never')}</small>
         </div>
-        """, unsafe_allow_html=True)
-    
-    with col_fx2:
-        st.markdown(f"""
         <div class="metric-card">
             <h4>Update Frequency</h4>
             <p>Every 30 minutes</p>
             <small>Multiple API fallbacks</small>
         </div>
-        """, unsafe_allow_html=True)
+    </div>
+    """, unsafe_allow_html=True)
     
     # Current exchange rates
     st.write("#### Current Exchange Rates (1 USD =)")
@@ -3719,31 +4275,22 @@ def show_account_page(simulator, current_user):
     
     settings = st.session_state.game_settings
     
-    col_set1, col_set2, col_set3 = st.columns(3)
-    
-    with col_set1:
-        st.markdown(f"""
+    st.markdown(f"""
+    <div class="card-grid">
         <div class="metric-card">
             <h4>Starting Cash</h4>
             <p>${settings['starting_cash']:,.2f}</p>
         </div>
-        """, unsafe_allow_html=True)
-    
-    with col_set2:
-        st.markdown(f"""
         <div class="metric-card">
             <h4>Commission</h4>
             <p>$0.00 per trade (Commission-Free!)</p>
         </div>
-        """, unsafe_allow_html=True)
-    
-    with col_set3:
-        st.markdown(f"""
         <div class="metric-card">
             <h4>Game Duration</h4>
             <p>{settings['game_duration_days']} days</p>
         </div>
-        """, unsafe_allow_html=True)
+    </div>
+    """, unsafe_allow_html=True)
     
     # About section
     st.markdown("""
@@ -3786,10 +4333,13 @@ def main():
         # Get current user
         current_user = st.session_state.current_user
         
-        # Refresh user data
-        current_user = simulator.db.get_user_data(current_user['id'])
-        if current_user:
-            st.session_state.current_user = current_user
+        # Refresh user data only when something may have changed it since the last read
+        if st.session_state.user_data_dirty:
+            refreshed_user = simulator.db.get_user_data(current_user['id'])
+            if refreshed_user:
+                current_user = refreshed_user
+                st.session_state.current_user = refreshed_user
+                st.session_state.user_data_dirty = False
         
         # Calculate portfolio metrics for sidebar
         portfolio_value = simulator.get_portfolio_value(current_user['id'])
@@ -3908,6 +4458,9 @@ def main():
             show_leaderboard_page(simulator, current_user)
         elif current_page == 'Account':
             show_account_page(simulator, current_user)
+        
+        simulator.report_fetch_errors()
+        simulator.finish_run()
     
     except Exception as e:
         st.error(f"An error occurred: {str(e)}")